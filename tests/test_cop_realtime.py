@@ -0,0 +1,49 @@
+import numpy as np
+
+from vaila.cop_calculate import calc_cop
+from vaila.cop_realtime import RealTimeCoP
+
+
+def _force_plate_data(fs=1000, seconds=5, fz_sign=1, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(fs * seconds) / fs
+    cop_x = 0.25 + 0.01 * np.sin(2 * np.pi * 0.3 * t)
+    cop_y = 0.23 + 0.01 * np.cos(2 * np.pi * 0.2 * t)
+    fz = 700 + 5 * rng.standard_normal(len(t))
+    # Unloading: a block near zero load with a single noisy sample of the opposite sign
+    fz[2000:2100] = 0.5
+    fz[2050] = -0.2
+    data = np.zeros((len(t), 6))
+    data[:, 2] = fz_sign * fz
+    data[:, 3] = cop_y * fz
+    data[:, 4] = -cop_x * fz
+    return data
+
+
+def _stream(stream, data, block_size=100):
+    blocks = range(0, len(data), block_size)
+    return np.vstack([stream.push(data[i : i + block_size])[0] for i in blocks])
+
+
+def test_fz_sign_is_latched_from_the_first_loaded_block():
+    fs = 1000
+    data = _force_plate_data(fs)
+    expected = calc_cop(data, fz_sign=1)[:, :2] * 100
+
+    stream = RealTimeCoP(fs, cutoff=None)
+    cop = _stream(stream, data)
+
+    assert stream.fz_sign == 1
+    np.testing.assert_allclose(cop, expected)
+    # The block with the noisy sample keeps the sign of its neighbours
+    assert np.all(np.abs(cop[2000:2100, 0] - 25) < 2)
+
+
+def test_fz_sign_given_to_the_constructor():
+    fs = 1000
+    data = _force_plate_data(fs, fz_sign=-1)
+    expected = calc_cop(data, fz_sign=-1)[:, :2] * 100
+
+    stream = RealTimeCoP(fs, cutoff=None, fz_sign=-1)
+
+    np.testing.assert_allclose(_stream(stream, data), expected)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from vaila.stabilogram_analysis import compute_sway_density_descriptors
+
+
+def test_sway_density_descriptors_known_peak_spacing():
+    # Peaks every 0.8 s plus a staircase-like ripple that must not count as peaks
+    fs = 100
+    t = np.arange(0, 30, 1 / fs)
+    rng = np.random.default_rng(0)
+    curve = 1 + np.cos(2 * np.pi * t / 0.8)
+    curve = np.round((curve + 0.05 * rng.standard_normal(len(t))) * fs) / fs
+
+    raw = compute_sway_density_descriptors(curve, fs, cutoff=None)
+    smoothed = compute_sway_density_descriptors(curve, fs)
+
+    assert raw["Number_of_Peaks"] > 2 * len(t) / (0.8 * fs)
+    assert smoothed["Number_of_Peaks"] == 37
+    assert np.isclose(smoothed["Mean_Peak_Interval_s"], 0.8, atol=0.01)
+    assert smoothed["Std_Peak_Interval_s"] < 0.02
+
+
+def test_sway_density_descriptors_min_distance_and_prominence():
+    fs = 100
+    t = np.arange(0, 10, 1 / fs)
+    # Large peaks every 1 s with small bumps in between
+    curve = np.cos(2 * np.pi * t) + 0.2 * np.cos(2 * np.pi * 4 * t)
+
+    all_peaks = compute_sway_density_descriptors(curve, fs, cutoff=None)
+    spaced = compute_sway_density_descriptors(curve, fs, cutoff=None, min_distance=0.7)
+    prominent = compute_sway_density_descriptors(curve, fs, cutoff=None, prominence=1)
+
+    assert all_peaks["Number_of_Peaks"] > spaced["Number_of_Peaks"]
+    assert np.isclose(spaced["Mean_Peak_Interval_s"], 1.0)
+    assert np.isclose(prominent["Mean_Peak_Interval_s"], 1.0)
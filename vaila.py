@@ -122,6 +122,9 @@ from vaila import (
     dlt2d,
     rec2d,
     rec2d_one_dlt2d,
+    dlt3d,
+    rec3d,
+    rec3d_one_dlt3d,
     show_vaila_message,
     emg_labiocom,
     plot_2d,
@@ -1459,7 +1462,7 @@ class Vaila(tk.Tk):
         input the sample rate and start and end indices for analysis.
 
         """
-        pass  # Aqui você deve adicionar a lógica para o DLT3D
+        dlt3d()
 
     # C_A_r3_c2 - for multi dlts in rows
     def rec3d_one_dlt3d(self):
@@ -1472,7 +1475,7 @@ class Vaila(tk.Tk):
         input the sample rate and start and end indices for analysis.
 
         """
-        pass  # Aqui você deve adicionar a lógica para a reconstrução 3D com 1 DLT
+        rec3d_one_dlt3d()
 
     # C_A_r3_c3 - for multi dlts in rows
     def rec3d(self):
@@ -1485,7 +1488,7 @@ class Vaila(tk.Tk):
         input the sample rate and start and end indices for analysis.
 
         """
-        pass  # Aqui você deve adicionar a lógica para a reconstrução 3D com múltiplos DLTs
+        rec3d()
 
     # C_A_r4_c1
     # def vaila(self):
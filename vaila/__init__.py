@@ -15,10 +15,12 @@ Author: Prof. Paulo Santiago
 """
 
 from .ellipse import plot_ellipse_pca, plot_cop_pathway_with_ellipse
+from .cop_realtime import RealTimeCoP, replay_file as replay_cop_file
 from .data_processing import read_cluster_csv, read_mocap_csv
-from .filter_utils import butter_filter
+from .filter_utils import butter_filter, butter_filter_batch, butter_design
 from .plotting import plot_orthonormal_bases
 from .rotation import rotdata, createortbase, calcmatrot, rotmat2euler
+from .segment_kinematics import compute_segment_kinematics, batch_segment_kinematics
 from .readcsv import (
     headersidx,
     reshapedata,
@@ -29,6 +31,8 @@ from .readcsv import (
 )
 from .rearrange_data import rearrange_data_in_directory
 from .readc3d_export import convert_c3d_to_csv
+from .readc3d_stream import C3DStreamReader
+from .c3d_index import update_c3d_index, query_c3d_index
 from .modifylabref import modify_lab_coords, get_labcoord_angles
 from .numberframes import count_frames_in_videos
 from .batchcut import batch_cut_videos, cut_videos
@@ -38,6 +42,7 @@ from . import imu_analysis
 from . import markerless_2D_analysis
 from . import markerless_3D_analysis
 from . import mocap_analysis
+from .mocap_batch import run_batch as run_mocap_batch
 from . import forceplate_analysis
 from . import gnss_analysis
 from .filemanager import (
@@ -52,8 +57,8 @@ from .filemanager import (
     transfer_file,
 )
 from .showc3d import show_c3d
-from .vector_coding import vector_coding
-from .syncvid import sync_videos
+from .vector_coding import vector_coding, batch_vector_coding
+from .syncvid import sync_videos, auto_sync_videos
 from .compress_videos_h264 import compress_videos_h264_gui
 from .compress_videos_h265 import compress_videos_h265_gui
 from .extractpng import VideoProcessor
@@ -62,13 +67,16 @@ from .getpixelvideo import main as getpixelvideo
 from .dlt2d import main as dlt2d
 from .rec2d import main as rec2d
 from .rec2d_one_dlt2d import main as rec2d_one_dlt2d
+from .dlt3d import main as dlt3d
+from .rec3d import main as rec3d
+from .rec3d_one_dlt3d import main as rec3d_one_dlt3d
 from .vaila_manifest import show_vaila_message
 from .emg_labiocom import run_emg_gui
 from .vailaplot2d import plot_2d
 from .vailaplot3d import plot_3d
 from .mergestack import merge_csv_files, stack_csv_files
 from .videoprocessor import process_videos_gui
-from .sync_flash import get_median_brightness
+from .sync_flash import get_median_brightness, get_brightness_series, detect_flash
 from .spectral_features import (
     total_power,
     power_frequency_50,
@@ -80,6 +88,7 @@ from .spectral_features import (
     energy_content_0_5_2,
     energy_content_above_2,
     frequency_quotient,
+    spectral_features_all,
 )
 from .interpolation_split import run_fill_split_dialog
 from .vaila_and_jump import vaila_and_jump
@@ -87,14 +96,20 @@ from .vaila_and_jump import vaila_and_jump
 __all__ = [
     "plot_ellipse_pca",
     "plot_cop_pathway_with_ellipse",
+    "RealTimeCoP",
+    "replay_cop_file",
     "read_cluster_csv",
     "read_mocap_csv",
     "butter_filter",
+    "butter_filter_batch",
+    "butter_design",
     "plot_orthonormal_bases",
     "rotdata",
     "createortbase",
     "calcmatrot",
     "rotmat2euler",
+    "compute_segment_kinematics",
+    "batch_segment_kinematics",
     "headersidx",
     "reshapedata",
     "rearrange_data_in_directory",
@@ -105,6 +120,9 @@ __all__ = [
     "compress_videos_h264_gui",
     "compress_videos_h265_gui",
     "convert_c3d_to_csv",
+    "C3DStreamReader",
+    "update_c3d_index",
+    "query_c3d_index",
     "create_c3d_from_csv",
     "convert_csv_to_c3d",
     "modify_lab_coords",
@@ -114,6 +132,7 @@ __all__ = [
     "markerless_2D_analysis",
     "markerless_3D_analysis",
     "mocap_analysis",
+    "run_mocap_batch",
     "forceplate_analysis",
     "gnss_analysis",
     "import_file",
@@ -127,7 +146,9 @@ __all__ = [
     "transfer_file",
     "show_c3d",
     "vector_coding",
+    "batch_vector_coding",
     "sync_videos",
+    "auto_sync_videos",
     "VideoProcessor",
     "select_file",
     "show_csv",
@@ -137,6 +158,9 @@ __all__ = [
     "dlt2d",
     "rec2d",
     "rec2d_one_dlt2d",
+    "dlt3d",
+    "rec3d",
+    "rec3d_one_dlt3d",
     "show_vaila_message",
     "run_emg_gui",
     "plot_2d",
@@ -145,6 +169,8 @@ __all__ = [
     "stack_csv_files",
     "process_videos_gui",
     "get_median_brightness",
+    "get_brightness_series",
+    "detect_flash",
     "total_power",
     "power_frequency_50",
     "power_frequency_95",
@@ -155,6 +181,7 @@ __all__ = [
     "energy_content_0_5_2",
     "energy_content_above_2",
     "frequency_quotient",
+    "spectral_features_all",
     "run_fill_split_dialog",
     "vaila_and_jump",
 ]
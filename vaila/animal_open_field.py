@@ -3,8 +3,8 @@
 animal_open_field.py
 ===============================================================================
 Author: Prof. Paulo R. P. Santiago
-Date: 16 December 2024
-Version: 2.1.0
+Date: 18 October 2026
+Version: 2.5.0
 Python Version: 3.11.11
 
 Description:
@@ -24,9 +24,14 @@ Key Features:
   3x3 grid cells of 20x20 cm each, including:
   - Percentage and count of time in each zone.
   - Percentage and count of time in the center zone and border areas.
+- Optional zone file (TOML, see `open_field_zones.py`) with rectangular, circular and
+  polygonal zones for one or more arenas (multi-arena rigs, circular arenas, Y-mazes);
+  the zones are compiled once into a raster lookup, so classifying each sample is O(1)
+  regardless of the number of zones.
 - Generates the following visualizations:
   - Pathway plots with color gradients indicating time progression.
-  - Heatmaps of positional density, including zone annotations.
+  - Heatmaps of positional density (2D histogram of occupancy, optionally Gaussian
+    smoothed), including zone annotations, and a group average heatmap of all animals.
   - Heatmaps highlighting center and border occupancy.
   - Speed over time plots with speed ranges and smoothed curves using moving averages.
   - Bar charts showing time distribution across speed ranges.
@@ -37,7 +42,6 @@ Dependencies:
 - Python 3.x
 - numpy
 - matplotlib
-- seaborn
 - tkinter
 
 Usage:
@@ -52,6 +56,8 @@ Usage:
 4. The script will process all `.csv` files in the selected directory.
 5. Results, including figures and a detailed text summary, will be saved in a timestamped 
    directory, with subdirectories for each processed file.
+   Files are analysed in parallel and all per-animal summaries are merged into
+   `openfield_summary_all.csv`; figures can be skipped ("metrics only").
 
 Example:
 --------
@@ -65,6 +71,22 @@ Notes:
 
 Changelog:
 ----------
+- v2.5.0:
+  - Heatmaps from one np.histogram2d occupancy grid (configurable bin size, optional
+    Gaussian smoothing by FFT convolution) instead of seaborn KDE plots; the raw grid is
+    cached as `<file>_occupancy_grid.npz` and averaged across animals into a group
+    heatmap without reprocessing the trajectories.
+- v2.4.0:
+  - Parallel batch: numeric analysis in a process pool, figures rendered by a separate
+    pool of Agg workers, optional "metrics only" mode and a merged per-animal summary
+    (`openfield_summary_all.csv`).
+- v2.3.0:
+  - Zone definitions can be loaded from a TOML file (rectangles, circles and polygons per
+    arena) and compiled into a raster label map (`open_field_zones.ZoneRaster`); results
+    per zone in `<file>_summary_zones.csv` and a zone map figure.
+- v2.2.0:
+  - Zone, center/border and speed-range occupancy computed in one vectorized pass
+    (np.digitize grid assignment and np.bincount counts/distances); same CSV outputs.
 - v2.1.0:
   - Replaced Butterworth filter with moving average smoothing for speed analysis.
   - Added dynamic window size for speed smoothing based on sampling frequency (e.g., 2 seconds).
@@ -77,11 +99,12 @@ import os
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
-import seaborn as sns
 from tkinter import Tk, filedialog, simpledialog, messagebox
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from scipy.signal import butter, filtfilt
+from scipy.signal import butter, filtfilt, fftconvolve
+from vaila.open_field_zones import ZoneRaster, load_zone_file, zone_outline
 
 
 def load_and_preprocess_data(input_file):
@@ -209,6 +232,81 @@ def define_center_zone():
     return center_zone
 
 
+def assign_grid_zones(x, y, x_edges=(0.2, 0.4), y_edges=(0.2, 0.4)):
+    """
+    Assigns every sample to a cell of a rectangular grid with one np.digitize per axis.
+
+    Cells are numbered row by row from the origin (Z1 = first column, first row), as in
+    `define_zones`; a coordinate equal to an inner edge belongs to the lower cell.
+
+    Args:
+        x (array-like): X coordinates.
+        y (array-like): Y coordinates.
+        x_edges, y_edges (sequence): Inner grid lines in meters.
+
+    Returns:
+        np.ndarray: Zone index (0 for Z1) of each sample.
+    """
+    col = np.digitize(x, x_edges, right=True)
+    row = np.digitize(y, y_edges, right=True)
+    return row * (len(x_edges) + 1) + col
+
+
+def zone_statistics(zone_index, distance, n_zones):
+    """
+    Per-zone sample counts and distances in one pass with np.bincount.
+
+    Args:
+        zone_index (np.ndarray): Zone of each sample (negative values are outside all zones).
+        distance (array-like): Distance traveled between consecutive points.
+        n_zones (int): Number of zones.
+
+    Returns:
+        counts (np.ndarray), distances (np.ndarray), points outside all zones (int).
+    """
+    inside = zone_index >= 0
+    counts = np.bincount(zone_index[inside], minlength=n_zones)
+    distances = np.bincount(
+        zone_index[inside], weights=np.asarray(distance)[inside], minlength=n_zones
+    )
+    return counts, distances, int(np.count_nonzero(~inside))
+
+
+def calculate_zone_file_occupancy(x, y, distance, zone_raster):
+    """
+    Calculates the number of points, percentages, and distance covered in each zone of
+    a compiled zone file.
+
+    Args:
+        x (array-like): X coordinates.
+        y (array-like): Y coordinates.
+        distance (array-like): Distance traveled between consecutive points.
+        zone_raster (ZoneRaster): Compiled zone definitions.
+
+    Returns:
+        zones_count (dict), zones_percentage (dict), zones_distance (dict), keyed by
+        "<arena>_<zone>"; points outside all zones are reported under "outside".
+    """
+    total_points = len(x)
+    counts, distances, points_outside_zones = zone_statistics(
+        zone_raster.classify(x, y), distance, len(zone_raster.zones)
+    )
+    names = zone_raster.names + ["outside"]
+    zones_count = dict(zip(names, counts.tolist() + [points_outside_zones]))
+    zones_distance = dict(
+        zip(names, distances.tolist() + [float(np.sum(distance)) - distances.sum()])
+    )
+    zones_percentage = {
+        zone: (count / total_points) * 100 for zone, count in zones_count.items()
+    }
+
+    print(f"Total points counted in zones: {total_points - points_outside_zones}")
+    print(f"Points outside zones: {points_outside_zones}")
+    print(f"Expected total points: {total_points}")
+
+    return zones_count, zones_percentage, zones_distance
+
+
 def calculate_zone_occupancy(x, y, distance):
     """
     Calculates the number of points, percentages, and distance covered in each zone.
@@ -224,27 +322,13 @@ def calculate_zone_occupancy(x, y, distance):
         zones_distance (dict): Distance covered in each zone.
     """
     zones = define_zones()
-    zones_count = {zone: 0 for zone in zones}
-    zones_distance = {zone: 0.0 for zone in zones}
     total_points = len(x)
 
-    # Add counter for points outside all zones
-    points_outside_zones = 0
-
-    # Iterate through all positions and calculate distances
-    for i in range(len(x)):  # Ensure all points (including 0) are processed
-        point_found = False
-        for zone_name, limits in zones.items():
-            if (
-                limits["xmin"] <= x[i] <= limits["xmax"]
-                and limits["ymin"] <= y[i] <= limits["ymax"]
-            ):
-                zones_count[zone_name] += 1
-                zones_distance[zone_name] += distance[i]
-                point_found = True
-                break  # Exit loop once a zone is found
-        if not point_found:
-            points_outside_zones += 1  # Count points that are outside all zones
+    counts, distances, points_outside_zones = zone_statistics(
+        assign_grid_zones(x, y), distance, len(zones)
+    )
+    zones_count = dict(zip(zones, counts.tolist()))
+    zones_distance = dict(zip(zones, distances.tolist()))
 
     # Calculate percentages
     zones_percentage = {
@@ -274,22 +358,17 @@ def calculate_center_and_border_occupancy(x, y, distance):
     """
     center_zone = define_center_zone()
     total_points = len(x)
+    distance = np.asarray(distance)
 
-    # Initialize counters
-    points_in_center = 0
-    distance_in_center = 0.0
-    distance_in_border = 0.0
-
-    # Count points and calculate distances
-    for i in range(1, len(x)):
-        if (
-            center_zone["xmin"] <= x[i] <= center_zone["xmax"]
-            and center_zone["ymin"] <= y[i] <= center_zone["ymax"]
-        ):
-            points_in_center += 1
-            distance_in_center += distance[i]
-        else:
-            distance_in_border += distance[i]
+    in_center = (
+        (x >= center_zone["xmin"])
+        & (x <= center_zone["xmax"])
+        & (y >= center_zone["ymin"])
+        & (y <= center_zone["ymax"])
+    )
+    points_in_center = int(np.count_nonzero(in_center))
+    distance_in_center = float(distance[in_center].sum())
+    distance_in_border = float(distance[~in_center].sum())
 
     points_in_border = total_points - points_in_center
 
@@ -303,7 +382,25 @@ def calculate_center_and_border_occupancy(x, y, distance):
     }
 
 
-def calculate_kinematics(x, y, fs):
+def speed_range_counts(speed, fs, step=3, max_speed=45):
+    """
+    Counts the samples in each speed range [low, high) in m/min with one np.digitize
+    and np.bincount; speeds at or above `max_speed` are not counted.
+
+    Returns:
+        frames (dict), seconds (dict), keyed by "low-high m/min".
+    """
+    edges = np.arange(0, max_speed + step, step)
+    index = np.digitize(np.asarray(speed) * 60, edges, right=False) - 1
+    valid = (index >= 0) & (index < len(edges) - 1)
+    counts = np.bincount(index[valid], minlength=len(edges) - 1)
+    keys = [f"{low}-{low + step} m/min" for low in edges[:-1]]
+    frames = dict(zip(keys, counts.tolist()))
+    seconds = {key: count / fs for key, count in frames.items()}
+    return frames, seconds
+
+
+def calculate_kinematics(x, y, fs, zone_raster=None):
     distance = np.insert(np.sqrt(np.diff(x) ** 2 + np.diff(y) ** 2), 0, 0)
     speed = np.insert(distance[1:] / (1 / fs), 0, 0)
 
@@ -311,26 +408,22 @@ def calculate_kinematics(x, y, fs):
     stationary_threshold = 0.05
     time_stationary = np.sum(speed < stationary_threshold) / fs
 
-    # Speed ranges
-    speed_ranges = [(3 * i, 3 * (i + 1)) for i in range(15)]  # 0 to 45 m/min
-    speed_range_counts_frames = {f"{low}-{high} m/min": 0 for low, high in speed_ranges}
-    speed_range_counts_seconds = {
-        f"{low}-{high} m/min": 0 for low, high in speed_ranges
-    }
-
-    # Count speed ranges
-    for s in speed * 60:  # Convert m/s to m/min
-        for low, high in speed_ranges:
-            if low <= s < high:
-                speed_range_counts_frames[f"{low}-{high} m/min"] += 1
-                speed_range_counts_seconds[f"{low}-{high} m/min"] += 1 / fs
-                break
-
-    # Call zone functions
-    zones_count, zones_percentage, zones_distance = calculate_zone_occupancy(
-        x, y, distance
+    # Speed ranges, 0 to 45 m/min in 3 m/min steps
+    speed_range_counts_frames, speed_range_counts_seconds = speed_range_counts(
+        speed, fs
     )
-    center_border_results = calculate_center_and_border_occupancy(x, y, distance)
+
+    # Call zone functions (zone file zones replace the 3x3 grid and center/border)
+    if zone_raster is not None:
+        zones_count, zones_percentage, zones_distance = calculate_zone_file_occupancy(
+            x, y, distance, zone_raster
+        )
+        center_border_results = None
+    else:
+        zones_count, zones_percentage, zones_distance = calculate_zone_occupancy(
+            x, y, distance
+        )
+        center_border_results = calculate_center_and_border_occupancy(x, y, distance)
 
     return (
         distance,
@@ -345,7 +438,141 @@ def calculate_kinematics(x, y, fs):
     )
 
 
-def plot_pathway(x, y, time_vector, total_distance, output_dir, base_name):
+def occupancy_grid(x, y, bounds=(0, 0.6, 0, 0.6), bin_size=0.01):
+    """
+    Occupancy of the arena as one 2D histogram of the samples.
+
+    Args:
+        x (array-like): X coordinates.
+        y (array-like): Y coordinates.
+        bounds (tuple): (xmin, xmax, ymin, ymax) of the grid in meters.
+        bin_size (float): Bin size in meters.
+
+    Returns:
+        counts (np.ndarray): Samples per bin, shape (ny, nx) with rows along Y.
+        x_edges, y_edges (np.ndarray): Bin edges in meters.
+    """
+    xmin, xmax, ymin, ymax = bounds
+    nx = max(int(np.ceil((xmax - xmin) / bin_size - 1e-9)), 1)
+    ny = max(int(np.ceil((ymax - ymin) / bin_size - 1e-9)), 1)
+    x_edges = xmin + np.arange(nx + 1) * bin_size
+    y_edges = ymin + np.arange(ny + 1) * bin_size
+    counts, _, _ = np.histogram2d(y, x, bins=(y_edges, x_edges))
+    return counts, x_edges, y_edges
+
+
+def smooth_occupancy(grid, sigma, bin_size):
+    """
+    Gaussian smoothing of an occupancy grid by FFT convolution.
+
+    Args:
+        grid (np.ndarray): Occupancy grid.
+        sigma (float): Standard deviation of the Gaussian kernel in meters (0 or None
+            returns the grid unchanged).
+        bin_size (float): Bin size of the grid in meters.
+
+    Returns:
+        np.ndarray: Smoothed grid, same shape and total as `grid` away from the borders.
+    """
+    if not sigma:
+        return grid
+    sigma_bins = sigma / bin_size
+    radius = int(np.ceil(3 * sigma_bins))
+    kernel_1d = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma_bins) ** 2)
+    kernel = np.outer(kernel_1d, kernel_1d)
+    kernel /= kernel.sum()
+    return np.clip(fftconvolve(grid, kernel, mode="same"), 0, None)
+
+
+def save_occupancy_grid(counts, x_edges, y_edges, fs, output_dir, base_name):
+    """
+    Caches the raw occupancy grid as `<base_name>_occupancy_grid.npz`.
+    """
+    grid_file_path = os.path.join(output_dir, f"{base_name}_occupancy_grid.npz")
+    np.savez_compressed(
+        grid_file_path, counts=counts, x_edges=x_edges, y_edges=y_edges, fs=fs
+    )
+    print(f"Occupancy grid saved to: {grid_file_path}")
+    return grid_file_path
+
+
+def plot_occupancy(ax, occupancy, sigma=0.02):
+    """
+    Draws an occupancy grid as the percentage of time per bin.
+
+    Args:
+        ax (matplotlib.axes.Axes): Target axes.
+        occupancy (dict): "counts", "x_edges" and "y_edges" (see `occupancy_grid`).
+        sigma (float): Gaussian smoothing in meters (0 for the raw histogram).
+    """
+    counts = occupancy["counts"]
+    x_edges, y_edges = occupancy["x_edges"], occupancy["y_edges"]
+    total = counts.sum()
+    percentage = counts / total * 100 if total else counts
+    percentage = smooth_occupancy(percentage, sigma, x_edges[1] - x_edges[0])
+    mesh = ax.pcolormesh(x_edges, y_edges, percentage, cmap="coolwarm", shading="flat")
+    cbar = plt.colorbar(mesh, ax=ax, fraction=0.046, pad=0.04)
+    cbar.set_label("Time (%)", rotation=270, labelpad=15)
+
+
+def group_average_heatmap(main_output_dir, sigma=0.02):
+    """
+    Averages the cached occupancy grids of all animals of a results directory (each
+    normalized to its own recording length) into `openfield_group_heatmap.png` and
+    `openfield_group_occupancy.npz`.
+
+    Args:
+        main_output_dir (str): Results directory with `<file>/<file>_occupancy_grid.npz`.
+        sigma (float): Gaussian smoothing in meters.
+
+    Returns:
+        np.ndarray: Average occupancy (fraction of time per bin), or None without grids.
+    """
+    grid_files = sorted(Path(main_output_dir).glob("*/*_occupancy_grid.npz"))
+    if not grid_files:
+        print("No occupancy grids found for the group heatmap.")
+        return None
+
+    grids = []
+    for grid_file in grid_files:
+        with np.load(grid_file) as data:
+            if not grids:
+                x_edges, y_edges = data["x_edges"], data["y_edges"]
+            elif not (
+                np.array_equal(data["x_edges"], x_edges)
+                and np.array_equal(data["y_edges"], y_edges)
+            ):
+                raise ValueError(f"Occupancy grid {grid_file} has different bins.")
+            counts = data["counts"]
+            grids.append(counts / counts.sum() if counts.sum() else counts)
+    average = np.mean(grids, axis=0)
+
+    np.savez_compressed(
+        os.path.join(main_output_dir, "openfield_group_occupancy.npz"),
+        occupancy=average,
+        x_edges=x_edges,
+        y_edges=y_edges,
+        n_animals=len(grids),
+    )
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    plot_occupancy(
+        ax, {"counts": average, "x_edges": x_edges, "y_edges": y_edges}, sigma
+    )
+    ax.set_aspect("equal")
+    ax.set_xlabel("Position X (m)")
+    ax.set_ylabel("Position Y (m)")
+    ax.set_title(f"Group Average Heatmap (n = {len(grids)})")
+    output_file_path = os.path.join(main_output_dir, "openfield_group_heatmap.png")
+    plt.savefig(output_file_path, bbox_inches="tight")
+    plt.close()
+    print(f"Group heatmap saved at: {output_file_path}")
+    return average
+
+
+def plot_pathway(
+    x, y, time_vector, total_distance, output_dir, base_name, zone_raster=None
+):
     """
     Plots the pathway of the animal's movement with a color gradient indicating progression
     over time in minutes and shows the total distance covered in the title.
@@ -357,6 +584,7 @@ def plot_pathway(x, y, time_vector, total_distance, output_dir, base_name):
         total_distance (float): Total distance covered in meters.
         output_dir (str): Directory to save the output figure.
         base_name (str): Base name for the output file.
+        zone_raster (ZoneRaster, optional): Zone file zones drawn instead of the 3x3 grid.
     """
     os.makedirs(output_dir, exist_ok=True)
 
@@ -389,18 +617,35 @@ def plot_pathway(x, y, time_vector, total_distance, output_dir, base_name):
     ax.scatter(x[-1], y[-1], color="red", s=50, label="End", zorder=5)  # End point
 
     # Add grid and axis limits
-    ax.set_xlim(0, 0.6)
-    ax.set_ylim(0, 0.6)
+    if zone_raster is not None:
+        xmin, xmax, ymin, ymax = zone_raster.bounds
+        ax.set_xlim(xmin, xmax)
+        ax.set_ylim(ymin, ymax)
+        ax.set_aspect("equal")
+    else:
+        ax.set_xlim(0, 0.6)
+        ax.set_ylim(0, 0.6)
     ax.set_xlabel("Position X (m)")
     ax.set_ylabel("Position Y (m)")
 
     # Add title with total distance
     ax.set_title(f"Pathway of Animal Movement\nTotal Distance: {total_distance:.2f} m")
 
-    # Add grid lines for the zones (3x3)
-    for i in range(1, 3):
-        ax.axvline(i * 0.2, color="black", linestyle="--", linewidth=0.8)
-        ax.axhline(i * 0.2, color="black", linestyle="--", linewidth=0.8)
+    # Add the zone outlines, or grid lines for the zones (3x3)
+    if zone_raster is not None:
+        for zone in zone_raster.zones:
+            outline = zone_outline(zone)
+            ax.plot(
+                outline[:, 0],
+                outline[:, 1],
+                color="black",
+                linestyle="--",
+                linewidth=0.8,
+            )
+    else:
+        for i in range(1, 3):
+            ax.axvline(i * 0.2, color="black", linestyle="--", linewidth=0.8)
+            ax.axhline(i * 0.2, color="black", linestyle="--", linewidth=0.8)
 
     # Add legend for Start and End points
     # ax.legend()
@@ -421,7 +666,7 @@ def plot_pathway(x, y, time_vector, total_distance, output_dir, base_name):
     print(f"Pathway plot saved at: {output_file_path}")
 
 
-def plot_heatmap(x, y, output_dir, base_name, results):
+def plot_heatmap(x, y, output_dir, base_name, results, occupancy=None, sigma=0.02):
     """
     Plots a corrected heatmap with zones and their respective percentages.
 
@@ -431,6 +676,9 @@ def plot_heatmap(x, y, output_dir, base_name, results):
         output_dir (str): Directory to save the output.
         base_name (str): Base name of the output file.
         results (dict): Processed results containing counts and percentages for each zone.
+        occupancy (dict, optional): Precomputed occupancy grid (see `occupancy_grid`);
+            computed from x and y with 1 cm bins if not given.
+        sigma (float): Gaussian smoothing of the heatmap in meters.
     """
     os.makedirs(output_dir, exist_ok=True)
 
@@ -439,19 +687,13 @@ def plot_heatmap(x, y, output_dir, base_name, results):
         print(f"Warning: Empty data for heatmap in {base_name}. Skipping plot.")
         return
 
+    if occupancy is None:
+        occupancy = dict(zip(("counts", "x_edges", "y_edges"), occupancy_grid(x, y)))
+
     # Create the heatmap
     try:
         fig, ax = plt.subplots(figsize=(6, 6))
-        sns.kdeplot(
-            x=x,
-            y=y,
-            cmap="coolwarm",
-            fill=True,
-            levels=100,
-            bw_adjust=2,
-            thresh=0,
-            ax=ax,
-        )
+        plot_occupancy(ax, occupancy, sigma)
         ax.set_xlim(0, 0.6)
         ax.set_ylim(0, 0.6)
         ax.set_xlabel("Position X (m)")
@@ -497,7 +739,9 @@ def plot_heatmap(x, y, output_dir, base_name, results):
         return
 
 
-def plot_center_and_border_heatmap(x, y, output_dir, base_name, center_border_results):
+def plot_center_and_border_heatmap(
+    x, y, output_dir, base_name, center_border_results, occupancy=None, sigma=0.02
+):
     """
     Plots a heatmap highlighting the center and border zones.
 
@@ -508,6 +752,9 @@ def plot_center_and_border_heatmap(x, y, output_dir, base_name, center_border_re
         base_name (str): Base name of the output file.
         center_border_results (dict): Processed results with counts and percentages
                                       for the center and border zones.
+        occupancy (dict, optional): Precomputed occupancy grid (see `occupancy_grid`);
+            computed from x and y with 1 cm bins if not given.
+        sigma (float): Gaussian smoothing of the heatmap in meters.
     """
     os.makedirs(output_dir, exist_ok=True)
 
@@ -518,19 +765,13 @@ def plot_center_and_border_heatmap(x, y, output_dir, base_name, center_border_re
         )
         return
 
+    if occupancy is None:
+        occupancy = dict(zip(("counts", "x_edges", "y_edges"), occupancy_grid(x, y)))
+
     # Create the heatmap
     try:
         fig, ax = plt.subplots(figsize=(6, 6))
-        sns.kdeplot(
-            x=x,
-            y=y,
-            cmap="coolwarm",
-            fill=True,
-            levels=100,
-            bw_adjust=1.5,
-            thresh=0,
-            ax=ax,
-        )
+        plot_occupancy(ax, occupancy, sigma)
 
         # Add a rectangle for the center zone
         center_zone = define_center_zone()
@@ -590,6 +831,64 @@ def plot_center_and_border_heatmap(x, y, output_dir, base_name, center_border_re
         return
 
 
+def plot_zone_map(x, y, zone_raster, output_dir, base_name, results):
+    """
+    Plots the compiled zone raster with the trajectory and the percentage of time in
+    each zone of a zone file.
+
+    Args:
+        x (array-like): X coordinates.
+        y (array-like): Y coordinates.
+        zone_raster (ZoneRaster): Compiled zone definitions.
+        output_dir (str): Directory to save the output.
+        base_name (str): Base name of the output file.
+        results (dict): Processed results containing the percentages for each zone.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    labels = np.ma.masked_less(zone_raster.labels, 0)
+    ax.imshow(
+        labels,
+        origin="lower",
+        extent=zone_raster.bounds,
+        cmap="tab20",
+        alpha=0.4,
+        interpolation="nearest",
+    )
+    ax.plot(x, y, color="black", linewidth=0.5, alpha=0.6)
+
+    for zone, name in zip(zone_raster.zones, zone_raster.names):
+        outline = zone_outline(zone)
+        ax.plot(outline[:, 0], outline[:, 1], color="black", linewidth=0.8)
+        percentage = results["zone_percentages"].get(name, 0)
+        ax.text(
+            outline[:, 0].mean(),
+            outline[:, 1].mean(),
+            f"{zone['name']}\n{percentage:.1f}%",
+            color="black",
+            ha="center",
+            va="center",
+            fontsize=9,
+            weight="bold",
+        )
+
+    xmin, xmax, ymin, ymax = zone_raster.bounds
+    ax.set_xlim(xmin, xmax)
+    ax.set_ylim(ymin, ymax)
+    ax.set_aspect("equal")
+    ax.set_xlabel("Position X (m)")
+    ax.set_ylabel("Position Y (m)")
+    ax.set_title(
+        f"Zone Occupancy (outside zones: {results['zone_percentages']['outside']:.1f}%)"
+    )
+
+    output_file_path = os.path.join(output_dir, f"{base_name}_zone_map.png")
+    plt.savefig(output_file_path, bbox_inches="tight")
+    plt.close()
+    print(f"Zone map saved at: {output_file_path}")
+
+
 def plot_speed_ranges(
     speed_range_counts_frames, time_stationary_seconds, fs, output_dir, base_name
 ):
@@ -802,6 +1101,50 @@ def save_results_to_csv(
         raise
 
 
+def save_zone_file_results_to_csv(results, zones_distance, output_dir, base_name):
+    """
+    Save the zone file occupancy, stationary time and speed range counts, with one
+    group of columns per zone ("<arena>_<zone>_npoints", "_percentage", "_distance_m").
+
+    Args:
+        results (dict): Processed results containing zone counts, percentages, and speed data.
+        zones_distance (dict): Distances covered in each zone.
+        output_dir (str): Directory to save the output CSV.
+        base_name (str): Base name for the output file.
+    """
+    try:
+        combined_file_path = os.path.join(output_dir, f"{base_name}_summary_zones.csv")
+        zones = list(results["zone_counts"].keys())
+
+        headers = (
+            [f"{zone}_npoints" for zone in zones]
+            + [f"{zone}_percentage" for zone in zones]
+            + [f"{zone}_distance_m" for zone in zones]
+            + ["time_stationary_seconds"]
+            + [f"{k}_frames" for k in results["speed_range_counts_frames"].keys()]
+            + [f"{k}_seconds" for k in results["speed_range_counts_seconds"].keys()]
+        )
+        row_data = (
+            [results["zone_counts"][zone] for zone in zones]
+            + [results["zone_percentages"][zone] for zone in zones]
+            + [zones_distance[zone] for zone in zones]
+            + [results["time_stationary"]]
+            + list(results["speed_range_counts_frames"].values())
+            + list(results["speed_range_counts_seconds"].values())
+        )
+
+        write_header = not os.path.exists(combined_file_path)
+        with open(combined_file_path, "a", encoding="utf-8") as f:
+            if write_header:
+                f.write(",".join(headers) + "\n")
+            f.write(",".join(map(str, row_data)) + "\n")
+
+        print(f"Results saved to: {combined_file_path}")
+    except Exception as e:
+        print(f"Error saving results to CSV: {e}")
+        raise
+
+
 def save_position_data(time_vector, x, y, distance, speed, output_dir, base_name):
     try:
         position_file_path = os.path.join(output_dir, f"{base_name}_position_data.csv")
@@ -817,103 +1160,309 @@ def save_position_data(time_vector, x, y, distance, speed, output_dir, base_name
         raise
 
 
-def process_open_field_data(input_file, main_output_dir, fs, cutoff):
-    try:
-        # Extract base name and create output directory
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
-        output_dir = os.path.join(main_output_dir, base_name)
-        os.makedirs(output_dir, exist_ok=True)
+def analyze_open_field_data(
+    input_file, main_output_dir, fs, cutoff, zone_raster=None, bin_size=0.01
+):
+    """
+    Numeric part of the analysis of one file: loading, filtering, kinematics, zone
+    occupancy, the occupancy grid and the CSV/NPZ outputs (no figures).
+
+    Args:
+        input_file (str): Path to the input CSV file.
+        main_output_dir (str): Directory where the per-file output directory is created.
+        fs (float): Sampling frequency in Hz.
+        cutoff (float): Butterworth filter cutoff frequency in Hz.
+        zone_raster (ZoneRaster, optional): Compiled zone file replacing the 3x3 grid.
+        bin_size (float): Bin size of the occupancy grid in meters.
+
+    Returns:
+        dict: Everything the figures need (see `plot_open_field_data`).
+    """
+    # Extract base name and create output directory
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    output_dir = os.path.join(main_output_dir, base_name)
+    os.makedirs(output_dir, exist_ok=True)
 
-        # Load and preprocess data
-        x, y = load_and_preprocess_data(input_file)
+    # Load and preprocess data
+    x, y = load_and_preprocess_data(input_file)
 
-        # Apply time vector
-        time_vector = np.linspace(0, len(x) / fs, len(x))
+    # Apply time vector
+    time_vector = np.linspace(0, len(x) / fs, len(x))
 
-        # Apply Butterworth low-pass filter with padding
-        x_filtered = butter_lowpass_filter(
-            x, cutoff=cutoff, fs=fs, order=4, padding=True
-        )
-        y_filtered = butter_lowpass_filter(
-            y, cutoff=cutoff, fs=fs, order=4, padding=True
-        )
+    # Apply Butterworth low-pass filter with padding
+    x_filtered = butter_lowpass_filter(x, cutoff=cutoff, fs=fs, order=4, padding=True)
+    y_filtered = butter_lowpass_filter(y, cutoff=cutoff, fs=fs, order=4, padding=True)
 
-        # Adjust x and y to stay within the bounds
+    # Adjust x and y to stay within the bounds (the default 60x60 cm arena only;
+    # with a zone file, samples outside all zones are reported as "outside")
+    if zone_raster is None:
         x_filtered, y_filtered = adjust_to_bounds(
             x_filtered, y_filtered, xmin=0, xmax=0.6, ymin=0, ymax=0.6
         )
 
-        # Calculate kinematics
-        (
-            distance,
-            speed,
-            time_stationary,
-            speed_range_counts_frames,
-            speed_range_counts_seconds,
-            zones_count,
-            zones_percentage,
-            zones_distance,
-            center_border_results,
-        ) = calculate_kinematics(x_filtered, y_filtered, fs)
-
-        # Save results and data
-        results = {
-            "zone_counts": zones_count,
-            "zone_percentages": zones_percentage,
-            "time_stationary": time_stationary,
-            "speed_range_counts_frames": speed_range_counts_frames,
-            "speed_range_counts_seconds": speed_range_counts_seconds,
-        }
+    # Calculate kinematics
+    (
+        distance,
+        speed,
+        time_stationary,
+        speed_range_counts_frames,
+        speed_range_counts_seconds,
+        zones_count,
+        zones_percentage,
+        zones_distance,
+        center_border_results,
+    ) = calculate_kinematics(x_filtered, y_filtered, fs, zone_raster)
+
+    # Save results and data
+    results = {
+        "zone_counts": zones_count,
+        "zone_percentages": zones_percentage,
+        "time_stationary": time_stationary,
+        "speed_range_counts_frames": speed_range_counts_frames,
+        "speed_range_counts_seconds": speed_range_counts_seconds,
+    }
+    if zone_raster is not None:
+        save_zone_file_results_to_csv(results, zones_distance, output_dir, base_name)
+    else:
         save_results_to_csv(
             results, center_border_results, zones_distance, fs, output_dir, base_name
         )
-        save_position_data(
-            time_vector, x_filtered, y_filtered, distance, speed, output_dir, base_name
-        )
+    save_position_data(
+        time_vector, x_filtered, y_filtered, distance, speed, output_dir, base_name
+    )
 
-        # Generate visualizations
-        plot_pathway(
-            x_filtered, y_filtered, time_vector, sum(distance), output_dir, base_name
+    # Occupancy grid over the arena (or all arenas of the zone file), cached for
+    # group heatmaps
+    bounds = zone_raster.bounds if zone_raster is not None else (0, 0.6, 0, 0.6)
+    counts, x_edges, y_edges = occupancy_grid(x_filtered, y_filtered, bounds, bin_size)
+    save_occupancy_grid(counts, x_edges, y_edges, fs, output_dir, base_name)
+
+    return {
+        "base_name": base_name,
+        "output_dir": output_dir,
+        "time_vector": time_vector,
+        "x": x_filtered,
+        "y": y_filtered,
+        "distance": distance,
+        "speed": speed,
+        "results": results,
+        "center_border_results": center_border_results,
+        "occupancy": {"counts": counts, "x_edges": x_edges, "y_edges": y_edges},
+    }
+
+
+def plot_open_field_data(analysis, fs, zone_raster=None, sigma=0.02):
+    """
+    Renders all figures of one file from the output of `analyze_open_field_data`;
+    `sigma` is the Gaussian smoothing of the heatmaps in meters.
+    """
+    x, y = analysis["x"], analysis["y"]
+    output_dir, base_name = analysis["output_dir"], analysis["base_name"]
+    results = analysis["results"]
+
+    plot_pathway(
+        x,
+        y,
+        analysis["time_vector"],
+        sum(analysis["distance"]),
+        output_dir,
+        base_name,
+        zone_raster,
+    )
+    if zone_raster is not None:
+        plot_zone_map(x, y, zone_raster, output_dir, base_name, results)
+    else:
+        plot_heatmap(
+            x, y, output_dir, base_name, results, analysis["occupancy"], sigma
         )
-        plot_heatmap(x_filtered, y_filtered, output_dir, base_name, results)
         plot_center_and_border_heatmap(
-            x_filtered, y_filtered, output_dir, base_name, center_border_results
-        )
-        plot_speed_ranges(
-            speed_range_counts_frames, time_stationary, fs, output_dir, base_name
-        )
-        plot_speed_over_time_with_tags(
-            time_vector, speed, int(2 * fs), output_dir, base_name
+            x,
+            y,
+            output_dir,
+            base_name,
+            analysis["center_border_results"],
+            analysis["occupancy"],
+            sigma,
         )
+    plot_speed_ranges(
+        results["speed_range_counts_frames"],
+        results["time_stationary"],
+        fs,
+        output_dir,
+        base_name,
+    )
+    plot_speed_over_time_with_tags(
+        analysis["time_vector"], analysis["speed"], int(2 * fs), output_dir, base_name
+    )
+
 
+def process_open_field_data(input_file, main_output_dir, fs, cutoff, zone_raster=None):
+    try:
+        analysis = analyze_open_field_data(
+            input_file, main_output_dir, fs, cutoff, zone_raster
+        )
+        plot_open_field_data(analysis, fs, zone_raster)
         print(f"Processing of file {input_file} completed successfully.")
     except Exception as e:
         print(f"An error occurred while processing {input_file}: {e}")
         raise
 
 
-def process_all_files_in_directory(target_dir, fs, cutoff):
+def _analysis_worker(args):
+    input_file = args[0]
+    try:
+        return analyze_open_field_data(*args), None
+    except Exception as e:
+        return None, f"{os.path.basename(input_file)}: {e}"
+
+
+def _init_plot_worker():
+    # Plot workers render off-screen only
+    plt.switch_backend("Agg")
+
+
+def _plot_worker(analysis, fs, zone_raster, sigma):
+    try:
+        plot_open_field_data(analysis, fs, zone_raster, sigma)
+        return None
+    except Exception as e:
+        return f"{analysis['base_name']} (figures): {e}"
+
+
+def merge_summaries(main_output_dir, base_names):
+    """
+    Merges the per-file `<file>_summary_zones.csv` rows into one per-animal table
+    `openfield_summary_all.csv` with a leading `file` column.
+
+    Returns:
+        str: Path of the merged CSV, or None if there was nothing to merge.
+    """
+    header, rows = None, []
+    for base_name in sorted(base_names):
+        summary_file = os.path.join(
+            main_output_dir, base_name, f"{base_name}_summary_zones.csv"
+        )
+        with open(summary_file, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        header = header or lines[0]
+        rows.extend(f"{base_name},{line}" for line in lines[1:] if line)
+    if header is None:
+        return None
+
+    merged_file = os.path.join(main_output_dir, "openfield_summary_all.csv")
+    with open(merged_file, "w", encoding="utf-8") as f:
+        f.write(f"file,{header}\n")
+        f.write("\n".join(rows) + "\n")
+    print(f"Merged summary saved to: {merged_file}")
+    return merged_file
+
+
+def process_all_files_in_directory(
+    target_dir,
+    fs,
+    cutoff,
+    zone_file=None,
+    metrics_only=False,
+    max_workers=None,
+    bin_size=0.01,
+    sigma=0.02,
+):
     """
     Processes all files in the selected directory, applying the specified
     sampling frequency and cutoff frequency for the Butterworth filter.
 
+    The numeric analysis runs in a process pool; as each file finishes, its figures are
+    queued on a second pool of Agg-backed plotting workers, so rendering overlaps with
+    the analysis of the remaining files. The run ends with `openfield_summary_all.csv`
+    (one row per animal), the group average heatmap of the cached occupancy grids and
+    `log_errors.txt` if any file failed (analysis or figures).
+
     Args:
         target_dir (str): Directory containing CSV files.
         fs (float): Sampling frequency in Hz.
         cutoff (float): Butterworth filter cutoff frequency in Hz.
+        zone_file (str, optional): TOML zone file replacing the default 3x3 grid.
+        metrics_only (bool): Skip all figures.
+        max_workers (int, optional): Processes per pool (default: all CPUs).
+        bin_size (float): Bin size of the occupancy grids in meters.
+        sigma (float): Gaussian smoothing of the heatmaps in meters (0 for none).
+
+    Returns:
+        str: The output directory.
+        list: Names of the files that failed, empty if all succeeded.
     """
+    zone_raster = None
+    if zone_file:
+        zones, resolution = load_zone_file(zone_file)
+        zone_raster = ZoneRaster(zones, resolution)
+        print(
+            f"Loaded {len(zones)} zones from {zone_file} "
+            f"(raster {zone_raster.shape[1]}x{zone_raster.shape[0]} at {resolution} m)"
+        )
+
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     main_output_dir = os.path.join(target_dir, f"openfield_results_{timestamp}")
     os.makedirs(main_output_dir, exist_ok=True)
-    csv_files = [
+    csv_files = sorted(
         os.path.join(target_dir, f)
         for f in os.listdir(target_dir)
         if f.endswith(".csv")
+    )
+    tasks = [
+        (f, main_output_dir, fs, cutoff, zone_raster, bin_size) for f in csv_files
     ]
-    for input_file in csv_files:
-        print(f"Processing file: {input_file}")
-        process_open_field_data(input_file, main_output_dir, fs, cutoff)
-    print("All files have been processed successfully.")
+
+    base_names, errors, plot_jobs = [], [], {}
+    failed = set()
+    plot_pool = (
+        None
+        if metrics_only
+        else ProcessPoolExecutor(max_workers=max_workers, initializer=_init_plot_worker)
+    )
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as analysis_pool:
+            futures = {
+                analysis_pool.submit(_analysis_worker, task): os.path.basename(task[0])
+                for task in tasks
+            }
+            for i, future in enumerate(as_completed(futures), start=1):
+                analysis, error = future.result()
+                if error:
+                    errors.append(error)
+                    failed.add(futures[future])
+                    print(f"[{i}/{len(tasks)}] Error: {error}")
+                    continue
+                base_names.append(analysis["base_name"])
+                print(f"[{i}/{len(tasks)}] {analysis['base_name']}: metrics done")
+                if plot_pool is not None:
+                    job = plot_pool.submit(
+                        _plot_worker, analysis, fs, zone_raster, sigma
+                    )
+                    plot_jobs[job] = futures[future]
+
+        for job in as_completed(plot_jobs):
+            error = job.result()
+            if error:
+                errors.append(error)
+                failed.add(plot_jobs[job])
+                print(f"Error: {error}")
+    finally:
+        if plot_pool is not None:
+            plot_pool.shutdown()
+
+    merge_summaries(main_output_dir, base_names)
+    if not metrics_only and base_names:
+        group_average_heatmap(main_output_dir, sigma)
+    if errors:
+        with open(os.path.join(main_output_dir, "log_errors.txt"), "w") as f:
+            f.write("\n".join(errors) + "\n")
+        print(
+            f"Processing finished: {len(failed)} of {len(csv_files)} files failed "
+            f"(see {os.path.join(main_output_dir, 'log_errors.txt')})."
+        )
+    else:
+        print("All files have been processed successfully.")
+    return main_output_dir, sorted(failed)
 
 
 def run_animal_open_field():
@@ -951,12 +1500,49 @@ def run_animal_open_field():
         messagebox.showwarning("Warning", "Cutoff frequency not provided.")
         return
 
+    # Optional zone definitions (multi-arena, circular or polygonal zones)
+    zone_file = None
+    if messagebox.askyesno(
+        "Zone File",
+        "Do you want to load the zone definitions from a TOML file?\n"
+        "(No: default 60x60 cm arena with a 3x3 grid)",
+    ):
+        zone_file = filedialog.askopenfilename(
+            title="Select the zone file", filetypes=[("TOML files", "*.toml")]
+        )
+
+    metrics_only = messagebox.askyesno(
+        "Metrics Only", "Compute the metrics only (skip all figures)?"
+    )
+
+    # Ask user to input the heatmap bin size (m)
+    bin_size = simpledialog.askfloat(
+        "Heatmap Bin Size",
+        "Enter the bin size of the occupancy heatmaps (m):",
+        initialvalue=0.01,
+        minvalue=0.001,
+    )
+
     # Process all files in the selected directory
-    process_all_files_in_directory(target_dir, fs, cutoff)
-    root.destroy()
-    messagebox.showinfo(
-        "Success", "All .csv files have been processed and results saved."
+    main_output_dir, failed = process_all_files_in_directory(
+        target_dir,
+        fs,
+        cutoff,
+        zone_file or None,
+        metrics_only,
+        bin_size=bin_size or 0.01,
     )
+    root.destroy()
+    if failed:
+        messagebox.showwarning(
+            "Warning",
+            f"{len(failed)} file(s) failed: {', '.join(failed)}\n"
+            f"See {os.path.join(main_output_dir, 'log_errors.txt')}",
+        )
+    else:
+        messagebox.showinfo(
+            "Success", "All .csv files have been processed and results saved."
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,421 @@
+"""
+Module: c3d_index.py
+Description:
+This module builds a persistent SQLite index of the .c3d files in a directory tree.
+Only the header and parameter section of each file are read (through
+`C3DStreamReader`), so marker labels, point/analog rates, frame counts, analog
+channels and events of thousands of trials can be listed and filtered in seconds,
+without loading any point or analog data.
+
+The main features of this module include:
+- **Header-Only Scanner**: `read_c3d_metadata` returns the metadata of one file.
+- **Incremental Updates**: `update_c3d_index` rescans only new or modified files
+  (size or modification time changed) and drops files that no longer exist.
+- **Queries**: `query_c3d_index` filters trials by marker label, analog channel,
+  event label, rates and frame counts and returns a pandas DataFrame.
+- **Content Hash**: A SHA-1 of the header and parameter blocks is always stored;
+  a SHA-256 of the full file can be requested with `full_hash=True`.
+
+Author: Prof. Dr. Paulo R. P. Santiago
+Version: 1.0
+Date: 2024-12-20
+
+Usage:
+```python
+from vaila.c3d_index import update_c3d_index, query_c3d_index
+
+db_path = update_c3d_index("/data/trials")
+df = query_c3d_index(db_path, marker="LASI", min_frames=1000)
+```
+
+Command line:
+$ python -m vaila.c3d_index /data/trials --marker LASI --min-frames 1000
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+from datetime import datetime
+import pandas as pd
+from vaila.readc3d_stream import C3DStreamReader
+
+DEFAULT_INDEX_NAME = ".vaila_c3d_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    path TEXT PRIMARY KEY,
+    file_name TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    meta_hash TEXT,
+    file_hash TEXT,
+    n_markers INTEGER,
+    marker_freq REAL,
+    n_frames INTEGER,
+    first_frame INTEGER,
+    duration REAL,
+    n_analog_channels INTEGER,
+    analog_freq REAL,
+    analog_per_frame INTEGER,
+    marker_labels TEXT,
+    analog_labels TEXT,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS labels (
+    path TEXT,
+    kind TEXT,
+    idx INTEGER,
+    label TEXT,
+    unit TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    path TEXT,
+    context TEXT,
+    label TEXT,
+    time REAL,
+    frame INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_labels_label ON labels (label, kind);
+CREATE INDEX IF NOT EXISTS idx_labels_path ON labels (path);
+CREATE INDEX IF NOT EXISTS idx_events_label ON events (label);
+CREATE INDEX IF NOT EXISTS idx_events_path ON events (path);
+"""
+
+
+def _file_sha256(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_c3d_metadata(file_path, full_hash=False):
+    """
+    Reads the metadata of a .c3d file from its header and parameter section only.
+
+    Parameters:
+    - file_path: str
+        Path to the .c3d file.
+    - full_hash: bool, default=False
+        Also compute a SHA-256 of the whole file (reads all the data).
+
+    Returns:
+    - metadata: dict
+        File information, rates, frame counts, marker/analog labels and units and
+        a list of events (context, label, time, frame).
+    """
+    stat = os.stat(file_path)
+    with C3DStreamReader(file_path) as reader:
+        with open(file_path, "rb") as f:
+            meta_hash = hashlib.sha1(f.read(reader.data_offset)).hexdigest()
+
+        events = []
+        event_group = reader.parameters.get("EVENT", {})
+        if all(key in event_group for key in ("CONTEXTS", "LABELS", "TIMES")):
+            times = event_group["TIMES"]["value"]
+            times = times[1, :] if getattr(times, "ndim", 1) == 2 else times
+            for context, label, event_time in zip(
+                event_group["CONTEXTS"]["value"],
+                event_group["LABELS"]["value"],
+                times,
+            ):
+                events.append(
+                    {
+                        "context": context,
+                        "label": label,
+                        "time": float(event_time),
+                        "frame": int(round(event_time * reader.marker_freq)),
+                    }
+                )
+
+        return {
+            "path": os.path.abspath(file_path),
+            "file_name": os.path.basename(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "meta_hash": meta_hash,
+            "file_hash": _file_sha256(file_path) if full_hash else None,
+            "n_markers": reader.point_count,
+            "marker_freq": reader.marker_freq,
+            "n_frames": reader.n_frames,
+            "first_frame": reader.first_frame,
+            "duration": reader.n_frames / reader.marker_freq
+            if reader.marker_freq
+            else 0.0,
+            "n_analog_channels": reader.n_channels,
+            "analog_freq": reader.analog_freq,
+            "analog_per_frame": reader.analog_per_frame,
+            "marker_labels": list(reader.marker_labels),
+            "analog_labels": list(reader.analog_labels),
+            "analog_units": list(reader.analog_units),
+            "events": events,
+        }
+
+
+def open_c3d_index(db_path):
+    """
+    Opens (and creates if needed) the SQLite index at `db_path`.
+    """
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _store_metadata(connection, metadata):
+    path = metadata["path"]
+    connection.execute("DELETE FROM labels WHERE path = ?", (path,))
+    connection.execute("DELETE FROM events WHERE path = ?", (path,))
+    connection.execute(
+        """
+        INSERT OR REPLACE INTO trials VALUES
+        (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            path,
+            metadata["file_name"],
+            metadata["size"],
+            metadata["mtime_ns"],
+            metadata["meta_hash"],
+            metadata["file_hash"],
+            metadata["n_markers"],
+            metadata["marker_freq"],
+            metadata["n_frames"],
+            metadata["first_frame"],
+            metadata["duration"],
+            metadata["n_analog_channels"],
+            metadata["analog_freq"],
+            metadata["analog_per_frame"],
+            json.dumps(metadata["marker_labels"]),
+            json.dumps(metadata["analog_labels"]),
+            datetime.now().isoformat(timespec="seconds"),
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO labels VALUES (?, ?, ?, ?, ?)",
+        [
+            (path, "marker", idx, label, None)
+            for idx, label in enumerate(metadata["marker_labels"])
+        ]
+        + [
+            (path, "analog", idx, label, unit)
+            for idx, (label, unit) in enumerate(
+                zip(metadata["analog_labels"], metadata["analog_units"])
+            )
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO events VALUES (?, ?, ?, ?, ?)",
+        [
+            (path, event["context"], event["label"], event["time"], event["frame"])
+            for event in metadata["events"]
+        ],
+    )
+
+
+def _escape_like(text):
+    """Escapes the LIKE wildcards of `text` (use with ESCAPE '\\')."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _delete_trial(connection, path):
+    for table in ("trials", "labels", "events"):
+        connection.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+
+def update_c3d_index(directory, db_path=None, recursive=True, full_hash=False):
+    """
+    Creates or incrementally updates the SQLite index of the .c3d files in `directory`.
+
+    Files whose size and modification time match the index are skipped, new and
+    modified files are rescanned and files that disappeared are removed.
+
+    Parameters:
+    - directory: str
+        Root directory of the trial repository.
+    - db_path: str, optional
+        SQLite file. Defaults to `<directory>/.vaila_c3d_index.sqlite`.
+    - recursive: bool, default=True
+        Also index sub-directories.
+    - full_hash: bool, default=False
+        Store a SHA-256 of each (re)scanned file.
+
+    Returns:
+    - db_path: str
+        Path of the SQLite index.
+    """
+    directory = os.path.abspath(directory)
+    db_path = db_path or os.path.join(directory, DEFAULT_INDEX_NAME)
+    start = time.perf_counter()
+
+    if recursive:
+        found = [
+            os.path.join(root, name)
+            for root, _, files in os.walk(directory)
+            for name in files
+            if name.lower().endswith(".c3d")
+        ]
+    else:
+        found = [
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.lower().endswith(".c3d")
+        ]
+    found = sorted(os.path.abspath(path) for path in found)
+
+    connection = open_c3d_index(db_path)
+    try:
+        # Exact (case-sensitive, wildcard-free) prefix test on the directory
+        prefix = os.path.join(directory, "")
+        indexed = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in connection.execute(
+                "SELECT path, size, mtime_ns FROM trials WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+            if recursive or os.path.dirname(path) == directory
+        }
+
+        n_updated, n_skipped, errors = 0, 0, []
+        for path in found:
+            stat = os.stat(path)
+            if indexed.get(path) == (stat.st_size, stat.st_mtime_ns):
+                n_skipped += 1
+                continue
+            try:
+                _store_metadata(connection, read_c3d_metadata(path, full_hash))
+                n_updated += 1
+            except Exception as e:
+                errors.append((path, str(e)))
+                print(f"Error indexing {path}: {e}")
+
+        found_set = set(found)
+        removed = [path for path in indexed if path not in found_set]
+        for path in removed:
+            _delete_trial(connection, path)
+        connection.commit()
+    finally:
+        connection.close()
+
+    print(
+        f"C3D index updated in {time.perf_counter() - start:.2f} s: "
+        f"{n_updated} scanned, {n_skipped} unchanged, {len(removed)} removed, "
+        f"{len(errors)} failed. Index: {db_path}"
+    )
+    return db_path
+
+
+def query_c3d_index(
+    db_path,
+    marker=None,
+    analog=None,
+    event=None,
+    marker_freq=None,
+    analog_freq=None,
+    min_frames=None,
+    max_frames=None,
+    path_contains=None,
+):
+    """
+    Lists the indexed trials matching all the given filters.
+
+    Parameters:
+    - db_path: str
+        SQLite index created by `update_c3d_index`.
+    - marker, analog, event: str or list of str, optional
+        Required marker labels, analog channel labels or event labels.
+    - marker_freq, analog_freq: float, optional
+        Required sampling rates in Hz.
+    - min_frames, max_frames: int, optional
+        Range of point frame counts.
+    - path_contains: str, optional
+        Substring that the file path must contain (taken literally; ASCII letters
+        match case-insensitively).
+
+    Returns:
+    - trials_df: pandas.DataFrame
+        One row per trial with the `trials` table columns (labels as lists).
+    """
+    conditions, params = [], []
+
+    def require(values, subquery):
+        if values is None:
+            return
+        for value in [values] if isinstance(values, str) else values:
+            conditions.append(f"path IN ({subquery})")
+            params.append(value)
+
+    require(marker, "SELECT path FROM labels WHERE kind = 'marker' AND label = ?")
+    require(analog, "SELECT path FROM labels WHERE kind = 'analog' AND label = ?")
+    require(event, "SELECT path FROM events WHERE label = ?")
+
+    for column, value, operator in (
+        ("marker_freq", marker_freq, "="),
+        ("analog_freq", analog_freq, "="),
+        ("n_frames", min_frames, ">="),
+        ("n_frames", max_frames, "<="),
+    ):
+        if value is not None:
+            conditions.append(f"{column} {operator} ?")
+            params.append(value)
+    if path_contains:
+        conditions.append("path LIKE ? ESCAPE '\\'")
+        params.append(f"%{_escape_like(path_contains)}%")
+
+    query = "SELECT * FROM trials"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY path"
+
+    connection = open_c3d_index(db_path)
+    try:
+        trials_df = pd.read_sql_query(query, connection, params=params)
+    finally:
+        connection.close()
+
+    for column in ("marker_labels", "analog_labels"):
+        trials_df[column] = trials_df[column].map(json.loads)
+    return trials_df
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build/update a metadata index of .c3d files and query it."
+    )
+    parser.add_argument("directory", help="Root directory of the .c3d files")
+    parser.add_argument("--db", default=None, help="SQLite index file")
+    parser.add_argument("--no-recursive", action="store_true")
+    parser.add_argument("--full-hash", action="store_true")
+    parser.add_argument("--marker", action="append", help="Required marker label")
+    parser.add_argument("--analog", action="append", help="Required analog label")
+    parser.add_argument("--event", action="append", help="Required event label")
+    parser.add_argument("--marker-freq", type=float)
+    parser.add_argument("--min-frames", type=int)
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--output", help="Save the query result to this CSV file")
+    args = parser.parse_args()
+
+    db_path = update_c3d_index(
+        args.directory, args.db, not args.no_recursive, args.full_hash
+    )
+    trials_df = query_c3d_index(
+        db_path,
+        marker=args.marker,
+        analog=args.analog,
+        event=args.event,
+        marker_freq=args.marker_freq,
+        min_frames=args.min_frames,
+        max_frames=args.max_frames,
+    )
+    columns = ["file_name", "n_markers", "marker_freq", "n_frames", "analog_freq"]
+    print(trials_df[columns].to_string(index=False))
+    if args.output:
+        trials_df.to_csv(args.output, index=False)
+        print(f"Query result saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
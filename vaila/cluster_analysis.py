@@ -5,8 +5,8 @@ cluster_analysis.py
 Cluster Data Analysis Toolkit for Motion Capture
 ================================================================================
 Author: Prof. Dr. Paulo R. P. Santiago
-Date: 2024-07-19
-Version: 1.0
+Date: 2026-10-18
+Version: 1.1
 
 Overview:
 
@@ -89,6 +89,12 @@ Notes:
     - A Butterworth filter is applied to reduce noise in the marker data.
     - Euler angles and orthonormal bases are calculated for each cluster.
 
+Changelog for Version 1.1:
+
+    - Per-file computation moved to `compute_cluster_kinematics` (both clusters in one pass with
+      `segment_kinematics`) and the angle figure to `plot_euler_angles`, shared with the headless
+      batch mode (`python -m vaila.mocap_batch config.toml`, see mocap_batch.py).
+
 Changelog for Version 1.0:
 
     - Initial release with support for reading, filtering, and processing motion capture data.
@@ -111,7 +117,7 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 from tkinter import messagebox, filedialog, Tk
 from vaila.filtering import apply_filter
-from vaila.rotation import createortbase, calcmatrot, rotmat2euler
+from vaila.segment_kinematics import compute_segment_kinematics
 from vaila.plotting import plot_orthonormal_bases
 from vaila.readcsv import get_csv_headers, select_headers_gui
 from vaila.dialogsuser_cluster import get_user_inputs
@@ -159,6 +165,175 @@ def read_anatomical_csv(file_path):
         return None
 
 
+def compute_cluster_kinematics(
+    data,
+    sample_rate,
+    cluster1_config,
+    cluster2_config,
+    anatomical_data=None,
+    filter_method="butterworth",
+):
+    """
+    Filters the 18 marker columns of one trial and computes both cluster bases and
+    Euler angles (minus the anatomical medians when given).
+
+    Parameters:
+    - data: ndarray (frames, 18), P1, P2, P3 of cluster 1 then of cluster 2 (x, y, z).
+    - sample_rate: float, Hz.
+    - cluster1_config, cluster2_config: str, 'A', 'B', 'C' or 'D'.
+    - anatomical_data: dict with "cluster1"/"cluster2" medians or None.
+    - filter_method: str, 'butterworth' or 'fir' (see `vaila.filtering.apply_filter`).
+
+    Returns:
+    - dict with "time", "points", "bases", "origins" and "euler" (one entry per cluster).
+    """
+    time = np.linspace(0, len(data) / sample_rate, len(data))
+    dataf = apply_filter(data, sample_rate, method=filter_method)
+
+    # Both clusters are built in one pass; same results as createortbase/calcmatrot/rotmat2euler
+    kinematics = compute_segment_kinematics(
+        dataf.reshape(len(dataf), 6, 3),
+        [
+            {"segment": "cluster1", "markers": [0, 1, 2], "configuration": cluster1_config},
+            {"segment": "cluster2", "markers": [3, 4, 5], "configuration": cluster2_config},
+        ],
+    )
+    euler = list(kinematics["euler"])
+    if anatomical_data:
+        euler[0] = euler[0] - anatomical_data["cluster1"]
+        euler[1] = euler[1] - anatomical_data["cluster2"]
+
+    points = [dataf[:, i : i + 3] for i in range(0, 18, 3)]
+    return {
+        "time": time,
+        "points": [points[:3], points[3:]],
+        "bases": list(kinematics["bases"]),
+        "origins": list(kinematics["origins"]),
+        "euler": euler,
+    }
+
+
+def plot_euler_angles(
+    fig,
+    time,
+    cluster1_euler_angles,
+    cluster2_euler_angles,
+    file_name,
+    cluster1_name="Cluster1",
+    cluster2_name="Cluster2",
+    anatomical_data=None,
+):
+    """Draws the X, Y and Z Euler angles of both clusters on `fig` (pyplot or Agg Figure)."""
+    use_anatomical = bool(anatomical_data)
+    if use_anatomical:
+        cluster1_euler_angles_anat = anatomical_data["cluster1"]
+        cluster2_euler_angles_anat = anatomical_data["cluster2"]
+
+    max_val = np.max([cluster1_euler_angles, cluster2_euler_angles])
+    min_val = np.min([cluster1_euler_angles, cluster2_euler_angles])
+
+    axes = fig.subplots(3, 1)
+
+    axes[0].plot(
+        time,
+        cluster1_euler_angles[:, 0],
+        label=f"{cluster1_name} X [Ext. backward (+) Flex. forward (-)]",
+        color="red",
+    )
+    axes[0].plot(
+        time,
+        cluster2_euler_angles[:, 0],
+        label=f"{cluster2_name} X [Ext. backward (+) Flex. forward (-)]",
+        linestyle="--",
+        color="red",
+    )
+    if use_anatomical and anatomical_data:
+        axes[0].axhline(
+            cluster1_euler_angles_anat[0],
+            color="gray",
+            linestyle="-",
+            label=f"Anatomical {cluster1_name} X",
+        )
+        axes[0].axhline(
+            cluster2_euler_angles_anat[0],
+            color="gray",
+            linestyle="--",
+            label=f"Anatomical {cluster2_name} X",
+        )
+    axes[0].set_xlabel("Time (s)")
+    axes[0].set_ylabel("X: Ext(+)/Flex(-) (degrees)")
+    axes[0].legend()
+    axes[0].set_title(f"Euler Angles - {file_name} (X-axis)")
+
+    axes[1].plot(
+        time,
+        cluster1_euler_angles[:, 1],
+        label=f"{cluster1_name} Y [Side Bending Right (+) Side Bending Left (-)]",
+        color="green",
+    )
+    axes[1].plot(
+        time,
+        cluster2_euler_angles[:, 1],
+        label=f"{cluster2_name} Y [Side Bending Right (+) Side Bending Left (-)]",
+        linestyle="--",
+        color="green",
+    )
+    if use_anatomical and anatomical_data:
+        axes[1].axhline(
+            cluster1_euler_angles_anat[1],
+            color="gray",
+            linestyle="-",
+            label=f"Anatomical {cluster1_name} Y",
+        )
+        axes[1].axhline(
+            cluster2_euler_angles_anat[1],
+            color="gray",
+            linestyle="--",
+            label=f"Anatomical {cluster2_name} Y",
+        )
+    axes[1].set_xlabel("Time (s)")
+    axes[1].set_ylabel("Y: Side Bending R(+)/L(-) (degrees)")
+    axes[1].legend()
+    axes[1].set_title(f"Euler Angles - {file_name} (Y-axis)")
+
+    axes[2].plot(
+        time,
+        cluster1_euler_angles[:, 2],
+        label=f"{cluster1_name} Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
+        color="blue",
+    )
+    axes[2].plot(
+        time,
+        cluster2_euler_angles[:, 2],
+        label=f"{cluster2_name} Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
+        linestyle="--",
+        color="blue",
+    )
+    if use_anatomical and anatomical_data:
+        axes[2].axhline(
+            cluster1_euler_angles_anat[2],
+            color="gray",
+            linestyle="-",
+            label=f"Anatomical {cluster1_name} Z",
+        )
+        axes[2].axhline(
+            cluster2_euler_angles_anat[2],
+            color="gray",
+            linestyle="--",
+            label=f"Anatomical {cluster2_name} Z",
+        )
+    axes[2].set_xlabel("Time (s)")
+    axes[2].set_ylabel("Z: Axial Rot. R(+)/L(-) (degrees)")
+    axes[2].legend()
+    axes[2].set_title(f"Euler Angles - {file_name} (Z-axis)")
+
+    margin = 0.05 * (max_val - min_val)
+    axes[0].set_ylim([min_val - margin, max_val + margin])
+    axes[1].set_ylim([min_val - margin, max_val + margin])
+    axes[2].set_ylim([min_val - margin, max_val + margin])
+    return fig
+
+
 def analyze_cluster_data():
     # Print the directory and name of the script being executed
     print(f"Running script: {os.path.basename(__file__)}")
@@ -313,47 +488,24 @@ def analyze_cluster_data():
 
         print(f"Data shape: {data.shape}")
 
-        # Create time vector
-        time = np.linspace(0, len(data) / sample_rate, len(data))
-        print(f"Time vector created with length: {len(time)}")
-
-        # Insert time column in the data in the first column
-        data = np.insert(data, 0, time, axis=1)
-
-        print(f"Data after time column adjustments: {data.shape}")
-
-        # Apply filter to the data
-        dataf = apply_filter(data[:, 1:], sample_rate, method=filter_method)
-
-        print(f"Data after filtering: {dataf.shape}")
-
-        # Extract points based on user input
-        points = [dataf[:, i : i + 3] for i in range(0, 18, 3)]
-        cluster1_p1, cluster1_p2, cluster1_p3, cluster2_p1, cluster2_p2, cluster2_p3 = (
-            points
-        )
-
-        print("Points extracted for clusters")
-
-        blab = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
-
-        cluster1_base, orig_cluster1 = createortbase(
-            cluster1_p1, cluster1_p2, cluster1_p3, cluster1_config
-        )
-        cluster2_base, orig_cluster2 = createortbase(
-            cluster2_p1, cluster2_p2, cluster2_p3, cluster2_config
+        result = compute_cluster_kinematics(
+            data,
+            sample_rate,
+            cluster1_config,
+            cluster2_config,
+            anatomical_data if use_anatomical else None,
+            filter_method,
         )
+        time = result["time"]
+        cluster1_euler_angles, cluster2_euler_angles = result["euler"]
 
         print("Orthonormal bases created")
 
         if show_figures:
             fig_matplotlib = plot_orthonormal_bases(
-                bases_list=[cluster1_base, cluster2_base],
-                pm_list=[orig_cluster1, orig_cluster2],
-                points_list=[
-                    [cluster1_p1, cluster1_p2, cluster1_p3],
-                    [cluster2_p1, cluster2_p2, cluster2_p3],
-                ],
+                bases_list=result["bases"],
+                pm_list=result["origins"],
+                points_list=result["points"],
                 labels=[cluster1_name, cluster2_name],  # Use user-defined cluster names
                 title=f"Cluster Bases - {file_name}",
                 global_coordinate_system=None,
@@ -363,121 +515,17 @@ def analyze_cluster_data():
             matplotlib_figs.append(fig_matplotlib)
             plt.show()
 
-        cluster1_rotmat = calcmatrot(cluster1_base, blab)
-        cluster2_rotmat = calcmatrot(cluster2_base, blab)
-
-        cluster1_euler_angles = rotmat2euler(cluster1_rotmat)
-        cluster2_euler_angles = rotmat2euler(cluster2_rotmat)
-
-        if use_anatomical and anatomical_data:
-            cluster1_euler_angles_anat = anatomical_data["cluster1"]
-            cluster2_euler_angles_anat = anatomical_data["cluster2"]
-            cluster1_euler_angles -= cluster1_euler_angles_anat
-            cluster2_euler_angles -= cluster2_euler_angles_anat
-
-        max_val = np.max([cluster1_euler_angles, cluster2_euler_angles])
-        min_val = np.min([cluster1_euler_angles, cluster2_euler_angles])
-
-        fig, axes = plt.subplots(3, 1, figsize=(10, 12))
-
-        axes[0].plot(
+        fig = plt.figure(figsize=(10, 12))
+        plot_euler_angles(
+            fig,
             time,
-            cluster1_euler_angles[:, 0],
-            label=f"{cluster1_name} X [Ext. backward (+) Flex. forward (-)]",
-            color="red",
-        )
-        axes[0].plot(
-            time,
-            cluster2_euler_angles[:, 0],
-            label=f"{cluster2_name} X [Ext. backward (+) Flex. forward (-)]",
-            linestyle="--",
-            color="red",
-        )
-        if use_anatomical and anatomical_data:
-            axes[0].axhline(
-                cluster1_euler_angles_anat[0],
-                color="gray",
-                linestyle="-",
-                label=f"Anatomical {cluster1_name} X",
-            )
-            axes[0].axhline(
-                cluster2_euler_angles_anat[0],
-                color="gray",
-                linestyle="--",
-                label=f"Anatomical {cluster2_name} X",
-            )
-        axes[0].set_xlabel("Time (s)")
-        axes[0].set_ylabel("X: Ext(+)/Flex(-) (degrees)")
-        axes[0].legend()
-        axes[0].set_title(f"Euler Angles - {file_name} (X-axis)")
-
-        axes[1].plot(
-            time,
-            cluster1_euler_angles[:, 1],
-            label=f"{cluster1_name} Y [Side Bending Right (+) Side Bending Left (-)]",
-            color="green",
-        )
-        axes[1].plot(
-            time,
-            cluster2_euler_angles[:, 1],
-            label=f"{cluster2_name} Y [Side Bending Right (+) Side Bending Left (-)]",
-            linestyle="--",
-            color="green",
-        )
-        if use_anatomical and anatomical_data:
-            axes[1].axhline(
-                cluster1_euler_angles_anat[1],
-                color="gray",
-                linestyle="-",
-                label=f"Anatomical {cluster1_name} Y",
-            )
-            axes[1].axhline(
-                cluster2_euler_angles_anat[1],
-                color="gray",
-                linestyle="--",
-                label=f"Anatomical {cluster2_name} Y",
-            )
-        axes[1].set_xlabel("Time (s)")
-        axes[1].set_ylabel("Y: Side Bending R(+)/L(-) (degrees)")
-        axes[1].legend()
-        axes[1].set_title(f"Euler Angles - {file_name} (Y-axis)")
-
-        axes[2].plot(
-            time,
-            cluster1_euler_angles[:, 2],
-            label=f"{cluster1_name} Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
-            color="blue",
-        )
-        axes[2].plot(
-            time,
-            cluster2_euler_angles[:, 2],
-            label=f"{cluster2_name} Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
-            linestyle="--",
-            color="blue",
+            cluster1_euler_angles,
+            cluster2_euler_angles,
+            file_name,
+            cluster1_name,
+            cluster2_name,
+            anatomical_data if use_anatomical else None,
         )
-        if use_anatomical and anatomical_data:
-            axes[2].axhline(
-                cluster1_euler_angles_anat[2],
-                color="gray",
-                linestyle="-",
-                label=f"Anatomical {cluster1_name} Z",
-            )
-            axes[2].axhline(
-                cluster2_euler_angles_anat[2],
-                color="gray",
-                linestyle="--",
-                label=f"Anatomical {cluster2_name} Z",
-            )
-        axes[2].set_xlabel("Time (s)")
-        axes[2].set_ylabel("Z: Axial Rot. R(+)/L(-) (degrees)")
-        axes[2].legend()
-        axes[2].set_title(f"Euler Angles - {file_name} (Z-axis)")
-
-        margin = 0.05 * (max_val - min_val)
-        axes[0].set_ylim([min_val - margin, max_val + margin])
-        axes[1].set_ylim([min_val - margin, max_val + margin])
-        axes[2].set_ylim([min_val - margin, max_val + margin])
-
         plt.tight_layout()
 
         base_name = os.path.splitext(file_name)[0]
@@ -97,23 +97,14 @@ from .stabilogram_analysis import (
     count_zero_crossings,
     count_peaks,
     compute_sway_density,
+    compute_sway_density_windowed,
+    compute_sway_density_descriptors,
     compute_total_path_length,
     plot_stabilogram,
     plot_power_spectrum,
     save_metrics_to_csv,
 )
-from .spectral_features import (
-    total_power,
-    power_frequency_50,
-    power_frequency_95,
-    power_mode,
-    centroid_frequency,
-    frequency_dispersion,
-    energy_content_below_0_5,
-    energy_content_0_5_2,
-    energy_content_above_2,
-    frequency_quotient,
-)
+from .spectral_features import spectral_features_all
 
 
 def convert_to_cm(data, unit):
@@ -408,28 +399,9 @@ def analyze_data_2d(
     print("Computing power spectrum...")
     freqs_ml, psd_ml, freqs_ap, psd_ap = compute_power_spectrum(X_n, Y_n, fs)
 
-    # Compute spectral features
+    # Compute spectral features (ML and AP in one pass)
     print("Computing spectral features...")
-    total_power_ml = total_power(freqs_ml, psd_ml)
-    total_power_ap = total_power(freqs_ap, psd_ap)
-    power_freq_50_ml = power_frequency_50(freqs_ml, psd_ml)
-    power_freq_50_ap = power_frequency_50(freqs_ap, psd_ap)
-    power_freq_95_ml = power_frequency_95(freqs_ml, psd_ml)
-    power_freq_95_ap = power_frequency_95(freqs_ap, psd_ap)
-    power_mode_ml = power_mode(freqs_ml, psd_ml)
-    power_mode_ap = power_mode(freqs_ap, psd_ap)
-    centroid_freq_ml = centroid_frequency(freqs_ml, psd_ml)
-    centroid_freq_ap = centroid_frequency(freqs_ap, psd_ap)
-    freq_dispersion_ml = frequency_dispersion(freqs_ml, psd_ml)
-    freq_dispersion_ap = frequency_dispersion(freqs_ap, psd_ap)
-    energy_below_0_5_ml = energy_content_below_0_5(freqs_ml, psd_ml)
-    energy_below_0_5_ap = energy_content_below_0_5(freqs_ap, psd_ap)
-    energy_0_5_2_ml = energy_content_0_5_2(freqs_ml, psd_ml)
-    energy_0_5_2_ap = energy_content_0_5_2(freqs_ap, psd_ap)
-    energy_above_2_ml = energy_content_above_2(freqs_ml, psd_ml)
-    energy_above_2_ap = energy_content_above_2(freqs_ap, psd_ap)
-    freq_quotient_ml = frequency_quotient(freqs_ml, psd_ml)
-    freq_quotient_ap = frequency_quotient(freqs_ap, psd_ap)
+    spectral = spectral_features_all(freqs_ml, np.vstack((psd_ml, psd_ap)))
 
     # Compute MSD for a time interval Δt
     delta_t = 0.1  # Adjust as necessary
@@ -456,6 +428,12 @@ def analyze_data_2d(
     print("Computing sway density...")
     sway_density_ml = compute_sway_density(X_n, fs, radius=0.3)
     sway_density_ap = compute_sway_density(Y_n, fs, radius=0.3)
+    sway_density_curve = compute_sway_density_windowed(
+        np.column_stack((X_n, Y_n)), fs, radius=0.3, window=1.0
+    )
+    sway_density_desc = compute_sway_density_descriptors(
+        sway_density_curve, fs, X_n, Y_n
+    )
 
     # Calculate and plot confidence ellipse
     print("Calculating confidence ellipse...")
@@ -489,26 +467,17 @@ def analyze_data_2d(
         "Zero_Crossings_AP": zero_crossings_ap,
         "Number_of_Peaks_ML": num_peaks_ml,
         "Number_of_Peaks_AP": num_peaks_ap,
-        "Total_Power_ML": total_power_ml,
-        "Total_Power_AP": total_power_ap,
-        "Power_Frequency_50_ML": power_freq_50_ml,
-        "Power_Frequency_50_AP": power_freq_50_ap,
-        "Power_Frequency_95_ML": power_freq_95_ml,
-        "Power_Frequency_95_AP": power_freq_95_ap,
-        "Power_Mode_ML": power_mode_ml,
-        "Power_Mode_AP": power_mode_ap,
-        "Centroid_Frequency_ML": centroid_frequency(freqs_ml, psd_ml),
-        "Centroid_Frequency_AP": centroid_frequency(freqs_ap, psd_ap),
-        "Frequency_Dispersion_ML": freq_dispersion_ml,
-        "Frequency_Dispersion_AP": freq_dispersion_ap,
-        "Energy_Content_Below_0.5_ML": energy_below_0_5_ml,
-        "Energy_Content_Below_0.5_AP": energy_below_0_5_ap,
-        "Energy_Content_0.5_2_ML": energy_0_5_2_ml,
-        "Energy_Content_0.5_2_AP": energy_0_5_2_ap,
-        "Energy_Content_Above_2_ML": energy_above_2_ml,
-        "Energy_Content_Above_2_AP": energy_above_2_ap,
-        "Frequency_Quotient_ML": freq_quotient_ml,
-        "Frequency_Quotient_AP": freq_quotient_ap,
+        **{
+            f"{feature}_{axis}": values[i]
+            for feature, values in spectral.items()
+            for i, axis in enumerate(("ML", "AP"))
+        },
+        "Sway_Density_Number_of_Peaks": sway_density_desc["Number_of_Peaks"],
+        "Sway_Density_Mean_Peak_s": sway_density_desc["Mean_Peak_Amplitude"],
+        "Sway_Density_Mean_Peak_Interval_s": sway_density_desc["Mean_Peak_Interval_s"],
+        "Sway_Density_Mean_Peak_Distance_cm": sway_density_desc[
+            "Mean_Peak_Distance_cm"
+        ],
     }
 
     # Save metrics to CSV
@@ -103,13 +103,15 @@ def select_headers(file_path):
     return selected_headers
 
 
-def calc_cop(data, fp_dimensions_xy=None, board_height_m: float = 0.0):
+def calc_cop(data, fp_dimensions_xy=None, board_height_m: float = 0.0, fz_sign=None):
     """
     Converts force (N) and moment (N.m) data to CoP (m) coordinates.
     Inputs:
         data: numpy array with columns [Fx, Fy, Fz, Mx, My, Mz] (Fx, Fy, Fz in N, Mx, My, Mz in N.m)
         fp_dimensions_xy: array or None, the dimensions of the force plate in meters [width, length]
         board_height_m: float, the height of the board over the force plate (in meters)
+        fz_sign: 1, -1 or None, factor that makes Fz positive; None flips Fz if any sample
+            is negative
     Outputs:
         cop_xyz_m: numpy array with columns [cop_x, cop_y, cop_z] in meters
     """
@@ -120,8 +122,9 @@ def calc_cop(data, fp_dimensions_xy=None, board_height_m: float = 0.0):
     fz = data[:, 2]
 
     # Check if fz is positive, if not, change to positive
-    if np.any(fz < 0):
-        fz = -fz
+    if fz_sign is None:
+        fz_sign = -1 if np.any(fz < 0) else 1
+    fz = fz * fz_sign
 
     mx = data[:, 3]
     my = data[:, 4]
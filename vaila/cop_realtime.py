@@ -0,0 +1,318 @@
+"""
+Module: cop_realtime.py
+Description: Incremental (streaming) Center of Pressure (CoP) and stabilogram analysis for live
+             balance feedback on a force plate.
+
+             Force plate blocks [Fx, Fy, Fz, Mx, My, Mz] are pushed as they arrive. Each block is
+             converted to CoP with `cop_calculate.calc_cop` using one Fz sign for the whole
+             stream (given, or taken from the first loaded block), low-pass filtered with a causal
+             Butterworth `sosfilt` whose state is carried between blocks, and folded into running
+             accumulators. Every metric is updated with O(1) work per sample, independently of the
+             recording length:
+             - Mean, RMS (about the running mean) and covariance of the ML/AP displacement.
+             - Total path length, mean ML/AP speed and mean velocity norm.
+             - Area of the 95% confidence ellipse (same PCA ellipse as `ellipse.plot_ellipse_pca`).
+
+             CoP data can also be pushed directly (stabilogram mode), and `replay_file` streams a
+             recorded CSV block by block, optionally at real-time pace, so the pipeline can be tested
+             without hardware.
+
+             Because the filter is causal, the filtered CoP lags the zero-phase `butter_filter` used by
+             `cop_analysis.analyze_data_2d`; offline reports should keep using `cop_analysis`.
+
+Usage:
+    stream = RealTimeCoP(fs=1000, fp_dimensions_xy=[0.508, 0.464])
+    for block in force_plate_blocks:            # (n, 6) arrays in N and N.m
+        cop_cm, metrics = stream.push(block)
+
+    Replay a recorded file (headers: Fx, Fy, Fz, Mx, My, Mz):
+    python -m vaila.cop_realtime --input trial.csv --fs 1000 --realtime
+
+Author: Prof. Dr. Paulo R. P. Santiago
+Version: 1.0
+Date: 2026-10-18
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from scipy.signal import sosfilt, sosfilt_zi
+from vaila.cop_calculate import calc_cop
+from vaila.filter_utils import butter_design
+
+FORCE_HEADERS = ["Fx", "Fy", "Fz", "Mx", "My", "Mz"]
+
+
+class RealTimeCoP:
+    """
+    Stateful CoP/stabilogram processor.
+
+    Parameters:
+    - fs: float
+        Sampling frequency in Hz.
+    - fp_dimensions_xy: list or None
+        Force plate dimensions in meters (see `calc_cop`).
+    - board_height_m: float
+        Height of a board over the force plate in meters.
+    - cutoff: float or None
+        Low-pass cutoff in Hz (None disables filtering).
+    - order: int
+        Butterworth order.
+    - scale: float
+        Factor applied to CoP in meters (100 gives centimeters).
+    - confidence: float
+        Confidence level of the ellipse area.
+    - fz_sign: 1, -1 or None
+        Factor that makes Fz positive. None takes it from the first block whose mean |Fz|
+        reaches `load_threshold` and keeps it for the rest of the stream, so noisy samples
+        of opposite sign never flip the CoP of a block.
+    - load_threshold: float
+        Mean |Fz| (N) of a block considered loaded when `fz_sign` is None.
+    """
+
+    def __init__(
+        self,
+        fs,
+        fp_dimensions_xy=None,
+        board_height_m=0.0,
+        cutoff=10,
+        order=4,
+        scale=100,
+        confidence=0.95,
+        fz_sign=None,
+        load_threshold=10.0,
+    ):
+        self.fs = fs
+        self.fz_sign = fz_sign
+        self.load_threshold = load_threshold
+        self.fp_dimensions_xy = fp_dimensions_xy
+        self.board_height_m = board_height_m
+        self.scale = scale
+        self.sos = butter_design(order, cutoff, fs, "low") if cutoff else None
+        # chi2_val**2 of ellipse.plot_ellipse_pca
+        self.ellipse_factor = 2 * np.log(1 / (1 - confidence))
+        self.reset()
+
+    def reset(self):
+        """Clears the filter state and all running accumulators."""
+        self.zi = None
+        self.n = 0
+        self.origin = None  # shift for numerically stable running moments
+        self.sum_xy = np.zeros(2)
+        self.sum_sq = np.zeros(2)
+        self.sum_cross = 0.0
+        self.last = None
+        self.path_length = 0.0
+        self.abs_speed_sum = np.zeros(2)
+
+    def push(self, block):
+        """
+        Pushes a block of force plate samples.
+
+        Parameters:
+        - block: array-like, shape (n, 6)
+            Columns [Fx, Fy, Fz, Mx, My, Mz] in N and N.m.
+
+        Returns:
+        - cop: ndarray, shape (n, 2)
+            Filtered CoP [ML, AP] of the block (in `scale` units, cm by default).
+        - metrics: dict
+            Running metrics since the last reset (see `metrics`).
+        """
+        block = np.atleast_2d(np.asarray(block, dtype=float))
+        fz_sign = self.fz_sign
+        if fz_sign is None and len(block):
+            mean_fz = block[:, 2].mean()
+            fz_sign = -1 if mean_fz < 0 else 1
+            if abs(mean_fz) >= self.load_threshold:
+                self.fz_sign = fz_sign
+        cop_xyz = calc_cop(block, self.fp_dimensions_xy, self.board_height_m, fz_sign)
+        return self.push_cop(cop_xyz[:, :2] * self.scale)
+
+    def push_cop(self, cop_block):
+        """
+        Pushes a block of CoP samples (stabilogram mode).
+
+        Parameters:
+        - cop_block: array-like, shape (n, 2)
+            CoP [ML, AP] already in output units.
+
+        Returns:
+        - cop, metrics: as in `push`.
+        """
+        cop = np.atleast_2d(np.asarray(cop_block, dtype=float))
+        if len(cop) == 0:
+            return cop, self.metrics()
+
+        if self.sos is not None:
+            if self.zi is None:
+                # Start at steady state on the first sample to avoid a step transient
+                self.zi = sosfilt_zi(self.sos)[:, :, np.newaxis] * cop[0]
+            cop, self.zi = sosfilt(self.sos, cop, axis=0, zi=self.zi)
+
+        if self.origin is None:
+            self.origin = cop[0].copy()
+        shifted = cop - self.origin
+        self.n += len(cop)
+        self.sum_xy += shifted.sum(axis=0)
+        self.sum_sq += np.sum(shifted**2, axis=0)
+        self.sum_cross += np.sum(shifted[:, 0] * shifted[:, 1])
+
+        previous = cop[:1] if self.last is None else self.last[np.newaxis]
+        steps = np.diff(np.vstack((previous, cop)), axis=0)
+        self.path_length += np.sum(np.sqrt(np.sum(steps**2, axis=1)))
+        self.abs_speed_sum += np.sum(np.abs(steps), axis=0)
+        self.last = cop[-1].copy()
+
+        return cop, self.metrics()
+
+    def metrics(self):
+        """
+        Returns the running metrics, named as in `cop_analysis.analyze_data_2d`.
+
+        Speeds use first differences, so they are the path length divided by the elapsed time.
+        """
+        n = self.n
+        if n == 0:
+            return {"Number_of_Points": 0}
+
+        mean_shifted = self.sum_xy / n
+        mean = self.origin + mean_shifted
+        var = np.maximum(self.sum_sq / n - mean_shifted**2, 0.0)
+        cov = self.sum_cross / n - mean_shifted[0] * mean_shifted[1]
+        elapsed = (n - 1) / self.fs
+
+        if n > 1:
+            # Sample covariance (ddof=1), as used by the PCA ellipse
+            ddof_scale = n / (n - 1)
+            det = (var[0] * var[1] - cov**2) * ddof_scale**2
+            area = np.pi * self.ellipse_factor * np.sqrt(max(det, 0.0))
+            speeds = self.abs_speed_sum / elapsed
+            velocity = self.path_length / elapsed
+        else:
+            area = 0.0
+            speeds = np.zeros(2)
+            velocity = 0.0
+
+        return {
+            "Total_Duration_s": n / self.fs,
+            "Number_of_Points": n,
+            "Mean_ML_cm": mean[0],
+            "Mean_AP_cm": mean[1],
+            "RMS_ML_cm": np.sqrt(var[0]),
+            "RMS_AP_cm": np.sqrt(var[1]),
+            "Covariance_cm2": cov,
+            "Total_Path_Length_cm": self.path_length,
+            "Mean_Speed_ML_cmps": speeds[0],
+            "Mean_Speed_AP_cmps": speeds[1],
+            "Mean_Velocity_Norm_cmps": velocity,
+            "Sway_Area_cm2": area,
+        }
+
+
+def replay_file(
+    file_path,
+    fs,
+    columns=None,
+    mode="forces",
+    block_size=None,
+    realtime=False,
+    callback=None,
+    **kwargs,
+):
+    """
+    Streams a recorded CSV through `RealTimeCoP` block by block.
+
+    Parameters:
+    - file_path: str
+        CSV file with force plate (Fx..Mz) or CoP (ML, AP) columns.
+    - fs: float
+        Sampling frequency in Hz.
+    - columns: list of str or None
+        Columns to use (default: Fx..Mz for "forces", the first two columns for "cop").
+    - mode: str
+        "forces" pushes forces/moments, "cop" pushes CoP directly.
+    - block_size: int or None
+        Samples per block (default: 100 ms of data).
+    - realtime: bool
+        Sleep between blocks to reproduce the acquisition pace.
+    - callback: callable or None
+        Called as callback(cop_block, metrics) after every block.
+    - kwargs:
+        Passed to `RealTimeCoP`.
+
+    Returns:
+    - cop: ndarray, shape (n, 2), the full filtered CoP.
+    - metrics: dict, final running metrics.
+    """
+    df = pd.read_csv(file_path)
+    if columns is None:
+        columns = FORCE_HEADERS if mode == "forces" else list(df.columns[:2])
+    data = df[columns].to_numpy(dtype=float)
+
+    stream = RealTimeCoP(fs, **kwargs)
+    push = stream.push if mode == "forces" else stream.push_cop
+    block_size = block_size or max(int(fs * 0.1), 1)
+
+    cop_blocks = []
+    metrics = stream.metrics()
+    start_time = time.perf_counter()
+    for start in range(0, len(data), block_size):
+        if realtime:
+            delay = start / fs - (time.perf_counter() - start_time)
+            if delay > 0:
+                time.sleep(delay)
+        cop, metrics = push(data[start : start + block_size])
+        cop_blocks.append(cop)
+        if callback is not None:
+            callback(cop, metrics)
+
+    cop = np.vstack(cop_blocks) if cop_blocks else np.empty((0, 2))
+    return cop, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a force plate CSV through the real-time CoP engine."
+    )
+    parser.add_argument("--input", required=True, help="CSV file to replay")
+    parser.add_argument("--fs", type=float, required=True, help="Sampling rate (Hz)")
+    parser.add_argument(
+        "--mode", choices=["forces", "cop"], default="forces", help="Input columns"
+    )
+    parser.add_argument("--columns", nargs="+", help="Columns to use")
+    parser.add_argument("--cutoff", type=float, default=10, help="Low-pass (Hz)")
+    parser.add_argument("--block", type=int, help="Samples per block")
+    parser.add_argument(
+        "--realtime", action="store_true", help="Replay at acquisition pace"
+    )
+    args = parser.parse_args()
+
+    def report(cop, metrics):
+        print(
+            f"t={metrics['Total_Duration_s']:.2f}s "
+            f"ML={cop[-1, 0]:.2f} AP={cop[-1, 1]:.2f} "
+            f"path={metrics['Total_Path_Length_cm']:.2f}cm "
+            f"vel={metrics['Mean_Velocity_Norm_cmps']:.2f}cm/s "
+            f"area={metrics['Sway_Area_cm2']:.2f}cm2"
+        )
+
+    print(f"Replaying {os.path.basename(args.input)}")
+    _, metrics = replay_file(
+        args.input,
+        args.fs,
+        columns=args.columns,
+        mode=args.mode,
+        block_size=args.block,
+        realtime=args.realtime,
+        callback=report,
+        cutoff=args.cutoff,
+    )
+    for key, value in metrics.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 """
 Script: dlt2d.py
 Author: vailá
-Version: 0.02
-Last Updated: November 26, 2024
+Version: 0.03
+Last Updated: October 18, 2026
 
 Description:
     This script calculates the Direct Linear Transformation (DLT) parameters for 2D coordinate transformations. 
@@ -16,9 +16,12 @@ Description:
 New Features:
     - Automatic generation of REF2D templates from pixel coordinate files.
     - Validation of input coordinate pairs to ensure compatibility before processing.
-    - Detailed logging of DLT parameter calculation for each frame.
+    - Summary logging of the DLT calibration (frames calibrated, reprojection RMS).
     - User-friendly graphical interface for file selection using Tkinter.
     - Integration with the Rich library for enhanced console output.
+    - Batched calibration (v0.03): all frames are calibrated at once with stacked QR
+      least-squares solves; per-frame reprojection RMS is saved next to the DLT file
+      and the console shows a summary instead of per-frame arrays.
 
 Usage:
     1. Run the script to start the Direct Linear Transformation (DLT) process.
@@ -52,6 +55,8 @@ Output:
       A template file for real-world coordinates created from the pixel file.
     - DLT Parameters File (`*.dlt2d`):
       A CSV file containing the DLT parameters for each processed frame.
+    - Residuals File (`*_dlt2d_residuals.csv`):
+      Reprojection RMS (pixels) and number of points for each frame.
 
 Output Structure:
     - Frame: The frame index from the input pixel file.
@@ -80,7 +85,6 @@ import os
 import numpy as np
 import pandas as pd
 import csv
-from numpy.linalg import inv
 from tkinter import filedialog, Tk, messagebox
 from rich import print
 
@@ -101,6 +105,69 @@ def read_coordinates(file_path, usecols):
     return coordinates
 
 
+def solve_stacked_lstsq(B, C):
+    """
+    Solve many least-squares systems B[k] @ x[k] = C[k] at once using QR.
+
+    Args:
+    B (np.array): Design matrices, shape (frames, equations, unknowns).
+    C (np.array): Right-hand sides, shape (frames, equations).
+
+    Returns:
+    np.array: Solutions, shape (frames, unknowns); NaN for rank-deficient frames.
+    """
+    Q, R = np.linalg.qr(B)
+    diag = np.abs(np.diagonal(R, axis1=-2, axis2=-1))
+    tol = diag.max(axis=-1) * max(B.shape[-2:]) * np.finfo(float).eps
+    full_rank = diag.min(axis=-1) > tol
+    R[~full_rank] = np.eye(B.shape[-1])
+    rhs = np.einsum("kij,ki->kj", Q, C)
+    x = np.linalg.solve(R, rhs[..., np.newaxis])[..., 0]
+    x[~full_rank] = np.nan
+    return x
+
+
+def dlt2d_batch(F, L):
+    """
+    Calculate DLT (2D) parameters for many frames at once.
+
+    Args:
+    F (np.array): Real-world coordinates (X, Y), shape (frames, points, 2).
+    L (np.array): Pixel coordinates, shape (frames, points, 2).
+
+    Returns:
+    tuple: DLT parameters (frames, 8) and reprojection RMS in pixels (frames,).
+    """
+    F = np.asarray(F, dtype=float)
+    L = np.asarray(L, dtype=float)
+    n_frames, m = F.shape[:2]
+    X, Y = F[..., 0], F[..., 1]
+    u, v = L[..., 0], L[..., 1]
+
+    B = np.zeros((n_frames, m, 2, 8))
+    B[:, :, 0, 0] = X
+    B[:, :, 0, 1] = Y
+    B[:, :, 0, 2] = 1
+    B[:, :, 0, 6] = -X * u
+    B[:, :, 0, 7] = -Y * u
+    B[:, :, 1, 3] = X
+    B[:, :, 1, 4] = Y
+    B[:, :, 1, 5] = 1
+    B[:, :, 1, 6] = -X * v
+    B[:, :, 1, 7] = -Y * v
+    B = B.reshape(n_frames, 2 * m, 8)
+    C = L.reshape(n_frames, 2 * m)
+
+    A = solve_stacked_lstsq(B, C)
+
+    a = A[:, np.newaxis, :]
+    den = a[..., 6] * X + a[..., 7] * Y + 1
+    u_hat = (a[..., 0] * X + a[..., 1] * Y + a[..., 2]) / den
+    v_hat = (a[..., 3] * X + a[..., 4] * Y + a[..., 5]) / den
+    residual_rms = np.sqrt(np.mean((u_hat - u) ** 2 + (v_hat - v) ** 2, axis=1))
+    return A, residual_rms
+
+
 def dlt2d(F, L):
     """
     Calculate DLT (2D) parameters.
@@ -112,21 +179,8 @@ def dlt2d(F, L):
     Returns:
     np.array: DLT parameters.
     """
-    F = np.matrix(F)
-    L = np.matrix(L)
-    Lt = L.transpose()
-    C = Lt.flatten("F").transpose()
-    m = np.size(F, 0)
-
-    B = np.zeros((2 * m, 8))
-    for i in range(m):
-        B[2 * i, 0:3] = [F[i, 0], F[i, 1], 1]
-        B[2 * i, 6:8] = [-F[i, 0] * L[i, 0], -F[i, 1] * L[i, 0]]
-        B[2 * i + 1, 3:6] = [F[i, 0], F[i, 1], 1]
-        B[2 * i + 1, 6:8] = [-F[i, 0] * L[i, 1], -F[i, 1] * L[i, 1]]
-
-    A = inv(B.T @ B) @ B.T @ C
-    return np.asarray(A).flatten()
+    A, _ = dlt2d_batch(np.asarray(F)[np.newaxis], np.asarray(L)[np.newaxis])
+    return A[0]
 
 
 def create_ref2d_template(pixel_file):
@@ -161,13 +215,14 @@ def filter_and_shape_coordinates(coords):
     return np.array(filtered_coords).reshape(-1, 2)
 
 
-def process_files(pixel_file, real_file):
+def process_files(pixel_file, real_file, residuals_file=None):
     """
     Process the coordinate files to calculate the DLT parameters.
 
     Args:
     pixel_file (str): Path to the pixel coordinate file.
     real_file (str): Path to the real-world coordinate file.
+    residuals_file (str, optional): Path to save per-frame reprojection RMS.
 
     Returns:
     list: List of DLT parameters for each frame.
@@ -179,20 +234,44 @@ def process_files(pixel_file, real_file):
         print("The number of coordinate pairs in the two files must match.")
         return
 
-    dlt_params = []
-    for i in range(len(pixel_coords)):
-        if not np.isnan(pixel_coords[i]).any() and not np.isnan(real_coords[i]).any():
-            L = filter_and_shape_coordinates(pixel_coords[i])
-            F = filter_and_shape_coordinates(real_coords[i])
-            if F.shape[0] == L.shape[0] and F.shape[0] >= 4:
-                print(f"Frame {i}: F = {F}, L = {L}")
-                dlt_params.append((i, dlt2d(F, L)))
-            else:
-                dlt_params.append((i, [np.nan] * 8))
-        else:
-            dlt_params.append((i, [np.nan] * 8))
+    n_frames = min(len(pixel_coords), len(real_coords))
+    pixel_coords = pixel_coords[:n_frames].astype(float)
+    real_coords = real_coords[:n_frames].astype(float)
+    n_points = pixel_coords.shape[1] // 2
+
+    # Only frames with every point defined in both files are calibrated
+    valid = ~np.isnan(pixel_coords).any(axis=1) & ~np.isnan(real_coords).any(axis=1)
+    if n_points < 4:
+        valid[:] = False
+
+    params = np.full((n_frames, 8), np.nan)
+    residual_rms = np.full(n_frames, np.nan)
+    if valid.any():
+        L = pixel_coords[valid].reshape(-1, n_points, 2)
+        F = real_coords[valid].reshape(-1, n_points, 2)
+        params[valid], residual_rms[valid] = dlt2d_batch(F, L)
+
+    calibrated = ~np.isnan(params).any(axis=1)
+    print(
+        f"DLT2D: {calibrated.sum()} of {n_frames} frames calibrated "
+        f"({n_points} points per frame)."
+    )
+    if calibrated.any():
+        print(
+            f"Reprojection RMS (pixels): mean {np.nanmean(residual_rms):.4f}, "
+            f"max {np.nanmax(residual_rms):.4f} (frame {np.nanargmax(residual_rms)})"
+        )
 
-    return dlt_params
+    if residuals_file is not None:
+        pd.DataFrame(
+            {
+                "frame": np.arange(n_frames),
+                "n_points": np.where(valid, n_points, 0),
+                "reprojection_rms_px": residual_rms,
+            }
+        ).to_csv(residuals_file, index=False, float_format="%.6f")
+
+    return [(i, params[i]) for i in range(n_frames)]
 
 
 def save_dlt_parameters(output_file, dlt_params):
@@ -250,7 +329,10 @@ def main():
             print("Real file selection cancelled.")
             return
 
-    dlt_params = process_files(pixel_file, real_file)
+    residuals_file = os.path.splitext(pixel_file)[0] + "_dlt2d_residuals.csv"
+    dlt_params = process_files(pixel_file, real_file, residuals_file)
+    if dlt_params is None:
+        return
     output_file = os.path.splitext(pixel_file)[0] + ".dlt2d"
     save_dlt_parameters(output_file, dlt_params)
 
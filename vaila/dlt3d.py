@@ -1,7 +1,7 @@
 """
 Script Name: dlt3d.py
-Version: v0.01
-Date and Time: 2024-08-26
+Version: v0.02
+Date and Time: 2026-10-18
 Author: Prof. PhD. Paulo Santiago
 Email: vailamultimodaltoolbox@gmail.com
 Description: This script performs 3D calibration using the Direct Linear 
@@ -9,6 +9,12 @@ Description: This script performs 3D calibration using the Direct Linear
              between 2D coordinates in multiple views and their corresponding 
              3D coordinates.
 
+             All frames are calibrated at once (v0.02): the design matrices are built
+             with array operations and solved with stacked QR least squares; frames
+             with missing points or fewer than 6 points are left as NaN. The per-frame
+             reprojection RMS is saved to `<pixel_file>_dlt3d_residuals.csv` and the
+             console shows a summary.
+
 Dependencies:
     - Python 3.11.8
     - numpy
@@ -79,7 +85,7 @@ import os
 import numpy as np
 import pandas as pd
 import csv  # Importando a biblioteca csv
-from numpy.linalg import inv
+from vaila.dlt2d import solve_stacked_lstsq
 from tkinter import filedialog, Tk, messagebox
 from rich import print
 
@@ -90,6 +96,44 @@ def read_coordinates(file_path, usecols):
     return coordinates
 
 
+def dlt_calib_batch(cp3d, cp2d):
+    """
+    Perform DLT 3D calibration for many frames at once.
+
+    Parameters:
+    - cp3d: Real 3D coordinates, shape (frames, points, 3).
+    - cp2d: Corresponding 2D coordinates, shape (frames, points, 2).
+
+    Returns:
+    - DLT parameters, shape (frames, 11) (NaN for rank-deficient frames).
+    - Reprojection RMS in pixels, shape (frames,).
+    """
+    cp3d = np.asarray(cp3d, dtype=float)
+    cp2d = np.asarray(cp2d, dtype=float)
+    n_frames, m = cp3d.shape[:2]
+    X, Y, Z = cp3d[..., 0], cp3d[..., 1], cp3d[..., 2]
+    u, v = cp2d[..., 0], cp2d[..., 1]
+
+    M = np.zeros((n_frames, m, 2, 11))
+    M[:, :, 0, 0:3] = cp3d
+    M[:, :, 0, 3] = 1
+    M[:, :, 0, 8:11] = -u[..., np.newaxis] * cp3d
+    M[:, :, 1, 4:7] = cp3d
+    M[:, :, 1, 7] = 1
+    M[:, :, 1, 8:11] = -v[..., np.newaxis] * cp3d
+    M = M.reshape(n_frames, 2 * m, 11)
+    N = cp2d.reshape(n_frames, 2 * m)
+
+    DLT = solve_stacked_lstsq(M, N)
+
+    L = DLT[:, np.newaxis, :]
+    den = L[..., 8] * X + L[..., 9] * Y + L[..., 10] * Z + 1
+    u_hat = (L[..., 0] * X + L[..., 1] * Y + L[..., 2] * Z + L[..., 3]) / den
+    v_hat = (L[..., 4] * X + L[..., 5] * Y + L[..., 6] * Z + L[..., 7]) / den
+    residual_rms = np.sqrt(np.mean((u_hat - u) ** 2 + (v_hat - v) ** 2, axis=1))
+    return DLT, residual_rms
+
+
 def dlt_calib(cp3d, cp2d):
     """
     Perform DLT 3D calibration.
@@ -104,51 +148,8 @@ def dlt_calib(cp3d, cp2d):
     cp3d = np.asarray(cp3d)
     if np.size(cp3d, 1) > 3:
         cp3d = cp3d[:, 1:]
-
-    m = np.size(cp3d[:, 0], 0)
-    M = np.zeros([m * 2, 11])
-    N = np.zeros([m * 2, 1])
-
-    cp2d = np.asarray(cp2d)
-
-    for i in range(m):
-        M[i * 2, :] = [
-            cp3d[i, 0],
-            cp3d[i, 1],
-            cp3d[i, 2],
-            1,
-            0,
-            0,
-            0,
-            0,
-            -cp2d[i, 0] * cp3d[i, 0],
-            -cp2d[i, 0] * cp3d[i, 1],
-            -cp2d[i, 0] * cp3d[i, 2],
-        ]
-
-        M[i * 2 + 1, :] = [
-            0,
-            0,
-            0,
-            0,
-            cp3d[i, 0],
-            cp3d[i, 1],
-            cp3d[i, 2],
-            1,
-            -cp2d[i, 1] * cp3d[i, 0],
-            -cp2d[i, 1] * cp3d[i, 1],
-            -cp2d[i, 1] * cp3d[i, 2],
-        ]
-
-        N[[i * 2, i * 2 + 1], 0] = cp2d[i, :]
-
-    Mt = M.T
-    M1 = inv(Mt.dot(M))
-    MN = Mt.dot(N)
-
-    DLT = (M1).dot(MN).T
-
-    return DLT.flatten()
+    DLT, _ = dlt_calib_batch(cp3d[np.newaxis], np.asarray(cp2d)[np.newaxis])
+    return DLT[0]
 
 
 def create_ref3d_template(pixel_file):
@@ -198,22 +199,50 @@ def main():
     pixel_coords = read_coordinates(pixel_file, usecols=lambda x: x != "frame")
     real_coords = read_coordinates(real_file, usecols=lambda x: x != "frame")
 
-    if pixel_coords.shape[1] // 2 != real_coords.shape[0]:
-        print("The number of 2D views and 3D coordinate sets must match.")
+    n_points = pixel_coords.shape[1] // 2
+    if n_points != real_coords.shape[1] // 3:
+        print("The number of 2D points and 3D coordinate sets must match.")
         return
 
-    dlt_params = []
-    for i in range(len(pixel_coords)):
-        if not np.isnan(pixel_coords[i]).any() and not np.isnan(real_coords[i]).any():
-            L = pixel_coords[i].reshape(-1, 2)
-            F = real_coords[i].reshape(-1, 3)
-            if F.shape[0] >= 6:  # Necessita pelo menos 6 pontos para DLT3D
-                print(f"Frame {i}: F = {F}, L = {L}")
-                dlt_params.append((i, dlt_calib(F, L)))
-            else:
-                dlt_params.append((i, [np.nan] * 11))
-        else:
-            dlt_params.append((i, [np.nan] * 11))
+    n_frames = min(len(pixel_coords), len(real_coords))
+    pixel_coords = pixel_coords[:n_frames].astype(float)
+    real_coords = real_coords[:n_frames].astype(float)
+
+    # Only frames with every point defined are calibrated; DLT3D needs at least 6 points
+    valid = ~np.isnan(pixel_coords).any(axis=1) & ~np.isnan(real_coords).any(axis=1)
+    if n_points < 6:
+        valid[:] = False
+
+    params = np.full((n_frames, 11), np.nan)
+    residual_rms = np.full(n_frames, np.nan)
+    if valid.any():
+        params[valid], residual_rms[valid] = dlt_calib_batch(
+            real_coords[valid].reshape(-1, n_points, 3),
+            pixel_coords[valid].reshape(-1, n_points, 2),
+        )
+    dlt_params = [(i, params[i]) for i in range(n_frames)]
+
+    calibrated = ~np.isnan(params).any(axis=1)
+    print(
+        f"DLT3D: {calibrated.sum()} of {n_frames} frames calibrated "
+        f"({n_points} points per frame)."
+    )
+    if calibrated.any():
+        print(
+            f"Reprojection RMS (pixels): mean {np.nanmean(residual_rms):.4f}, "
+            f"max {np.nanmax(residual_rms):.4f} (frame {np.nanargmax(residual_rms)})"
+        )
+    pd.DataFrame(
+        {
+            "frame": np.arange(n_frames),
+            "n_points": np.where(valid, n_points, 0),
+            "reprojection_rms_px": residual_rms,
+        }
+    ).to_csv(
+        os.path.splitext(pixel_file)[0] + "_dlt3d_residuals.csv",
+        index=False,
+        float_format="%.6f",
+    )
 
     output_file = os.path.splitext(pixel_file)[0] + ".dlt3d"
     with open(output_file, "w", newline="") as csvfile:
@@ -108,6 +108,11 @@ Changelog:
 ----------
 - 2024-07-26: Initial release with core EMG analysis functionalities.
 - 2024-09-23: Added recursive file processing and improved GUI interaction.
+- 2026-10-18: RMS and median frequency computed by a batched sliding-window engine
+  (`emg_window_features`) with mean frequency and spectral moments per window.
+- 2026-10-18: Multi-channel mode (`emg_analysis_multichannel`, `batch_emg_multichannel`):
+  all channels filtered with one 2-D sosfiltfilt, files processed in parallel, and
+  one consolidated summary table (emg_multichannel_summary.csv).
 ================================================================================
 """
 
@@ -116,15 +121,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
 from tkinter import messagebox, filedialog, Tk, simpledialog
+from vaila.filter_utils import butter_design
 
 
 def butter_lowpass(cutoff, fs, order=4):
-    from scipy.signal import butter
-
-    nyq = 0.5 * fs
-    normal_cutoff = cutoff / nyq
-    b, a = butter(order, normal_cutoff, btype="low", analog=False)
-    return b, a
+    return butter_design(order, cutoff, fs, "low", output="ba")
 
 
 def butter_lowpass_filter(data, cutoff, fs, order=4):
@@ -140,13 +141,7 @@ def butter_lowpass_filter(data, cutoff, fs, order=4):
 
 
 def butter_bandpass(lowcut, highcut, fs, order=4):
-    from scipy.signal import butter
-
-    nyq = 0.5 * fs
-    low = lowcut / nyq
-    high = highcut / nyq
-    b, a = butter(order, [low, high], btype="band")
-    return b, a
+    return butter_design(order, (lowcut, highcut), fs, "band", output="ba")
 
 
 def butter_bandpass_filter(data, lowcut, highcut, fs, order=4):
@@ -176,26 +171,135 @@ def linear_envelope(emg_abs, cutoff, fs):
     return emg_envelope, signal_integ
 
 
+def emg_window_features(
+    semg,
+    fs,
+    window_length,
+    overlap,
+    nfft=1024,
+    block_size=4096,
+    window="hann",
+    spectral=True,
+):
+    """
+    Computes RMS and spectral features for every analysis window of one or many
+    EMG channels in a single batched call.
+
+    Windows are taken as strided views of the signal (no copies), starting at sample 0
+    and advancing `overlap` samples (the step between window starts, as in
+    `calculate_rms`), while the window ends before the last sample. Each window's
+    spectrum is the same one-sided Hann periodogram that `welch` computes for a single
+    segment (constant detrend, `nfft` points), obtained with one `rfft` per block of
+    windows, so memory stays bounded for multi-hour recordings.
+
+    Parameters:
+    - semg: array-like
+        EMG signal, shape (samples,) or (samples, channels).
+    - fs: float
+        Sampling frequency in Hz.
+    - window_length: int
+        Window length in samples.
+    - overlap: int
+        Step in samples between consecutive windows.
+    - nfft: int, default=1024
+        FFT length (increased to `window_length` if shorter).
+    - block_size: int, default=4096
+        Number of windows transformed per FFT call.
+    - window: str, default="hann"
+        Spectral window passed to `scipy.signal.get_window`.
+    - spectral: bool, default=True
+        If False, only "start" and "rms" are computed (spectral entries stay NaN).
+
+    Returns:
+    - features: dict
+        "start": window start indices (windows,). "rms", "median_frequency",
+        "mean_frequency", "peak_frequency" and "spectral_moment_0/1/2" with shape
+        (windows,) for 1D input or (windows, channels) for 2D input. The spectral
+        moments are sum(f**k * PSD) * df.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+    from scipy.signal import get_window
+
+    semg = np.asarray(semg, dtype=float)
+    single_channel = semg.ndim == 1
+    data = semg[:, np.newaxis] if single_channel else semg
+    n_samples, n_channels = data.shape
+    step = max(int(overlap), 1)
+    n_windows = (n_samples - window_length - 1) // step + 1
+    n_windows = max(n_windows, 0) if n_samples > window_length else 0
+    nfft = max(int(nfft), window_length)
+
+    freqs = np.fft.rfftfreq(nfft, 1 / fs)
+    df = freqs[1] - freqs[0] if len(freqs) > 1 else 0.0
+    taper = get_window(window, window_length)
+    # One-sided density scaling as in scipy.signal.welch
+    scale = np.full(len(freqs), 2.0 / (fs * np.sum(taper**2)))
+    scale[0] /= 2
+    if nfft % 2 == 0:
+        scale[-1] /= 2
+
+    keys = [
+        "rms",
+        "median_frequency",
+        "mean_frequency",
+        "peak_frequency",
+        "spectral_moment_0",
+        "spectral_moment_1",
+        "spectral_moment_2",
+    ]
+    features = {key: np.full((n_windows, n_channels), np.nan) for key in keys}
+    features["start"] = np.arange(n_windows) * step
+
+    if n_windows > 0:
+        # (channels, windows, window_length) strided view
+        frames = sliding_window_view(data.T, window_length, axis=1)[
+            :, : (n_windows - 1) * step + 1 : step, :
+        ]
+        for first in range(0, n_windows, block_size):
+            last = min(first + block_size, n_windows)
+            block = frames[:, first:last, :]
+            features["rms"][first:last] = np.sqrt(np.mean(block**2, axis=2)).T
+            if not spectral:
+                continue
+
+            detrended = block - block.mean(axis=2, keepdims=True)
+            spectrum = np.fft.rfft(detrended * taper, n=nfft, axis=2)
+            psd = (spectrum.real**2 + spectrum.imag**2) * scale
+            total = psd.sum(axis=2)
+
+            cumulative = np.cumsum(psd, axis=2)
+            reached = cumulative >= total[..., np.newaxis] / 2
+            median_idx = np.argmax(reached, axis=2)
+            median = freqs[median_idx]
+            median[~reached.any(axis=2)] = np.nan
+            features["median_frequency"][first:last] = median.T
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                moment_0 = total * df
+                moment_1 = np.sum(psd * freqs, axis=2) * df
+                moment_2 = np.sum(psd * freqs**2, axis=2) * df
+                features["mean_frequency"][first:last] = (moment_1 / moment_0).T
+            features["peak_frequency"][first:last] = freqs[np.argmax(psd, axis=2)].T
+            features["spectral_moment_0"][first:last] = moment_0.T
+            features["spectral_moment_1"][first:last] = moment_1.T
+            features["spectral_moment_2"][first:last] = moment_2.T
+
+    if single_channel:
+        for key in keys:
+            features[key] = features[key][:, 0]
+    return features
+
+
 def calculate_rms(semg, window_length, overlap):
-    start = 0
-    rms_values = []
-    while start + window_length < len(semg):
-        window = semg[start : start + window_length]
-        rms_value = np.sqrt(np.mean(window**2))
-        rms_values.append(rms_value)
-        start += overlap
-    return rms_values
+    rms_values = emg_window_features(
+        semg, 1.0, window_length, overlap, spectral=False
+    )["rms"]
+    return rms_values.tolist()
 
 
 def calculate_median_frequency(semg, fs, window_length, overlap):
-    start = 0
-    median_freq_values = []
-    while start + window_length < len(semg):
-        window = semg[start : start + window_length]
-        median_freq_value = calculate_median_frequency_for_window(window, fs)
-        median_freq_values.append(median_freq_value)
-        start += overlap
-    return median_freq_values
+    features = emg_window_features(semg, fs, window_length, overlap)
+    return features["median_frequency"].tolist()
 
 
 def calculate_median_frequency_for_window(window, fs):
@@ -430,6 +534,248 @@ def emg_analysis(emg_file, fs, start_index, end_index, no_plot, selected_path):
     plt.close(fig5)
 
 
+def butter_bandpass_sos(lowcut, highcut, fs, order=4):
+    return butter_design(order, (lowcut, highcut), fs, "band")
+
+
+def butter_lowpass_sos(cutoff, fs, order=4):
+    return butter_design(order, cutoff, fs, "low")
+
+
+def sosfiltfilt_padded(sos, data, fs):
+    """
+    Zero-phase filtering of all columns of `data` (samples, channels) at once, with
+    the same 1 second mirrored padding used by `butter_bandpass_filter`.
+    """
+    from scipy.signal import sosfiltfilt
+
+    padding_length = min(int(fs), len(data))  # 1 second padding
+    padded_data = np.concatenate(
+        [data[:padding_length][::-1], data, data[-padding_length:][::-1]], axis=0
+    )
+    y = sosfiltfilt(sos, padded_data, axis=0)
+    return y[padding_length : len(y) - padding_length]
+
+
+def load_emg_channels(emg_file, scale=1000000):
+    """
+    Reads an EMG file once and returns every signal column.
+
+    The first column holds sample numbers; all remaining columns are EMG channels
+    (in Volts, returned in µVolts after multiplying by `scale`).
+
+    Returns:
+    - emg_data: ndarray, shape (samples, channels)
+    - channel_names: list of str
+    """
+    import pandas as pd
+
+    df = pd.read_csv(emg_file)
+    channel_names = [str(name).strip() for name in df.columns[1:]]
+    emg_data = (
+        df.iloc[:, 1:].apply(pd.to_numeric, errors="coerce").fillna(0.0).to_numpy()
+    )
+    return emg_data * scale, channel_names
+
+
+def emg_analysis_multichannel(
+    emg_file,
+    fs,
+    start_index=0,
+    end_index=None,
+    output_dir=None,
+    channels=None,
+    save_plots=True,
+):
+    """
+    Analyzes all EMG channels of one file in a single pass.
+
+    The file is parsed once, every channel is band-pass filtered (10-450 Hz) with one
+    2-D `sosfiltfilt`, rectified and enveloped together, and RMS/median frequency are
+    computed for all windows and channels by `emg_window_features`.
+
+    Parameters:
+    - emg_file: str
+        CSV/TXT file (first column samples, remaining columns EMG in Volts).
+    - fs: float
+        Sampling frequency in Hz.
+    - start_index, end_index: int or None
+        Sample range to analyze.
+    - output_dir: str or None
+        Directory for the per-file window table and figure (not written if None).
+    - channels: list of str or None
+        Channel names to analyze (default: all).
+    - save_plots: bool
+        Save a multi-channel RMS/median frequency figure (PNG).
+
+    Returns:
+    - summary: list of dict
+        One row per channel with File, Channel, Samples, Linear_envelope_µVolts.s,
+        RMS_Mean_µVolts, MedianFrequency_Mean_Hz, MedianFrequency_Slope_Hz_per_s,
+        MeanFrequency_Mean_Hz, Freq_Max and PSD_Max.
+    """
+    from scipy.integrate import trapezoid
+    from scipy.signal import detrend, welch
+
+    emg_data, channel_names = load_emg_channels(emg_file)
+    if channels:
+        selected = [channel_names.index(name) for name in channels]
+        emg_data = emg_data[:, selected]
+        channel_names = [channel_names[i] for i in selected]
+
+    if end_index is None or end_index > len(emg_data):
+        end_index = len(emg_data)
+    if start_index >= end_index:
+        raise ValueError(
+            f"Empty selection (start {start_index}, end {end_index}) in {emg_file}"
+        )
+    emg_cut = emg_data[start_index:end_index]
+
+    emg_filtered = sosfiltfilt_padded(butter_bandpass_sos(10.0, 450.0, fs), emg_cut, fs)
+    emg_abs = np.abs(detrend(emg_filtered, axis=0))
+    emg_envelope = sosfiltfilt_padded(butter_lowpass_sos(10, fs), emg_abs, fs)
+    time = np.arange(len(emg_envelope)) / fs
+    signal_integ = trapezoid(emg_envelope, time, axis=0)
+
+    window_length = int(fs * 0.25)
+    overlap = int(window_length / 2)
+    features = emg_window_features(emg_filtered, fs, window_length, overlap)
+    window_samples = start_index + features["start"]
+
+    freqs, psd = welch(emg_filtered, fs, axis=0)
+    index_max = np.argmax(psd, axis=0)
+
+    filename = os.path.splitext(os.path.basename(emg_file))[0]
+    summary = []
+    for ch, name in enumerate(channel_names):
+        mdf = features["median_frequency"][:, ch]
+        valid = np.isfinite(mdf)
+        slope = (
+            np.polyfit(window_samples[valid] / fs, mdf[valid], 1)[0]
+            if valid.sum() > 1
+            else np.nan
+        )
+        summary.append(
+            {
+                "File": filename,
+                "Channel": name,
+                "Samples": len(emg_cut),
+                "Linear_envelope_µVolts.s": signal_integ[ch],
+                "RMS_Mean_µVolts": np.nanmean(features["rms"][:, ch])
+                if len(mdf)
+                else np.nan,
+                "MedianFrequency_Mean_Hz": np.nanmean(mdf) if valid.any() else np.nan,
+                "MedianFrequency_Slope_Hz_per_s": slope,
+                "MeanFrequency_Mean_Hz": np.nanmean(features["mean_frequency"][:, ch])
+                if valid.any()
+                else np.nan,
+                "Freq_Max": freqs[index_max[ch]],
+                "PSD_Max": psd[index_max[ch], ch],
+            }
+        )
+
+    if output_dir is not None:
+        import pandas as pd
+
+        os.makedirs(output_dir, exist_ok=True)
+        table = {"Sample": window_samples}
+        for ch, name in enumerate(channel_names):
+            table[f"{name}_RMS_µVolts"] = features["rms"][:, ch]
+            table[f"{name}_MedianFrequency_Hz"] = features["median_frequency"][:, ch]
+            table[f"{name}_MeanFrequency_Hz"] = features["mean_frequency"][:, ch]
+        pd.DataFrame(table).to_csv(
+            os.path.join(output_dir, f"{filename}_multichannel_emg_labiocom.csv"),
+            index=False,
+            float_format="%f",
+        )
+
+        if save_plots:
+            # Figure objects avoid pyplot so this also runs inside worker processes
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=(12, 8))
+            axs = fig.subplots(2, 1, sharex=True)
+            for ch, name in enumerate(channel_names):
+                axs[0].plot(window_samples, features["rms"][:, ch], label=name)
+                axs[1].plot(window_samples, features["median_frequency"][:, ch])
+            axs[0].set_title(f"EMG - RMS ({filename})")
+            axs[0].set_ylabel("RMS (µ Volts)")
+            axs[0].legend(fontsize="small", ncol=4)
+            axs[1].set_title("EMG - Median Frequency")
+            axs[1].set_xlabel("Sample")
+            axs[1].set_ylabel("Frequency (Hz)")
+            for ax in axs:
+                ax.grid(True)
+            fig.tight_layout()
+            fig.savefig(os.path.join(output_dir, f"{filename}_multichannel_emg.png"))
+
+    return summary
+
+
+def _emg_multichannel_worker(args):
+    emg_file = args[0]
+    try:
+        return emg_analysis_multichannel(*args), None
+    except Exception as e:
+        return [], f"{os.path.basename(emg_file)}: {e}"
+
+
+def batch_emg_multichannel(
+    selected_path,
+    fs,
+    start_index=0,
+    end_index=None,
+    output_dir=None,
+    max_workers=None,
+    save_plots=True,
+):
+    """
+    Runs `emg_analysis_multichannel` on every CSV/TXT file in `selected_path` using a
+    process pool and writes one consolidated table (one row per file and channel).
+
+    Returns:
+    - summary_file: str, path of the consolidated CSV.
+    """
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+
+    if output_dir is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = os.path.join(selected_path, f"emg_labiocom_{timestamp}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    emg_files = sorted(
+        os.path.join(selected_path, f)
+        for f in os.listdir(selected_path)
+        if f.endswith(".txt") or f.endswith(".csv")
+    )
+    tasks = [
+        (emg_file, fs, start_index, end_index, output_dir, None, save_plots)
+        for emg_file in emg_files
+    ]
+
+    rows = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for i, (summary, error) in enumerate(
+            executor.map(_emg_multichannel_worker, tasks), start=1
+        ):
+            if error:
+                errors.append(error)
+                print(f"[{i}/{len(tasks)}] Error: {error}")
+            else:
+                rows.extend(summary)
+                print(f"[{i}/{len(tasks)}] {summary[0]['File']}: {len(summary)} channels")
+
+    summary_file = os.path.join(output_dir, "emg_multichannel_summary.csv")
+    pd.DataFrame(rows).to_csv(summary_file, index=False)
+    if errors:
+        with open(os.path.join(output_dir, "log_errors.txt"), "w") as f:
+            f.write("\n".join(errors) + "\n")
+    print(f"Results written to {summary_file}\n Have a good study!")
+    return summary_file
+
+
 def plot_initial_emg(emg_file, fs):
     emg_signal = np.genfromtxt(
         emg_file, delimiter=",", skip_header=1, filling_values=0.0
@@ -458,6 +804,44 @@ def run_emg_gui():
         messagebox.showerror("No Directory Selected", "No directory selected. Exiting.")
         return
 
+    if messagebox.askyesno(
+        "Multi-channel Mode",
+        "Analyze ALL EMG channels of every file in the directory (multi-channel batch)?",
+    ):
+        fs = simpledialog.askinteger(
+            "Input", "Enter Sampling Rate (Hz):", initialvalue=2000, minvalue=1
+        )
+        if fs is None:
+            messagebox.showerror(
+                "No Sampling Rate", "No sampling rate provided. Exiting."
+            )
+            return
+        range_input = simpledialog.askstring(
+            "Input",
+            "Enter Start (integer sample index), End (integer sample index) separated by commas:",
+            initialvalue="0,None",
+        )
+        try:
+            start_text, end_text = (range_input or "0,None").split(",")
+            start_index = int(start_text)
+            end_index = int(end_text) if end_text.strip().lower() != "none" else None
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Invalid input values. Exiting.")
+            return
+        max_workers = simpledialog.askinteger(
+            "Input",
+            "Number of parallel workers:",
+            initialvalue=os.cpu_count() or 1,
+            minvalue=1,
+        )
+        summary_file = batch_emg_multichannel(
+            selected_path, fs, start_index, end_index, max_workers=max_workers
+        )
+        messagebox.showinfo(
+            "Success", f"EMG analysis completed!\nSummary: {summary_file}"
+        )
+        return
+
     emg_file = filedialog.askopenfilename(
         title="Select EMG File",
         filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt")],
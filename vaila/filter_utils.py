@@ -3,10 +3,15 @@ Module: filter_utils.py
 Description: This module provides a unified and flexible Butterworth filter function for low-pass and band-pass filtering of signals. The function supports edge effect mitigation through optional signal padding and uses second-order sections (SOS) for improved numerical stability.
 
 Author: Prof. Dr. Paulo R. P. Santiago
-Version: 1.1
-Date: 2024-09-12
+Version: 1.2
+Date: 2026-10-18
 
 Changelog:
+- Version 1.2 (2026-10-18):
+  - Added `butter_design`, a memoized Butterworth design (SOS or b/a) keyed by
+    (order, cutoff, fs, type), shared by the filtering helpers of other modules.
+  - Added `butter_filter_batch` to filter many trials with one `sosfiltfilt` call
+    by stacking equal-shape trials into a single array.
 - Version 1.1 (2024-09-12):
   - Modified `butter_filter` to handle multidimensional data.
   - Adjusted padding length dynamically based on data length.
@@ -18,12 +23,96 @@ Usage Example:
 
 - Band-pass filter:
   `filtered_data_band = butter_filter(data, fs=1000, filter_type='band', lowcut=5, highcut=15, order=4)`
+
+- Many trials at once:
+  `filtered_trials = butter_filter_batch([trial1, trial2, ...], fs=1000, cutoff=10)`
 """
 
+from functools import lru_cache
 from scipy.signal import butter, sosfiltfilt
 import numpy as np
 
 
+@lru_cache(maxsize=256)
+def _cached_design(order, cutoff, fs, filter_type, output):
+    nyq = 0.5 * fs  # Nyquist frequency
+    if isinstance(cutoff, tuple):
+        wn = [c / nyq for c in cutoff]
+    else:
+        wn = cutoff / nyq
+    return butter(order, wn, btype=filter_type, analog=False, output=output)
+
+
+def butter_design(order, cutoff, fs, filter_type="low", output="sos"):
+    """
+    Returns a memoized Butterworth design.
+
+    Parameters:
+    - order: int
+        The order of the Butterworth filter.
+    - cutoff: float or (float, float)
+        Cutoff frequency in Hz, or (lowcut, highcut) for band-pass/band-stop.
+    - fs: float
+        The sampling frequency of the signal.
+    - filter_type: str, default='low'
+        'low', 'high', 'band' or 'bandstop' (as in `scipy.signal.butter`).
+    - output: str, default='sos'
+        'sos' for second-order sections or 'ba' for (b, a) coefficients.
+
+    Returns:
+    - sos array or (b, a) tuple (copies of the cached design, safe to modify).
+    """
+    if np.ndim(cutoff):
+        cutoff = tuple(float(c) for c in cutoff)
+    else:
+        cutoff = float(cutoff)
+    coeffs = _cached_design(int(order), cutoff, float(fs), filter_type, output)
+    if output == "ba":
+        return coeffs[0].copy(), coeffs[1].copy()
+    return coeffs.copy()
+
+
+def _design_from_args(fs, filter_type, cutoff, lowcut, highcut, order):
+    if filter_type == "low":
+        if cutoff is None:
+            raise ValueError("Cutoff frequency must be provided for low-pass filter.")
+        return butter_design(order, cutoff, fs, "low")
+    if filter_type == "band":
+        if lowcut is None or highcut is None:
+            raise ValueError(
+                "Lowcut and highcut frequencies must be provided for band-pass filter."
+            )
+        return butter_design(order, (lowcut, highcut), fs, "band")
+    raise ValueError(
+        "Unsupported filter type. Use 'low' for low-pass or 'band' for band-pass."
+    )
+
+
+def _sosfiltfilt_padded(sos, data, fs, axis, padding):
+    if not padding:
+        return sosfiltfilt(sos, data, axis=axis, padlen=0)
+
+    data_len = data.shape[axis]
+    # Ensure padding length is suitable for data length
+    max_padlen = data_len - 1
+    padlen = min(int(fs), max_padlen, 15)
+
+    if data_len <= padlen:
+        raise ValueError(
+            f"The length of the input data ({data_len}) must be greater than the padding length ({padlen})."
+        )
+
+    # Pad the data along the specified axis
+    pad_width = [(0, 0)] * data.ndim
+    pad_width[axis] = (padlen, padlen)
+    padded_data = np.pad(data, pad_width=pad_width, mode="reflect")
+    filtered_padded_data = sosfiltfilt(sos, padded_data, axis=axis, padlen=0)
+    # Remove padding
+    idx = [slice(None)] * data.ndim
+    idx[axis] = slice(padlen, -padlen)
+    return filtered_padded_data[tuple(idx)]
+
+
 def butter_filter(
     data,
     fs,
@@ -59,51 +148,54 @@ def butter_filter(
     - filtered_data: array-like
         The filtered signal.
     """
-    # Check filter type and set parameters
-    nyq = 0.5 * fs  # Nyquist frequency
-    if filter_type == "low":
-        if cutoff is None:
-            raise ValueError("Cutoff frequency must be provided for low-pass filter.")
-        normal_cutoff = cutoff / nyq
-        sos = butter(order, normal_cutoff, btype="low", analog=False, output="sos")
-    elif filter_type == "band":
-        if lowcut is None or highcut is None:
-            raise ValueError(
-                "Lowcut and highcut frequencies must be provided for band-pass filter."
-            )
-        low = lowcut / nyq
-        high = highcut / nyq
-        sos = butter(order, [low, high], btype="band", analog=False, output="sos")
-    else:
-        raise ValueError(
-            "Unsupported filter type. Use 'low' for low-pass or 'band' for band-pass."
-        )
-
+    sos = _design_from_args(fs, filter_type, cutoff, lowcut, highcut, order)
     data = np.asarray(data)
-    axis = 0  # Filtering along the first axis (rows)
+    # Filtering along the first axis (rows)
+    return _sosfiltfilt_padded(sos, data, fs, axis=0, padding=padding)
 
-    # Apply padding if needed to handle edge effects
-    if padding:
-        data_len = data.shape[axis]
-        # Ensure padding length is suitable for data length
-        max_padlen = data_len - 1
-        padlen = min(int(fs), max_padlen, 15)
 
-        if data_len <= padlen:
-            raise ValueError(
-                f"The length of the input data ({data_len}) must be greater than the padding length ({padlen})."
-            )
+def butter_filter_batch(
+    trials,
+    fs,
+    filter_type="low",
+    cutoff=None,
+    lowcut=None,
+    highcut=None,
+    order=4,
+    padding=True,
+):
+    """
+    Applies the same Butterworth filter to many trials.
 
-        # Pad the data along the specified axis
-        pad_width = [(0, 0)] * data.ndim
-        pad_width[axis] = (padlen, padlen)
-        padded_data = np.pad(data, pad_width=pad_width, mode="reflect")
-        filtered_padded_data = sosfiltfilt(sos, padded_data, axis=axis, padlen=0)
-        # Remove padding
-        idx = [slice(None)] * data.ndim
-        idx[axis] = slice(padlen, -padlen)
-        filtered_data = filtered_padded_data[tuple(idx)]
-    else:
-        filtered_data = sosfiltfilt(sos, data, axis=axis, padlen=0)
+    Trials with the same shape are stacked into one array (trials, samples, ...) and
+    filtered with a single `sosfiltfilt` call along the samples axis, using one cached
+    design. Each result is identical to `butter_filter` on that trial.
+
+    Parameters:
+    - trials: list of array-like or array-like
+        List of trials (each 1D or multidimensional, samples along the first axis),
+        or an already stacked array with trials along the first axis.
+    - fs, filter_type, cutoff, lowcut, highcut, order, padding:
+        As in `butter_filter`.
+
+    Returns:
+    - filtered: list of arrays in the input order, or an array if `trials` was an
+      array.
+    """
+    sos = _design_from_args(fs, filter_type, cutoff, lowcut, highcut, order)
+
+    if isinstance(trials, np.ndarray):
+        return _sosfiltfilt_padded(sos, trials, fs, axis=1, padding=padding)
+
+    trials = [np.asarray(trial) for trial in trials]
+    groups = {}
+    for i, trial in enumerate(trials):
+        groups.setdefault(trial.shape, []).append(i)
 
-    return filtered_data
+    filtered = [None] * len(trials)
+    for indices in groups.values():
+        stacked = np.stack([trials[i] for i in indices])
+        result = _sosfiltfilt_padded(sos, stacked, fs, axis=1, padding=padding)
+        for k, i in enumerate(indices):
+            filtered[i] = result[k]
+    return filtered
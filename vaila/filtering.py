@@ -1,5 +1,6 @@
 import numpy as np
-from scipy.signal import butter, filtfilt, firwin
+from scipy.signal import filtfilt, firwin
+from vaila.filter_utils import butter_design
 
 
 def apply_filter(
@@ -10,7 +11,7 @@ def apply_filter(
     normal_cutoff = cutoff / nyquist
 
     if method == "butterworth":
-        b, a = butter(order, normal_cutoff, btype="low", analog=False)
+        b, a = butter_design(order, cutoff, sample_rate, "low", output="ba")
         padded_data = np.pad(data, ((padlen, padlen), (0, 0)), mode="reflect")
         filtered_data = filtfilt(b, a, padded_data, axis=0)
         filtered_data = filtered_data[padlen:-padlen, :]
@@ -186,9 +186,10 @@ import sys
 import os
 import csv
 from datetime import datetime
-from scipy.signal import butter, filtfilt
+from scipy.signal import filtfilt
 from scipy.signal import find_peaks
 from scipy.optimize import curve_fit
+from vaila.filter_utils import butter_design
 from rich import print
 from ydata_profiling import ProfileReport
 from tkinter import (
@@ -617,7 +618,7 @@ def butterworthfilt(data, cutoff=59, Fs=1000):
     """
     pad_length = 100
     padded_data = np.pad(data, (pad_length, pad_length), "edge")
-    b, a = butter(4, cutoff / (Fs / 2), "low")
+    b, a = butter_design(4, cutoff, Fs, "low", output="ba")
     filtered_padded = filtfilt(b, a, padded_data)
     filtered_data = filtered_padded[pad_length:-pad_length]
     return filtered_data
@@ -1,9 +1,10 @@
-import maintools as tools
+from vaila.readc3d_stream import C3DStreamReader
 
 
 def display_joint_names_from_c3d(file_path):
-    dict_kin = tools.get_kinematics_c3d(file_path)
-    joint_names = list(dict_kin.keys())
+    # Only the header and parameter section are read
+    with C3DStreamReader(file_path) as reader:
+        joint_names = [label.strip() for label in reader.marker_labels]
     print("Available Joint Names in the C3D file:")
     for name in joint_names:
         print(name)
@@ -2,11 +2,71 @@ import numpy as np
 import ezc3d
 import os
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
+from collections.abc import Mapping
 import matplotlib.pyplot as plt
 from scipy import interpolate
 import matplotlib.patches as mpatches
 from scipy import signal
+from vaila.readc3d_stream import C3DStreamReader
+from vaila.filter_utils import butter_design
+
+
+AXIS_INDEX = {"x": 0, "y": 1, "z": 2}
+
+
+class KinematicsData(Mapping):
+    """
+    Array-backed kinematics container.
+
+    Coordinates are kept in a single (frames, markers, 3) ndarray together with a
+    label -> marker index map. Per-joint and per-axis accessors return NumPy views,
+    so no data is copied. For compatibility with code written for the former
+    dictionary output, `data[label]` returns {"x": view, "y": view, "z": view} and
+    `data.keys()` lists the marker labels.
+
+    Parameters:
+    - points: ndarray (frames, markers, 3)
+    - labels: list of str, one label per marker
+    - freq: float, optional, sampling frequency in Hz
+    """
+
+    def __init__(self, points, labels, freq=None):
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 3 or points.shape[2] != 3:
+            raise ValueError("points must be a (frames, markers, 3) array")
+        if points.shape[1] != len(labels):
+            raise ValueError("The number of labels must match the number of markers")
+        self.points = points
+        self.labels = [str(label).strip() for label in labels]
+        self.freq = freq
+        self.label_index = {}
+        for idx, label in enumerate(self.labels):
+            self.label_index.setdefault(label, idx)
+
+    @property
+    def n_frames(self):
+        return self.points.shape[0]
+
+    def joint(self, label):
+        """Returns a (frames, 3) view of one marker."""
+        if label not in self.label_index:
+            raise KeyError(f"The specified joint '{label}' is not found")
+        return self.points[:, self.label_index[label], :]
+
+    def axis(self, label, axis):
+        """Returns a (frames,) view of one coordinate ('x', 'y' or 'z') of one marker."""
+        return self.joint(label)[:, AXIS_INDEX[axis.lower()]]
+
+    def __getitem__(self, label):
+        joint = self.joint(label)
+        return {"x": joint[:, 0], "y": joint[:, 1], "z": joint[:, 2]}
+
+    def __iter__(self):
+        return iter(self.label_index)
+
+    def __len__(self):
+        return len(self.label_index)
 
 
 def get_kinematics_c3d(file_path):
@@ -18,35 +78,17 @@ def get_kinematics_c3d(file_path):
     file_path (str): The path to the C3D file.
 
     Returns:
-    dict: A dictionary containing x, y, z coordinates for each point label in the C3D file.
+    KinematicsData: Array-backed container with the (frames, markers, 3) coordinates,
+    the point labels and the point frame rate. It behaves like the former dictionary
+    of x, y, z coordinates per label. An empty dict is returned on error.
     """
     try:
-        # Load the C3D file using ezc3d
-        c3d = ezc3d.c3d(file_path)
-
-        # Initialize a dictionary to store x, y, z coordinates for each point label
-        all_points = {
-            label: {"x": [], "y": [], "z": []}
-            for label in c3d["parameters"]["POINT"]["LABELS"]["value"]
-        }
-
-        # Get the number of frames
-        num_frames = c3d["data"]["points"].shape[2]
-
-        # Iterate through frames in the C3D file
-        for frame_idx in range(num_frames):
-            # Get the coordinates for the current frame
-            frame = c3d["data"]["points"][:, :, frame_idx]
-            # Iterate through each point label in the current frame
-            for idx, label in enumerate(all_points.keys()):
-                # Append x, y, z coordinates of the current point label to the dictionary
-                all_points[label]["x"].append(frame[0, idx])
-                all_points[label]["y"].append(frame[1, idx])
-                all_points[label]["z"].append(frame[2, idx])
-
-        # Return the dictionary containing all point data
-        all_points = {key.strip(): value for key, value in all_points.items()}
-        return all_points
+        # Read only the point data through the memory-mapped streaming reader,
+        # so the analog channels are never loaded
+        with C3DStreamReader(file_path) as reader:
+            return KinematicsData(
+                reader.read_points(), reader.marker_labels, reader.marker_freq
+            )
 
     except FileNotFoundError:
         print(f"C3D file not found: {file_path}")
@@ -89,17 +131,17 @@ def get_kinematic_framerate(file_path: str) -> int:
 
 
 def butter_lowpass(freq, data, fc=6, order=4):
-    w = fc / (freq / 2)  # Normalize the frequency
-    b, a = signal.butter(order, w, btype="low")
+    b, a = butter_design(order, fc, freq, "low", output="ba")
     filt_signal = signal.filtfilt(b, a, data)
     return filt_signal
 
 
 def get_joint_df(
-    kinematic_dict: Dict[str, Dict[str, list]], joint: Optional[str] = None
+    kinematic_dict: Union[KinematicsData, Dict[str, Dict[str, list]]],
+    joint: Optional[str] = None,
 ) -> pd.DataFrame:
-    if not isinstance(kinematic_dict, dict):
-        raise TypeError("kinematic_dict must be a dictionary")
+    if not isinstance(kinematic_dict, Mapping):
+        raise TypeError("kinematic_dict must be a dictionary or KinematicsData")
 
     if joint is None:
         raise KeyError("Please specify a joint.")
@@ -107,56 +149,192 @@ def get_joint_df(
     if joint not in kinematic_dict:
         raise KeyError(f"The specified joint '{joint}' is not found in kinematic_dict")
 
+    if isinstance(kinematic_dict, KinematicsData):
+        return pd.DataFrame(
+            kinematic_dict.joint(joint), columns=["x", "y", "z"], copy=False
+        )
+
     return pd.DataFrame(kinematic_dict[joint])
 
 
-def timenormalize_data(signal, T1=None, T2=None, n_el=101):
-    T1 = T1 if T1 is not None else 0
-    T2 = T2 if T2 is not None else len(signal)
-
-    x_base_norm = np.linspace(1, T2 - T1 + 1, n_el)
-    x_base_current = np.arange(1, T2 - T1 + 1)
-    nM = signal.shape[1]
-    signal_timenormalized = np.empty((n_el, nM))
-    signal_timenormalized[:] = np.nan
-    for i in range(nM):
-        y_current = signal.iloc[T1:T2, i]
-        if np.sum(np.isnan(y_current.astype("float").values)):
-            y_current = np.zeros(len(y_current), 1)
-        spline = interpolate.InterpolatedUnivariateSpline(x_base_current, y_current)
-        signal_timenormalized[:, i] = spline(x_base_norm)
-    return signal_timenormalized
+def _fill_nan_gaps(data, max_gap=None):
+    """
+    Linearly fills the NaN samples of every column of a (frames, channels) array.
+
+    Gaps of up to `max_gap` consecutive samples with valid samples on both sides are
+    bridged; every other NaN is filled only so a spline can be fitted and is reported
+    as missing. Returns (filled, missing), both (frames, channels); missing is None
+    when there is no NaN.
+    """
+    valid = ~np.isnan(data)
+    if valid.all():
+        return data, None
+    n = len(data)
+    idx = np.arange(n)[:, np.newaxis]
+    # Previous and next valid sample of every frame, per channel
+    prev = np.maximum.accumulate(np.where(valid, idx, -1), axis=0)
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[::-1], axis=0)[::-1]
+    has_prev = prev >= 0
+    has_next = nxt < n
+    p = np.clip(prev, 0, n - 1)
+    q = np.clip(nxt, 0, n - 1)
+    vp = np.take_along_axis(data, p, axis=0)
+    vq = np.take_along_axis(data, q, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w = np.where(q > p, (idx - p) / (q - p), 0.0)
+    interior = vp + w * (vq - vp)
+    filled = np.where(
+        valid,
+        data,
+        np.where(
+            has_prev & has_next,
+            interior,
+            np.where(has_prev, vp, np.where(has_next, vq, 0.0)),
+        ),
+    )
+    if max_gap is None:
+        bridged = np.zeros_like(valid)
+    else:
+        bridged = ~valid & has_prev & has_next & ((nxt - prev - 1) <= max_gap)
+    return filled, ~valid & ~bridged
 
 
-def calculate_coupling_angle(joint1_array: np.ndarray, joint2_array: np.ndarray):
-    if len(joint1_array) != len(joint2_array) or len(joint1_array) == 0:
-        raise ValueError("Input arrays must be of equal non-zero length.")
+def _resample_positions(data, positions, method="linear", max_gap=None):
+    """
+    Evaluates every column of a (frames, channels) array at fractional frame positions.
 
-    array_joint1 = np.diff(joint1_array, axis=0)
-    array_joint2 = np.diff(joint2_array, axis=0)
+    Positions whose neighbouring samples are missing (see `_fill_nan_gaps`) are NaN.
+    Returns an array of shape positions.shape + (channels,).
+    """
+    filled, missing = _fill_nan_gaps(data, max_gap)
+    n = len(filled)
+    t = np.asarray(positions, dtype=float).ravel()
+    i0 = np.clip(np.floor(t).astype(int), 0, max(n - 2, 0))
+    i1 = np.minimum(i0 + 1, n - 1)
+    w = (t - i0)[:, np.newaxis]
+
+    if method == "linear":
+        out = filled[i0] + w * (filled[i1] - filled[i0])
+    elif method == "cubic":
+        out = interpolate.CubicSpline(np.arange(n), filled, axis=0)(t)
+    else:
+        raise ValueError("method must be 'linear' or 'cubic'")
+
+    if missing is not None:
+        gap = (missing[i0] & (w < 1)) | (missing[i1] & (w > 0))
+        out[gap] = np.nan
+    return out.reshape(np.shape(positions) + (data.shape[1],))
+
+
+def timenormalize_cycles(data, cycles, n_points=101, method="linear", max_gap=None):
+    """
+    Time-normalizes many cycles of many channels in one vectorized call.
 
-    vm_ab = np.hypot(array_joint1, array_joint2)
-    cosang_ab = np.divide(array_joint1, vm_ab, where=vm_ab != 0)
-    sinang_ab = np.divide(array_joint2, vm_ab, where=vm_ab != 0)
-    coupangle = np.degrees(np.arctan2(cosang_ab, sinang_ab))
+    Parameters:
+    - data: array-like or DataFrame, shape (frames,), (frames, channels) or
+      (frames, ...) (e.g. KinematicsData.points, (frames, markers, 3)).
+    - cycles: array-like, shape (cycles, 2)
+        (start, end) frame indices of each cycle, both inclusive (e.g. heel strike to
+        next heel strike).
+    - n_points: int
+        Samples per normalized cycle (101 gives 0..100 %).
+    - method: str
+        'linear' or 'cubic' (cubic spline through all frames of each channel).
+    - max_gap: int or None
+        NaN gaps up to this many frames are bridged by linear interpolation; longer
+        gaps (and all gaps when None) give NaN at the normalized samples that fall in them.
 
+    Returns:
+    - ndarray, shape (cycles, n_points, channels) (or (cycles, n_points, ...) for
+      N-D input), ready for ensemble or SPM statistics.
+    """
+    data = np.asarray(data, dtype=float)
+    trailing = data.shape[1:]
+    data = data.reshape(len(data), -1)
+    cycles = np.atleast_2d(np.asarray(cycles, dtype=float))
+    start, end = cycles[:, 0], cycles[:, 1]
+    if np.any(start < 0) or np.any(end > len(data) - 1) or np.any(end <= start):
+        raise ValueError("Each cycle must satisfy 0 <= start < end <= frames - 1")
+
+    frac = np.linspace(0, 1, n_points)
+    positions = start[:, np.newaxis] + frac * (end - start)[:, np.newaxis]
+    out = _resample_positions(data, positions, method, max_gap)
+    return out.reshape((len(cycles), n_points) + trailing)
+
+
+def timenormalize_data(signal, T1=None, T2=None, n_el=101, max_gap=None):
+    # Accepts a DataFrame, a 2-D array or a 1-D array view (e.g. KinematicsData.axis)
+    data = np.asarray(signal, dtype=float)
+    if data.ndim == 1:
+        data = data[:, np.newaxis]
+
+    T1 = T1 if T1 is not None else 0
+    T2 = T2 if T2 is not None else len(data)
+
+    # Cubic spline over data[T1:T2] evaluated at n_el points from frame T1 to frame T2,
+    # for all columns at once; NaN gaps give NaN instead of failing
+    positions = np.linspace(0, T2 - T1, n_el)
+    return _resample_positions(data[T1:T2], positions, "cubic", max_gap)
+
+
+def coupling_angles(joint1_array, joint2_array, axis=0):
+    """
+    Vector coding coupling angles (degrees, 0-360) between two angle time series.
+
+    Works on arrays of any shape; `axis` is the time axis (the result has one sample
+    less along it), so many cycles, joint pairs and axes can be processed at once.
+    """
+    array_joint1 = np.diff(np.asarray(joint1_array, dtype=float), axis=axis)
+    array_joint2 = np.diff(np.asarray(joint2_array, dtype=float), axis=axis)
+    coupangle = np.degrees(np.arctan2(array_joint1, array_joint2))
     coupangle[coupangle < 0] += 360
+    return coupangle
 
-    CtgVar_vc_DG = np.select(
-        condlist=[
-            (coupangle >= 0) & (coupangle < 22.5),
-            (coupangle >= 22.5) & (coupangle < 67.5),
-            (coupangle >= 67.5) & (coupangle < 112.5),
-            (coupangle >= 112.5) & (coupangle < 157.5),
-            (coupangle >= 157.5) & (coupangle < 202.5),
-            (coupangle >= 202.5) & (coupangle < 247.5),
-            (coupangle >= 247.5) & (coupangle < 292.5),
-            (coupangle >= 292.5) & (coupangle < 337.5),
-            (coupangle >= 337.5) & (coupangle < 360),
-        ],
-        choicelist=[1, 2, 3, 4, 1, 2, 3, 4, 1],
-        default=0,
-    )
+
+def coupling_phase(coupangle):
+    """
+    Coordination pattern of each coupling angle: 1 Anti-Phase, 2 In-Phase,
+    3 Joint 1 Phase, 4 Joint 2 Phase (0 for NaN).
+    """
+    coupangle = np.asarray(coupangle)
+    bins = np.array([0, 22.5, 67.5, 112.5, 157.5, 202.5, 247.5, 292.5, 337.5, 360])
+    choices = np.array([0, 1, 2, 3, 4, 1, 2, 3, 4, 1, 0])
+    return choices[np.searchsorted(bins, coupangle, side="right")] * ~np.isnan(coupangle)
+
+
+def phase_percentages(coupangle, axis=-1):
+    """Percentage of samples in each coordination pattern (1..4) along `axis`."""
+    phase = np.moveaxis(coupling_phase(coupangle), axis, -1)
+    counts = (phase[..., np.newaxis] == np.arange(1, 5)).sum(axis=-2)
+    return counts / phase.shape[-1] * 100
+
+
+def circular_mean(angles, axis=0):
+    """
+    Circular mean (degrees, 0-360) and mean resultant length of angles in degrees.
+    """
+    radians = np.radians(angles)
+    mean_sin = np.nanmean(np.sin(radians), axis=axis)
+    mean_cos = np.nanmean(np.cos(radians), axis=axis)
+    mean = np.degrees(np.arctan2(mean_sin, mean_cos)) % 360
+    return mean, np.hypot(mean_sin, mean_cos)
+
+
+def coupling_angle_variability(angles, axis=0):
+    """
+    Coupling angle variability (degrees) across cycles, sqrt(2 * (1 - r)) with r the
+    mean resultant length (Needham et al., 2014).
+    """
+    _, r = circular_mean(angles, axis=axis)
+    return np.degrees(np.sqrt(2 * np.maximum(1 - r, 0)))
+
+
+def calculate_coupling_angle(joint1_array: np.ndarray, joint2_array: np.ndarray):
+    if len(joint1_array) != len(joint2_array) or len(joint1_array) == 0:
+        raise ValueError("Input arrays must be of equal non-zero length.")
+
+    coupangle = coupling_angles(joint1_array, joint2_array, axis=0)
+    CtgVar_vc_DG = coupling_phase(coupangle)
 
     group_phase = [
         round((np.count_nonzero(CtgVar_vc_DG == i) / len(CtgVar_vc_DG)) * 100, 2)
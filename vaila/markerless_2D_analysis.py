@@ -1,8 +1,8 @@
 """
 Script: markerless_2D_analysis.py
 Author: Prof. Dr. Paulo Santiago
-Version: 0.2.0
-Last Updated: September 28, 2024
+Version: 0.3.0
+Last Updated: October 18, 2026
 
 Description:
 This script performs batch processing of videos for 2D pose estimation using 
@@ -25,6 +25,12 @@ New Features:
     - `enable_segmentation=True` (segmentation activated)
     - `smooth_segmentation=True` (smooth segmentation enabled)
 - User input dialog allows fine-tuning these values if desired.
+- Each video is processed as a pipeline of three stages connected by bounded queues:
+  a decoder thread reads the frames, the pose inference runs in order on the calling
+  thread, and an annotator/encoder thread draws the landmarks and writes the output
+  video, so decoding and encoding overlap with the inference.
+- Writing the annotated video (`*_mp.mp4`) can be skipped to save time and disk
+  space when only the landmark CSVs are needed.
 
 Usage:
 - Run the script to open a graphical interface for selecting the input directory 
@@ -59,7 +65,7 @@ Requirements:
 
 Output:
 The following files are generated for each processed video:
-1. Processed Video (`*_mp.mp4`): 
+1. Processed Video (`*_mp.mp4`, optional): 
    The video with the 2D pose landmarks overlaid on the original frames.
 2. Normalized Landmark CSV (`*_mp_norm.csv`):
    A CSV file containing the landmark coordinates normalized to a scale between 0 and 1 
@@ -93,6 +99,8 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 from pathlib import Path
 import platform
+import queue
+import threading
 import numpy as np  # Adicionado para trabalhar com NaN
 
 landmark_names = [
@@ -191,7 +199,67 @@ def get_pose_config():
         return None
 
 
-def process_video(video_path, output_dir, pose_config):
+def _put(q, item, stop_event):
+    """Puts an item on a bounded queue, giving up if the pipeline was stopped."""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decode_frames(cap, frame_queue, stop_event):
+    """Decoder stage: reads the frames of the video into `frame_queue`."""
+    try:
+        while not stop_event.is_set():
+            success, frame = cap.read()
+            if not success:
+                break
+            if not _put(frame_queue, frame, stop_event):
+                return
+    finally:
+        _put(frame_queue, None, stop_event)
+
+
+def _annotate_and_encode(out, encode_queue, errors):
+    """Annotator/encoder stage: draws the landmarks and writes the output video."""
+    try:
+        while True:
+            item = encode_queue.get()
+            if item is None:
+                break
+            frame, pose_landmarks = item
+            if pose_landmarks:
+                mp.solutions.drawing_utils.draw_landmarks(
+                    frame, pose_landmarks, mp.solutions.pose.POSE_CONNECTIONS
+                )
+            out.write(frame)
+    except Exception as e:
+        errors.append(e)
+        # Keep consuming so the inference stage never blocks on a full queue
+        while encode_queue.get() is not None:
+            pass
+
+
+def process_video(video_path, output_dir, pose_config, save_video=True, queue_size=8):
+    """
+    Runs MediaPipe Pose on one video and writes the landmark CSVs, the log and
+    (optionally) the annotated video.
+
+    The video is processed as a pipeline: a decoder thread, the pose inference on
+    this thread (frames stay in order, as the tracking needs), and an annotator/encoder
+    thread, connected by queues of at most `queue_size` frames.
+
+    Args:
+        video_path (Path): Input video.
+        output_dir (Path): Output directory.
+        pose_config (dict): MediaPipe Pose parameters (see get_pose_config).
+        save_video (bool): Write the annotated `*_mp.mp4` video.
+        queue_size (int): Maximum number of frames waiting between two stages. A few
+            frames are enough to overlap the stages; each 1080p frame takes ~6 MB.
+    """
     if platform.system() == "Windows" and platform.version().startswith("10."):
         if len(str(video_path)) > 255 or len(str(output_dir)) > 255:
             messagebox.showerror(
@@ -223,8 +291,10 @@ def process_video(video_path, output_dir, pose_config):
     output_pixel_file_path = output_dir / f"{video_path.stem}_mp_pixel.csv"
 
     codec = "mp4v"
-    fourcc = cv2.VideoWriter_fourcc(*codec)
-    out = cv2.VideoWriter(str(output_video_path), fourcc, fps, (width, height))
+    out = None
+    if save_video:
+        fourcc = cv2.VideoWriter_fourcc(*codec)
+        out = cv2.VideoWriter(str(output_video_path), fourcc, fps, (width, height))
 
     pose = mp.solutions.pose.Pose(
         static_image_mode=pose_config["static_image_mode"],
@@ -245,42 +315,71 @@ def process_video(video_path, output_dir, pose_config):
     pixel_landmarks_list = []
     frames_with_missing_data = []
 
-    frame_count = 0
-    while cap.isOpened():
-        success, frame = cap.read()
-        if not success:
-            break
-
-        results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        if results.pose_landmarks:
-            mp.solutions.drawing_utils.draw_landmarks(
-                frame, results.pose_landmarks, mp.solutions.pose.POSE_CONNECTIONS
-            )
-            landmarks = [
-                [landmark.x, landmark.y, landmark.z]
-                for landmark in results.pose_landmarks.landmark
-            ]
-            normalized_landmarks_list.append(landmarks)
-
-            pixel_landmarks = [
-                [int(landmark.x * width), int(landmark.y * height), landmark.z]
-                for landmark in results.pose_landmarks.landmark
-            ]
-            pixel_landmarks_list.append(pixel_landmarks)
-        else:
-            # Insere NaN para os frames com dados ausentes
-            num_landmarks = len(landmark_names)
-            nan_landmarks = [[np.nan, np.nan, np.nan] for _ in range(num_landmarks)]
-            normalized_landmarks_list.append(nan_landmarks)
-            pixel_landmarks_list.append(nan_landmarks)
-            frames_with_missing_data.append(frame_count)
-
-        out.write(frame)
-        frame_count += 1
+    # Pipeline stages
+    stop_event = threading.Event()
+    frame_queue = queue.Queue(maxsize=queue_size)
+    decoder = threading.Thread(
+        target=_decode_frames, args=(cap, frame_queue, stop_event), daemon=True
+    )
+    encoder_errors = []
+    encode_queue = None
+    encoder = None
+    if out is not None:
+        encode_queue = queue.Queue(maxsize=queue_size)
+        encoder = threading.Thread(
+            target=_annotate_and_encode,
+            args=(out, encode_queue, encoder_errors),
+            daemon=True,
+        )
+        encoder.start()
+    decoder.start()
 
-    cap.release()
-    out.release()
-    pose.close()
+    frame_count = 0
+    try:
+        while True:
+            frame = frame_queue.get()
+            if frame is None:
+                break
+
+            results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if results.pose_landmarks:
+                landmarks = [
+                    [landmark.x, landmark.y, landmark.z]
+                    for landmark in results.pose_landmarks.landmark
+                ]
+                normalized_landmarks_list.append(landmarks)
+
+                pixel_landmarks = [
+                    [int(landmark.x * width), int(landmark.y * height), landmark.z]
+                    for landmark in results.pose_landmarks.landmark
+                ]
+                pixel_landmarks_list.append(pixel_landmarks)
+            else:
+                # Insere NaN para os frames com dados ausentes
+                num_landmarks = len(landmark_names)
+                nan_landmarks = [
+                    [np.nan, np.nan, np.nan] for _ in range(num_landmarks)
+                ]
+                normalized_landmarks_list.append(nan_landmarks)
+                pixel_landmarks_list.append(nan_landmarks)
+                frames_with_missing_data.append(frame_count)
+
+            if encode_queue is not None:
+                encode_queue.put((frame, results.pose_landmarks))
+            frame_count += 1
+    finally:
+        stop_event.set()
+        decoder.join()
+        if encoder is not None:
+            encode_queue.put(None)
+            encoder.join()
+        cap.release()
+        if out is not None:
+            out.release()
+        pose.close()
+
+    if encoder_errors:
+        raise encoder_errors[0]
 
     total_frames = len(normalized_landmarks_list)
 
@@ -317,16 +416,20 @@ def process_video(video_path, output_dir, pose_config):
 
     end_time = time.time()
     execution_time = end_time - start_time
+    processing_fps = frame_count / execution_time if execution_time > 0 else 0.0
 
     log_info_path = output_dir / "log_info.txt"
     with open(log_info_path, "w") as log_file:
         log_file.write(f"Video Path: {video_path}\n")
-        log_file.write(f"Output Video Path: {output_video_path}\n")
+        log_file.write(
+            f"Output Video Path: {output_video_path if save_video else 'not saved'}\n"
+        )
         log_file.write(f"Codec: {codec}\n")
         log_file.write(f"Resolution: {width}x{height}\n")
         log_file.write(f"FPS: {fps}\n")
         log_file.write(f"Total Frames: {frame_count}\n")
         log_file.write(f"Execution Time: {execution_time} seconds\n")
+        log_file.write(f"Processing Speed: {processing_fps:.2f} FPS\n")
         log_file.write(f"MediaPipe Pose Configuration: {pose_config}\n")
         if frames_with_missing_data:
             log_file.write(
@@ -359,6 +462,11 @@ def process_videos_in_directory():
     if not pose_config:
         return
 
+    save_video = messagebox.askyesno(
+        "Annotated Video",
+        "Save the annotated videos (*_mp.mp4)?\n(No: landmark CSV files only, faster)",
+    )
+
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     output_base = Path(output_base) / f"mediapipe_{timestamp}"
     output_base.mkdir(parents=True, exist_ok=True)
@@ -369,7 +477,7 @@ def process_videos_in_directory():
             output_dir = output_base / video_file.stem
             output_dir.mkdir(parents=True, exist_ok=True)
             print(f"Processing video: {video_file}")
-            process_video(video_file, output_dir, pose_config)
+            process_video(video_file, output_dir, pose_config, save_video)
 
 
 if __name__ == "__main__":
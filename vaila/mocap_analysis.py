@@ -6,7 +6,7 @@ from datetime import datetime
 from tkinter import messagebox, filedialog, simpledialog, Tk
 from vaila.data_processing import read_mocap_csv
 from vaila.filtering import apply_filter
-from vaila.rotation import createortbase_4points, calcmatrot, rotmat2euler
+from vaila.segment_kinematics import compute_segment_kinematics
 from vaila.plotting import plot_orthonormal_bases
 from vaila.readcsv import get_csv_headers, select_headers_gui
 
@@ -44,6 +44,171 @@ def read_anatomical_csv(file_path):
         return None
 
 
+def compute_mocap_kinematics(
+    trunk_points,
+    pelvis_points,
+    sample_rate,
+    anatomical_data=None,
+    filter_method="butterworth",
+):
+    """
+    Filters the trunk and pelvis markers of one trial and computes both bases and
+    Euler angles (minus the anatomical medians when given).
+
+    Parameters:
+    - trunk_points: ndarray (frames, 12), STRN, CLAV, C7, T10 (x, y, z).
+    - pelvis_points: ndarray (frames, 12), RASI, LASI, RPSI, LPSI (x, y, z).
+    - sample_rate: float, Hz.
+    - anatomical_data: dict with "trunk"/"pelvis" medians or None.
+    - filter_method: str, 'butterworth' or 'fir' (see `vaila.filtering.apply_filter`).
+
+    Returns:
+    - dict with "time", "points", "bases", "origins" and "euler" (trunk, pelvis).
+    """
+    time = np.linspace(0, len(trunk_points) / sample_rate, len(trunk_points))
+    trunk_pointsf = apply_filter(trunk_points, sample_rate, method=filter_method)
+    pelvis_pointsf = apply_filter(pelvis_points, sample_rate, method=filter_method)
+
+    # Both segments in one pass; same results as createortbase_4points/calcmatrot/rotmat2euler
+    markers = np.hstack((trunk_pointsf, pelvis_pointsf)).reshape(len(time), 8, 3)
+    kinematics = compute_segment_kinematics(
+        markers,
+        [
+            {"segment": "trunk", "markers": [0, 1, 2, 3], "configuration": "x"},
+            {"segment": "pelvis", "markers": [4, 5, 6, 7], "configuration": "z"},
+        ],
+    )
+    euler = list(kinematics["euler"])
+    if anatomical_data:
+        euler[0] = euler[0] - anatomical_data["trunk"]
+        euler[1] = euler[1] - anatomical_data["pelvis"]
+
+    return {
+        "time": time,
+        "points": [
+            [markers[:, i] for i in range(4)],
+            [markers[:, i] for i in range(4, 8)],
+        ],
+        "bases": list(kinematics["bases"]),
+        "origins": list(kinematics["origins"]),
+        "euler": euler,
+    }
+
+
+def plot_euler_angles(
+    fig, time, trunk_euler_angles, pelvis_euler_angles, file_name, anatomical_data=None
+):
+    """Draws the X, Y and Z Euler angles of trunk and pelvis on `fig` (pyplot or Agg Figure)."""
+    use_anatomical = bool(anatomical_data)
+    if use_anatomical:
+        trunk_euler_angles_anat = anatomical_data["trunk"]
+        pelvis_euler_angles_anat = anatomical_data["pelvis"]
+
+    max_val = np.max([trunk_euler_angles, pelvis_euler_angles])
+    min_val = np.min([trunk_euler_angles, pelvis_euler_angles])
+
+    axes = fig.subplots(3, 1)
+
+    axes[0].plot(
+        time,
+        trunk_euler_angles[:, 0],
+        label="Trunk X [Ext. backward (+) Flex. forward (-)]",
+        color="red",
+    )
+    axes[0].plot(
+        time,
+        pelvis_euler_angles[:, 0],
+        label="Pelvis X [Ext. backward (+) Flex. forward (-)]",
+        linestyle="--",
+        color="red",
+    )
+    if use_anatomical:
+        axes[0].axhline(
+            trunk_euler_angles_anat[0],
+            color="gray",
+            linestyle="-",
+            label="Anatomical Trunk X",
+        )
+        axes[0].axhline(
+            pelvis_euler_angles_anat[0],
+            color="gray",
+            linestyle="--",
+            label="Anatomical Pelvis X",
+        )
+    axes[0].set_xlabel("Time (s)")
+    axes[0].set_ylabel("X: Ext(+)/Flex(-) (degrees)")
+    axes[0].legend()
+    axes[0].set_title(f"Euler Angles - {file_name} (X-axis)")
+
+    axes[1].plot(
+        time,
+        trunk_euler_angles[:, 1],
+        label="Trunk Y [Side Bending Right (+) Side Bending Left (-)]",
+        color="green",
+    )
+    axes[1].plot(
+        time,
+        pelvis_euler_angles[:, 1],
+        label="Pelvis Y [Side Bending Right (+) Side Bending Left (-)]",
+        linestyle="--",
+        color="green",
+    )
+    if use_anatomical:
+        axes[1].axhline(
+            trunk_euler_angles_anat[1],
+            color="gray",
+            linestyle="-",
+            label="Anatomical Trunk Y",
+        )
+        axes[1].axhline(
+            pelvis_euler_angles_anat[1],
+            color="gray",
+            linestyle="--",
+            label="Anatomical Pelvis Y",
+        )
+    axes[1].set_xlabel("Time (s)")
+    axes[1].set_ylabel("Y: Side Bending R(+)/L(-) (degrees)")
+    axes[1].legend()
+    axes[1].set_title(f"Euler Angles - {file_name} (Y-axis)")
+
+    axes[2].plot(
+        time,
+        trunk_euler_angles[:, 2],
+        label="Trunk Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
+        color="blue",
+    )
+    axes[2].plot(
+        time,
+        pelvis_euler_angles[:, 2],
+        label="Pelvis Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
+        linestyle="--",
+        color="blue",
+    )
+    if use_anatomical:
+        axes[2].axhline(
+            trunk_euler_angles_anat[2],
+            color="gray",
+            linestyle="-",
+            label="Anatomical Trunk Z",
+        )
+        axes[2].axhline(
+            pelvis_euler_angles_anat[2],
+            color="gray",
+            linestyle="--",
+            label="Anatomical Pelvis Z",
+        )
+    axes[2].set_xlabel("Time (s)")
+    axes[2].set_ylabel("Z: Axial Rot. R(+)/L(-) (degrees)")
+    axes[2].legend()
+    axes[2].set_title(f"Euler Angles - {file_name} (Z-axis)")
+
+    margin = 0.05 * (max_val - min_val)
+    axes[0].set_ylim([min_val - margin, max_val + margin])
+    axes[1].set_ylim([min_val - margin, max_val + margin])
+    axes[2].set_ylim([min_val - margin, max_val + margin])
+    return fig
+
+
 def analyze_mocap_fullbody_data():
     root = Tk()
     root.withdraw()  # Hide the main Tkinter window
@@ -156,38 +321,20 @@ def analyze_mocap_fullbody_data():
             print(f"File {file_name} does not contain all required pelvis columns.")
             continue
 
-        trunk_points = data[trunk_headers].values
-        pelvis_points = data[pelvis_headers].values
-
-        trunk_pointsf = apply_filter(trunk_points, sample_rate, method=filter_method)
-        pelvis_pointsf = apply_filter(pelvis_points, sample_rate, method=filter_method)
-
-        trunk_p1 = trunk_pointsf[:, [0, 1, 2]]
-        trunk_p2 = trunk_pointsf[:, [3, 4, 5]]
-        trunk_p3 = trunk_pointsf[:, [6, 7, 8]]
-        trunk_p4 = trunk_pointsf[:, [9, 10, 11]]
-
-        pelvis_p1 = pelvis_pointsf[:, [0, 1, 2]]
-        pelvis_p2 = pelvis_pointsf[:, [3, 4, 5]]
-        pelvis_p3 = pelvis_pointsf[:, [6, 7, 8]]
-        pelvis_p4 = pelvis_pointsf[:, [9, 10, 11]]
-
-        blab = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
-
-        trunk_base, orig_trunk = createortbase_4points(
-            trunk_p1, trunk_p2, trunk_p3, trunk_p4, configuration="x"
-        )
-        pelvis_base, orig_pelvis = createortbase_4points(
-            pelvis_p1, pelvis_p2, pelvis_p3, pelvis_p4, configuration="z"
+        anatomical = anatomical_data.get(file_name) if use_anatomical else None
+        result = compute_mocap_kinematics(
+            data[trunk_headers].values,
+            data[pelvis_headers].values,
+            sample_rate,
+            anatomical,
+            filter_method,
         )
+        trunk_euler_angles, pelvis_euler_angles = result["euler"]
 
         fig_matplotlib = plot_orthonormal_bases(
-            [trunk_base, pelvis_base],
-            [orig_trunk, orig_pelvis],
-            [
-                [trunk_p1, trunk_p2, trunk_p3, trunk_p4],
-                [pelvis_p1, pelvis_p2, pelvis_p3, pelvis_p4],
-            ],
+            result["bases"],
+            result["origins"],
+            result["points"],
             ["Trunk", "Pelvis"],
             title=f"Mocap Bases - {file_name}",
             global_coordinate_system=None,
@@ -196,121 +343,10 @@ def analyze_mocap_fullbody_data():
 
         matplotlib_figs.append(fig_matplotlib)
 
-        trunk_rotmat = calcmatrot(trunk_base, blab)
-        pelvis_rotmat = calcmatrot(pelvis_base, blab)
-
-        trunk_euler_angles = rotmat2euler(trunk_rotmat)
-        pelvis_euler_angles = rotmat2euler(pelvis_rotmat)
-
-        if use_anatomical and file_name in anatomical_data:
-            trunk_euler_angles_anat = anatomical_data[file_name]["trunk"]
-            pelvis_euler_angles_anat = anatomical_data[file_name]["pelvis"]
-            trunk_euler_angles = trunk_euler_angles - trunk_euler_angles_anat
-            pelvis_euler_angles = pelvis_euler_angles - pelvis_euler_angles_anat
-
-        max_val = np.max([trunk_euler_angles, pelvis_euler_angles])
-        min_val = np.min([trunk_euler_angles, pelvis_euler_angles])
-
-        fig, axes = plt.subplots(3, 1, figsize=(10, 12))
-
-        axes[0].plot(
-            time,
-            trunk_euler_angles[:, 0],
-            label="Trunk X [Ext. backward (+) Flex. forward (-)]",
-            color="red",
-        )
-        axes[0].plot(
-            time,
-            pelvis_euler_angles[:, 0],
-            label="Pelvis X [Ext. backward (+) Flex. forward (-)]",
-            linestyle="--",
-            color="red",
-        )
-        if use_anatomical and file_name in anatomical_data:
-            axes[0].axhline(
-                trunk_euler_angles_anat[0],
-                color="gray",
-                linestyle="-",
-                label="Anatomical Trunk X",
-            )
-            axes[0].axhline(
-                pelvis_euler_angles_anat[0],
-                color="gray",
-                linestyle="--",
-                label="Anatomical Pelvis X",
-            )
-        axes[0].set_xlabel("Time (s)")
-        axes[0].set_ylabel("X: Ext(+)/Flex(-) (degrees)")
-        axes[0].legend()
-        axes[0].set_title(f"Euler Angles - {file_name} (X-axis)")
-
-        axes[1].plot(
-            time,
-            trunk_euler_angles[:, 1],
-            label="Trunk Y [Side Bending Right (+) Side Bending Left (-)]",
-            color="green",
-        )
-        axes[1].plot(
-            time,
-            pelvis_euler_angles[:, 1],
-            label="Pelvis Y [Side Bending Right (+) Side Bending Left (-)]",
-            linestyle="--",
-            color="green",
+        fig = plt.figure(figsize=(10, 12))
+        plot_euler_angles(
+            fig, time, trunk_euler_angles, pelvis_euler_angles, file_name, anatomical
         )
-        if use_anatomical and file_name in anatomical_data:
-            axes[1].axhline(
-                trunk_euler_angles_anat[1],
-                color="gray",
-                linestyle="-",
-                label="Anatomical Trunk Y",
-            )
-            axes[1].axhline(
-                pelvis_euler_angles_anat[1],
-                color="gray",
-                linestyle="--",
-                label="Anatomical Pelvis Y",
-            )
-        axes[1].set_xlabel("Time (s)")
-        axes[1].set_ylabel("Y: Side Bending R(+)/L(-) (degrees)")
-        axes[1].legend()
-        axes[1].set_title(f"Euler Angles - {file_name} (Y-axis)")
-
-        axes[2].plot(
-            time,
-            trunk_euler_angles[:, 2],
-            label="Trunk Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
-            color="blue",
-        )
-        axes[2].plot(
-            time,
-            pelvis_euler_angles[:, 2],
-            label="Pelvis Z [Axial Rot. Right (+) Axial Rot. Left (-)]",
-            linestyle="--",
-            color="blue",
-        )
-        if use_anatomical and file_name in anatomical_data:
-            axes[2].axhline(
-                trunk_euler_angles_anat[2],
-                color="gray",
-                linestyle="-",
-                label="Anatomical Trunk Z",
-            )
-            axes[2].axhline(
-                pelvis_euler_angles_anat[2],
-                color="gray",
-                linestyle="--",
-                label="Anatomical Pelvis Z",
-            )
-        axes[2].set_xlabel("Time (s)")
-        axes[2].set_ylabel("Z: Axial Rot. R(+)/L(-) (degrees)")
-        axes[2].legend()
-        axes[2].set_title(f"Euler Angles - {file_name} (Z-axis)")
-
-        margin = 0.05 * (max_val - min_val)
-        axes[0].set_ylim([min_val - margin, max_val + margin])
-        axes[1].set_ylim([min_val - margin, max_val + margin])
-        axes[2].set_ylim([min_val - margin, max_val + margin])
-
         plt.tight_layout()
 
         base_name = os.path.splitext(file_name)[0]
@@ -0,0 +1,263 @@
+"""
+Module: mocap_batch.py
+Description: Headless, config-file-driven batch mode for `cluster_analysis` and `mocap_analysis`.
+
+             The parameters collected by the Tk dialogs of `analyze_cluster_data` and
+             `analyze_mocap_fullbody_data` are read from a TOML file instead, the files are
+             processed in parallel (one process per file), the Euler angle figures are rendered
+             with matplotlib's Agg canvas inside the workers (or skipped), and all angles are
+             written to one consolidated table.
+
+             Cluster analysis (configurations as in cluster_analysis.py):
+
+                 analysis = "cluster"
+                 input_dir = "/data/cluster_trials"
+                 output_dir = "/data/results"        # optional, default: input_dir
+                 sample_rate = 100
+                 cluster1_config = "A"               # A, B, C or D
+                 cluster2_config = "C"
+                 cluster1_name = "Trunk"             # optional
+                 cluster2_name = "Pelvis"            # optional
+                 headers = ["c1p1_X", "c1p1_Y", "c1p1_Z", ...]   # 18: P1..P3 of cluster 1, then 2
+                 anatomical_file = "/data/anat.csv"  # optional, median angles subtracted
+                 filter_method = "butterworth"       # optional, butterworth (default) or fir
+                 figures = true                      # optional, default true
+                 max_workers = 4                     # optional, default: all CPUs
+
+             Full-body mocap analysis:
+
+                 analysis = "mocap"
+                 input_dir = "/data/mocap_trials"
+                 sample_rate = 200
+                 headers = ["STRN_X", ...]           # 24: STRN, CLAV, C7, T10, RASI, LASI, RPSI, LPSI
+                 anatomical_dir = "/data/anat"       # optional, paired with the trials in sorted order
+
+             Outputs (in <output_dir>/Cluster_<timestamp> or <output_dir>/MocapFull_<timestamp>):
+             - figures/<trial>_figure.png and processed_data/ CSVs, as in the GUI.
+             - <analysis>_angles_all.csv with one row per trial and frame.
+             - log_errors.txt with the trials that failed.
+
+Usage:
+    python -m vaila.mocap_batch batch_config.toml
+
+Author: Prof. Dr. Paulo R. P. Santiago
+Version: 1.0
+Date: 2026-10-18
+"""
+
+import os
+import sys
+import tomllib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from matplotlib.figure import Figure
+from vaila import cluster_analysis, mocap_analysis
+from vaila.data_processing import read_mocap_csv
+
+CLUSTER_CONFIGURATIONS = ("A", "B", "C", "D")
+
+
+def load_batch_config(config_path):
+    """Reads and validates a batch TOML file (see the module docstring)."""
+    with open(config_path, "rb") as f:
+        config = tomllib.load(f)
+
+    analysis = config.get("analysis")
+    if analysis not in ("cluster", "mocap"):
+        raise ValueError("'analysis' must be 'cluster' or 'mocap'.")
+    if not os.path.isdir(config.get("input_dir", "")):
+        raise ValueError(f"Input directory not found: {config.get('input_dir')}")
+    if not config.get("sample_rate") or config["sample_rate"] <= 0:
+        raise ValueError("'sample_rate' must be a positive number.")
+
+    n_headers = 18 if analysis == "cluster" else 24
+    if len(config.get("headers", [])) != n_headers:
+        raise ValueError(f"'headers' must list exactly {n_headers} columns.")
+    config.setdefault("filter_method", "butterworth")
+    if config["filter_method"] not in ("butterworth", "fir"):
+        raise ValueError("'filter_method' must be 'butterworth' or 'fir'.")
+
+    if analysis == "cluster":
+        for key in ("cluster1_config", "cluster2_config"):
+            if config.get(key) not in CLUSTER_CONFIGURATIONS:
+                raise ValueError(f"'{key}' must be 'A', 'B', 'C' or 'D'.")
+        config.setdefault("cluster1_name", "Cluster1")
+        config.setdefault("cluster2_name", "Cluster2")
+
+    config.setdefault("output_dir", config["input_dir"])
+    config.setdefault("figures", True)
+    config.setdefault("max_workers", None)
+    return config
+
+
+def _anatomical_data(config, file_names):
+    """Anatomical medians per trial file name, following the GUI semantics."""
+    if config["analysis"] == "cluster":
+        if not config.get("anatomical_file"):
+            return {}
+        anat_data = cluster_analysis.read_anatomical_csv(config["anatomical_file"])
+        if not anat_data:
+            raise ValueError("Failed to read the anatomical data file.")
+        return {file_name: anat_data for file_name in file_names}
+
+    anatomical_dir = config.get("anatomical_dir")
+    if not anatomical_dir:
+        return {}
+    anatomical_file_names = sorted(
+        f for f in os.listdir(anatomical_dir) if f.endswith(".csv")
+    )
+    if len(anatomical_file_names) != len(file_names):
+        print(
+            "Warning: Number of anatomical files does not match the number of data files."
+        )
+    anatomical_data = {}
+    for file_name, anatomical_file in zip(file_names, anatomical_file_names):
+        anat_data = mocap_analysis.read_anatomical_csv(
+            os.path.join(anatomical_dir, anatomical_file)
+        )
+        if anat_data:
+            anatomical_data[file_name] = anat_data
+    return anatomical_data
+
+
+def process_file(file_path, config, base_dir_figures, base_dir_processed_data, anatomical):
+    """
+    Processes one trial headlessly and returns its angle table.
+
+    Same computation and per-trial outputs as the GUI loop; the figure is drawn on a
+    `matplotlib.figure.Figure` (Agg canvas, no pyplot) so it is safe in worker processes.
+    """
+    file_name = os.path.basename(file_path)
+    base_name = os.path.splitext(file_name)[0]
+    sample_rate = config["sample_rate"]
+    headers = config["headers"]
+
+    if config["analysis"] == "cluster":
+        data = pd.read_csv(file_path, usecols=headers)[headers].values
+        result = cluster_analysis.compute_cluster_kinematics(
+            data,
+            sample_rate,
+            config["cluster1_config"],
+            config["cluster2_config"],
+            anatomical,
+            config["filter_method"],
+        )
+        names = ("cluster1", "cluster2")
+    else:
+        data = read_mocap_csv(file_path)
+        if data is None or not set(headers).issubset(data.columns):
+            raise ValueError("file does not contain all required columns.")
+        result = mocap_analysis.compute_mocap_kinematics(
+            data[headers[:12]].values,
+            data[headers[12:]].values,
+            sample_rate,
+            anatomical,
+            config["filter_method"],
+        )
+        names = ("trunk", "pelvis")
+
+    time = result["time"]
+    euler1, euler2 = result["euler"]
+
+    if config["figures"]:
+        fig = Figure(figsize=(10, 12))
+        if config["analysis"] == "cluster":
+            cluster_analysis.plot_euler_angles(
+                fig,
+                time,
+                euler1,
+                euler2,
+                file_name,
+                config["cluster1_name"],
+                config["cluster2_name"],
+                anatomical,
+            )
+        else:
+            mocap_analysis.plot_euler_angles(
+                fig, time, euler1, euler2, file_name, anatomical
+            )
+        fig.tight_layout()
+        fig.savefig(os.path.join(base_dir_figures, f"{base_name}_figure.png"))
+
+    module = cluster_analysis if config["analysis"] == "cluster" else mocap_analysis
+    module.save_results_to_csv(base_dir_processed_data, time, euler1, euler2, base_name)
+
+    table = {"file": base_name, "time": time}
+    for name, euler in zip(names, (euler1, euler2)):
+        for k, axis in enumerate("xyz"):
+            table[f"{name}_euler_{axis}"] = euler[:, k]
+    return pd.DataFrame(table)
+
+
+def _process_file_worker(args):
+    file_path = args[0]
+    try:
+        return process_file(*args), None
+    except Exception as e:
+        return None, f"{os.path.basename(file_path)}: {e}"
+
+
+def run_batch(config_path):
+    """
+    Runs a cluster or mocap batch from a TOML file.
+
+    Returns:
+    - str, path of the consolidated angle table, or None if every trial failed.
+    """
+    config = load_batch_config(config_path)
+    file_names = sorted(f for f in os.listdir(config["input_dir"]) if f.endswith(".csv"))
+    anatomical_data = _anatomical_data(config, file_names)
+
+    prefix = "Cluster" if config["analysis"] == "cluster" else "MocapFull"
+    current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_dir = os.path.join(config["output_dir"], f"{prefix}_{current_time}")
+    base_dir_figures = os.path.join(base_dir, "figures")
+    base_dir_processed_data = os.path.join(base_dir, "processed_data")
+    os.makedirs(base_dir_figures, exist_ok=True)
+    os.makedirs(base_dir_processed_data, exist_ok=True)
+
+    tasks = [
+        (
+            os.path.join(config["input_dir"], file_name),
+            config,
+            base_dir_figures,
+            base_dir_processed_data,
+            anatomical_data.get(file_name),
+        )
+        for file_name in file_names
+    ]
+
+    tables = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=config["max_workers"]) as executor:
+        for i, (table, error) in enumerate(
+            executor.map(_process_file_worker, tasks), start=1
+        ):
+            if error:
+                errors.append(error)
+                print(f"[{i}/{len(tasks)}] Error: {error}")
+            else:
+                tables.append(table)
+                print(f"[{i}/{len(tasks)}] {table['file'].iloc[0]}: {len(table)} frames")
+
+    summary_file = None
+    if tables:
+        summary_file = os.path.join(base_dir, f"{config['analysis']}_angles_all.csv")
+        pd.concat(tables, ignore_index=True).to_csv(summary_file, index=False)
+    if errors:
+        with open(os.path.join(base_dir, "log_errors.txt"), "w") as f:
+            f.write("\n".join(errors) + "\n")
+    print(f"Results written to {base_dir}")
+    return summary_file
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python -m vaila.mocap_batch batch_config.toml")
+        return
+    run_batch(sys.argv[1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Module: open_field_zones.py
+Description: Zone definitions for open field / maze analyses (`animal_open_field.py`).
+
+             Zones (rectangles, circles and polygons, grouped by arena) are read from a TOML
+             file and compiled once into a raster of zone labels. Classifying a sample is then
+             one index computation and one array lookup, whatever the number or shape of the
+             zones, so multi-arena rigs, circular arenas and Y-mazes cost the same as the
+             default 3x3 grid.
+
+             Example zone file (meters; zones listed first win where they overlap):
+
+                 resolution = 0.002          # raster cell size in meters (optional)
+
+                 [[arena]]
+                 name = "A1"
+
+                 [[arena.zone]]
+                 name = "center"
+                 type = "circle"
+                 center = [0.3, 0.3]
+                 radius = 0.15
+
+                 [[arena.zone]]
+                 name = "periphery"
+                 type = "circle"
+                 center = [0.3, 0.3]
+                 radius = 0.3
+
+                 [[arena]]
+                 name = "A2"
+
+                 [[arena.zone]]
+                 name = "arm1"
+                 type = "polygon"
+                 points = [[1.0, 0.0], [1.1, 0.0], [1.1, 0.4], [1.0, 0.4]]
+
+                 [[arena.zone]]
+                 name = "box"
+                 type = "rectangle"
+                 xmin = 1.2
+                 xmax = 1.5
+                 ymin = 0.0
+                 ymax = 0.3
+
+Author: Prof. Paulo R. P. Santiago
+Version: 1.0
+Date: 18 October 2026
+"""
+
+import tomllib
+import numpy as np
+from matplotlib.path import Path
+
+DEFAULT_RESOLUTION = 0.002
+
+
+def load_zone_file(zone_file):
+    """
+    Reads a zone TOML file.
+
+    Args:
+        zone_file (str): Path to the TOML file.
+
+    Returns:
+        zones (list): One dict per zone with "arena", "name", "type" and its geometry.
+        resolution (float): Raster cell size in meters.
+    """
+    with open(zone_file, "rb") as f:
+        config = tomllib.load(f)
+
+    zones = []
+    for arena in config.get("arena", []):
+        for zone in arena.get("zone", []):
+            zone = dict(zone)
+            zone["arena"] = arena.get("name", "arena")
+            if zone.get("type") not in ("rectangle", "circle", "polygon"):
+                raise ValueError(
+                    f"Zone '{zone.get('name')}': type must be rectangle, circle or polygon."
+                )
+            zones.append(zone)
+    if not zones:
+        raise ValueError(f"No zones defined in {zone_file}")
+    return zones, config.get("resolution", DEFAULT_RESOLUTION)
+
+
+def grid_zones(xmin=0, xmax=0.6, ymin=0, ymax=0.6, nx=3, ny=3, arena="arena"):
+    """
+    Rectangular grid zones named Z1..Zn row by row from the origin, as `define_zones`.
+    """
+    x_edges = np.linspace(xmin, xmax, nx + 1)
+    y_edges = np.linspace(ymin, ymax, ny + 1)
+    return [
+        {
+            "arena": arena,
+            "name": f"Z{row * nx + col + 1}",
+            "type": "rectangle",
+            "xmin": x_edges[col],
+            "xmax": x_edges[col + 1],
+            "ymin": y_edges[row],
+            "ymax": y_edges[row + 1],
+        }
+        for row in range(ny)
+        for col in range(nx)
+    ]
+
+
+def zone_bounds(zone):
+    """Bounding box (xmin, xmax, ymin, ymax) of a zone."""
+    if zone["type"] == "rectangle":
+        return zone["xmin"], zone["xmax"], zone["ymin"], zone["ymax"]
+    if zone["type"] == "circle":
+        (cx, cy), r = zone["center"], zone["radius"]
+        return cx - r, cx + r, cy - r, cy + r
+    points = np.asarray(zone["points"], dtype=float)
+    return points[:, 0].min(), points[:, 0].max(), points[:, 1].min(), points[:, 1].max()
+
+
+def zone_outline(zone, n=100):
+    """(n, 2) outline of a zone for plotting."""
+    if zone["type"] == "rectangle":
+        x0, x1, y0, y1 = zone_bounds(zone)
+        return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]])
+    if zone["type"] == "circle":
+        theta = np.linspace(0, 2 * np.pi, n)
+        (cx, cy), r = zone["center"], zone["radius"]
+        return np.column_stack((cx + r * np.cos(theta), cy + r * np.sin(theta)))
+    points = np.asarray(zone["points"], dtype=float)
+    return np.vstack((points, points[:1]))
+
+
+class ZoneRaster:
+    """
+    Zones compiled into a raster of labels for O(1) classification of samples.
+
+    Args:
+        zones (list): Zone dicts (see `load_zone_file` and `grid_zones`).
+        resolution (float): Raster cell size in meters.
+        bounds (tuple, optional): (xmin, xmax, ymin, ymax) covered by the raster;
+            defaults to the union of the zone bounding boxes.
+    """
+
+    def __init__(self, zones, resolution=DEFAULT_RESOLUTION, bounds=None):
+        self.zones = list(zones)
+        self.resolution = float(resolution)
+        if bounds is None:
+            boxes = np.array([zone_bounds(zone) for zone in self.zones])
+            bounds = (
+                boxes[:, 0].min(),
+                boxes[:, 1].max(),
+                boxes[:, 2].min(),
+                boxes[:, 3].max(),
+            )
+        self.bounds = tuple(float(b) for b in bounds)
+        xmin, xmax, ymin, ymax = self.bounds
+        self.shape = (
+            max(int(np.ceil((ymax - ymin) / self.resolution)), 1),
+            max(int(np.ceil((xmax - xmin) / self.resolution)), 1),
+        )
+        dtype = np.int16 if len(self.zones) < np.iinfo(np.int16).max else np.int32
+        self.labels = np.full(self.shape, -1, dtype=dtype)
+
+        # Paint in reverse so the zone listed first wins where zones overlap
+        for index in range(len(self.zones) - 1, -1, -1):
+            self._paint(index)
+
+    @property
+    def names(self):
+        return [f"{zone['arena']}_{zone['name']}" for zone in self.zones]
+
+    def _paint(self, index):
+        zone = self.zones[index]
+        x0, x1, y0, y1 = zone_bounds(zone)
+        # Only the cells of the zone bounding box are tested
+        c0, c1 = self._cell(x0, self.bounds[0], self.shape[1]), self._cell(
+            x1, self.bounds[0], self.shape[1]
+        )
+        r0, r1 = self._cell(y0, self.bounds[2], self.shape[0]), self._cell(
+            y1, self.bounds[2], self.shape[0]
+        )
+        cx = self.bounds[0] + (np.arange(c0, c1 + 1) + 0.5) * self.resolution
+        cy = self.bounds[2] + (np.arange(r0, r1 + 1) + 0.5) * self.resolution
+        gx, gy = np.meshgrid(cx, cy)
+
+        if zone["type"] == "rectangle":
+            inside = (gx >= x0) & (gx <= x1) & (gy >= y0) & (gy <= y1)
+        elif zone["type"] == "circle":
+            (zx, zy), r = zone["center"], zone["radius"]
+            inside = (gx - zx) ** 2 + (gy - zy) ** 2 <= r**2
+        else:
+            path = Path(np.asarray(zone["points"], dtype=float))
+            inside = path.contains_points(
+                np.column_stack((gx.ravel(), gy.ravel()))
+            ).reshape(gx.shape)
+
+        block = self.labels[r0 : r1 + 1, c0 : c1 + 1]
+        block[inside] = index
+
+    def _cell(self, value, origin, n):
+        return int(np.clip(np.floor((value - origin) / self.resolution), 0, n - 1))
+
+    def classify(self, x, y):
+        """
+        Zone index of every sample (-1 outside all zones or outside the raster).
+        """
+        col = np.floor((np.asarray(x) - self.bounds[0]) / self.resolution)
+        row = np.floor((np.asarray(y) - self.bounds[2]) / self.resolution)
+        valid = (
+            (col >= 0) & (col < self.shape[1]) & (row >= 0) & (row < self.shape[0])
+        )
+        index = np.full(col.shape, -1, dtype=int)
+        index[valid] = self.labels[row[valid].astype(int), col[valid].astype(int)]
+        return index
@@ -14,9 +14,16 @@ Features:
 - Extracts and saves points residuals with time columns.
 - Supports saving the data in CSV format.
 - Optionally saves the data in Excel format (can be slow for large files).
+- Optionally saves the data as Parquet or Feather (numeric float32/float64 columns with
+  labels, units and rates stored in the file schema, requires pyarrow) or as a single
+  NumPy .npz archive, which load much faster than re-parsing CSV text.
 - Generates an info file containing metadata about markers, analogs, and their units.
 - Generates a simplified short info file with key parameters and headers.
 - Handles encoding errors to avoid crashes due to unexpected characters.
+- Converts directories in parallel with a process pool and writes a batch manifest
+  (status, duration and error per file); runs headless from the command line.
+- Streams CSV-only conversions in fixed-size frame chunks through the memory-mapped
+  `C3DStreamReader` (readc3d_stream.py), so memory stays bounded for multi-GB trials.
 
 Dependencies:
 - Python 3.x
@@ -26,9 +33,10 @@ Dependencies:
 - Tqdm
 - Numpy
 - Openpyxl (optional, for saving Excel files)
+- Pyarrow (optional, for saving Parquet/Feather files)
 
-Version: 1.8
-Date: October 2024
+Version: 1.9
+Date: December 2024
 Author: Prof. Paulo Santiago
 
 Usage:
@@ -38,6 +46,7 @@ Usage:
 
 Example:
 $ python readc3d_export.py
+$ python -m vaila.readc3d_export --input ./c3d --output ./results --workers 8
 
 Notes:
 - Ensure that all necessary libraries are installed.
@@ -45,12 +54,23 @@ Notes:
 """
 
 import os
+import json
+import time
+import argparse
 import pandas as pd
 from ezc3d import c3d
 from datetime import datetime
-from tkinter import Tk, filedialog, messagebox
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tkinter import Tk, filedialog, messagebox, simpledialog
 from tqdm import tqdm
 import numpy as np
+from vaila.readc3d_stream import C3DStreamReader
+
+# Number of point frames written per chunk by the streaming export
+STREAM_CHUNK_FRAMES = 5000
+
+# Supported data formats for markers, analogs and residuals
+OUTPUT_FORMATS = ("csv", "parquet", "feather", "npz")
 
 
 def save_info_file(datac3d, file_name, output_dir):
@@ -215,6 +235,134 @@ def save_empty_file(file_path):
         f.write("")
 
 
+def _format_time(n_samples, rate, start=0):
+    """
+    Build the text Time column ("%.3f" seconds) used by the CSV and Excel outputs.
+    """
+    return np.char.mod("%.3f", np.arange(start, start + n_samples) / rate)
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow, which is only needed for the Parquet and Feather outputs.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "Parquet/Feather export requires pyarrow. Install it with: pip install pyarrow"
+        ) from e
+    return pa, pq, feather
+
+
+class ColumnarWriter:
+    """
+    Incremental Parquet/Feather writer for one table (markers, analogs or residuals).
+
+    Data is written as numeric columns (a float64 Time column in seconds followed by
+    one column per channel in `float_dtype`). The `metadata` dictionary is stored as
+    JSON under the "vaila" key of the file schema.
+    """
+
+    def __init__(self, path, output_format, metadata, float_dtype="float64"):
+        if output_format not in ("parquet", "feather"):
+            raise ValueError("ColumnarWriter supports 'parquet' or 'feather' only.")
+        self.path = path
+        self.output_format = output_format
+        self.metadata = {"vaila": json.dumps(metadata)}
+        self.float_dtype = np.dtype(float_dtype)
+        self._pa, self._pq, _ = _import_pyarrow()
+        self._writer = None
+
+    def write(self, data, columns, time_values):
+        pa = self._pa
+        data = np.asarray(data, dtype=self.float_dtype)
+        arrays = [pa.array(np.asarray(time_values, dtype=np.float64))]
+        arrays.extend(pa.array(data[:, i]) for i in range(data.shape[1]))
+        names = ["Time"] + [str(column) for column in columns]
+        table = pa.Table.from_arrays(arrays, names=names).replace_schema_metadata(
+            self.metadata
+        )
+        if self._writer is None:
+            if self.output_format == "parquet":
+                self._writer = self._pq.ParquetWriter(self.path, table.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _table_metadata(file_name, table, rate, labels, units=None):
+    """
+    Metadata stored as JSON in the Parquet/Feather schema: source file, table name,
+    sampling rate, marker or analog labels and units.
+    """
+    return {
+        "source": file_name,
+        "table": table,
+        "rate": float(rate),
+        "labels": [str(label) for label in labels],
+        "units": [str(unit) for unit in units] if units is not None else [],
+    }
+
+
+def save_npz_file(
+    markers,
+    marker_labels,
+    marker_freq,
+    analogs,
+    points_residuals,
+    analog_labels,
+    analog_units,
+    analog_freq,
+    file_path,
+    float_dtype="float64",
+):
+    """
+    Save markers, analogs and residuals with their labels, units and rates into a
+    single uncompressed NumPy .npz archive.
+    """
+    n_frames = markers.shape[0] if markers.size > 0 else 0
+    analog_data = analogs.squeeze(axis=0).T if analogs.size > 0 else np.empty((0, 0))
+    residual_data = (
+        points_residuals.squeeze(axis=0).T
+        if points_residuals.size > 0
+        else np.empty((0, 0))
+    )
+    np.savez(
+        file_path,
+        markers=np.asarray(markers, dtype=float_dtype).reshape(
+            n_frames, len(marker_labels), 3
+        )
+        if n_frames
+        else np.empty((0, len(marker_labels), 3), dtype=float_dtype),
+        marker_time=np.arange(n_frames) / marker_freq,
+        marker_labels=np.asarray(marker_labels, dtype=str),
+        marker_freq=marker_freq,
+        analogs=np.asarray(analog_data, dtype=float_dtype),
+        analog_time=np.arange(analog_data.shape[0]) / analog_freq
+        if analog_freq
+        else np.empty(0),
+        analog_labels=np.asarray(analog_labels, dtype=str),
+        analog_units=np.asarray(analog_units, dtype=str),
+        analog_freq=analog_freq,
+        points_residuals=np.asarray(residual_data, dtype=float_dtype),
+    )
+    print(f"NPZ file saved at: {file_path}")
+
+
 def save_to_files(
     markers,
     marker_labels,
@@ -228,10 +376,21 @@ def save_to_files(
     output_dir,
     save_excel,
     datac3d,
+    output_format="csv",
+    float_dtype="float64",
 ):
     """
-    Save extracted data to CSV files and all parameters to .info files.
+    Save extracted data to CSV (or Parquet/Feather/NPZ) files and all parameters to
+    .info files.
+
+    `output_format` selects the data tables format: "csv" (text, default), "parquet"
+    or "feather" (numeric columns with labels, units and rates in the file schema,
+    requires pyarrow) or "npz" (one NumPy archive). `float_dtype` sets the column
+    precision of the binary formats.
     """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
     print(f"Saving data to files for {file_name}")
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     dir_name = os.path.join(output_dir, "vaila_c3d_to_csv", f"{file_name}_{timestamp}")
@@ -253,67 +412,87 @@ def save_to_files(
     # Save events data
     save_events(datac3d, file_name, dir_name)
 
+    if output_format == "npz":
+        save_npz_file(
+            markers,
+            marker_labels,
+            marker_freq,
+            analogs,
+            points_residuals,
+            analog_labels,
+            analog_units,
+            analog_freq,
+            os.path.join(dir_name, f"{file_name}.npz"),
+            float_dtype,
+        )
+
     # Prepare marker columns
     marker_columns = [
         f"{label}_{axis}" for label in marker_labels for axis in ["X", "Y", "Z"]
     ]
-
-    # Save markers data
-    if markers.size > 0:
-        markers_df = pd.DataFrame(markers, columns=marker_columns)
-        markers_df.insert(
-            0,
-            "Time",
-            pd.Series(
-                [f"{i / marker_freq:.3f}" for i in range(markers_df.shape[0])],
-                name="Time",
+    tables = [
+        (
+            "markers",
+            "Markers",
+            markers,
+            marker_columns,
+            marker_freq,
+            _table_metadata(file_name, "markers", marker_freq, marker_labels),
+        ),
+        (
+            "analogs",
+            "Analogs",
+            analogs.squeeze(axis=0).T if analogs.size > 0 else analogs,
+            analog_labels,
+            analog_freq,
+            _table_metadata(
+                file_name, "analogs", analog_freq, analog_labels, analog_units
             ),
-        )
-        print(f"Saving markers CSV for {file_name}")
-        markers_df.to_csv(
-            os.path.join(dir_name, f"{file_name}_markers.csv"), index=False
-        )
-    else:
-        print(f"No markers found for {file_name}, saving empty file.")
-        save_empty_file(os.path.join(dir_name, f"{file_name}_markers.csv"))
-
-    # Save analog data
-    if analogs.size > 0:
-        analogs_df = pd.DataFrame(analogs.squeeze(axis=0).T, columns=analog_labels)
-        analogs_df.insert(
-            0,
-            "Time",
-            pd.Series(
-                [f"{i / analog_freq:.3f}" for i in range(analogs_df.shape[0])],
-                name="Time",
+        ),
+        (
+            "points_residuals",
+            "Points Residuals",
+            points_residuals.squeeze(axis=0).T
+            if points_residuals.size > 0
+            else points_residuals,
+            None,
+            marker_freq,
+            _table_metadata(
+                file_name, "points_residuals", marker_freq, marker_labels
             ),
-        )
-        print(f"Saving analogs CSV for {file_name}")
-        analogs_df.to_csv(
-            os.path.join(dir_name, f"{file_name}_analogs.csv"), index=False
-        )
-    else:
-        print(f"No analogs found for {file_name}, saving empty file.")
-        save_empty_file(os.path.join(dir_name, f"{file_name}_analogs.csv"))
-
-    # Save points residuals data
-    if points_residuals.size > 0:
-        points_residuals_df = pd.DataFrame(points_residuals.squeeze(axis=0).T)
-        points_residuals_df.insert(
-            0,
-            "Time",
-            pd.Series(
-                [f"{i / marker_freq:.3f}" for i in range(points_residuals_df.shape[0])],
-                name="Time",
-            ),
-        )
-        print(f"Saving points residuals CSV for {file_name}")
-        points_residuals_df.to_csv(
-            os.path.join(dir_name, f"{file_name}_points_residuals.csv"), index=False
-        )
-    else:
-        print(f"No points residuals found for {file_name}, saving empty file.")
-        save_empty_file(os.path.join(dir_name, f"{file_name}_points_residuals.csv"))
+        ),
+    ]
+
+    excel_tables = []
+    for table, sheet_name, data, columns, rate, metadata in tables:
+        name = table.replace("_", " ")
+        if data.size == 0:
+            if output_format == "csv":
+                print(f"No {name} found for {file_name}, saving empty file.")
+                save_empty_file(os.path.join(dir_name, f"{file_name}_{table}.csv"))
+            continue
+
+        if output_format in ("parquet", "feather"):
+            if columns is None:
+                columns = list(range(data.shape[1]))
+            print(f"Saving {name} {output_format} for {file_name}")
+            with ColumnarWriter(
+                os.path.join(dir_name, f"{file_name}_{table}.{output_format}"),
+                output_format,
+                metadata,
+                float_dtype,
+            ) as writer:
+                writer.write(data, columns, np.arange(data.shape[0]) / rate)
+
+        if output_format == "csv" or save_excel:
+            table_df = pd.DataFrame(data, columns=columns)
+            table_df.insert(0, "Time", _format_time(table_df.shape[0], rate))
+            if output_format == "csv":
+                print(f"Saving {name} CSV for {file_name}")
+                table_df.to_csv(
+                    os.path.join(dir_name, f"{file_name}_{table}.csv"), index=False
+                )
+            excel_tables.append((sheet_name, table_df))
 
     # Optionally save to Excel
     if save_excel:
@@ -321,18 +500,339 @@ def save_to_files(
         with pd.ExcelWriter(
             os.path.join(dir_name, f"{file_name}.xlsx"), engine="openpyxl"
         ) as writer:
-            if markers.size > 0:
-                markers_df.to_excel(writer, sheet_name="Markers", index=False)
-            if analogs.size > 0:
-                analogs_df.to_excel(writer, sheet_name="Analogs", index=False)
-            if points_residuals.size > 0:
-                points_residuals_df.to_excel(
-                    writer, sheet_name="Points Residuals", index=False
-                )
+            for sheet_name, table_df in excel_tables:
+                table_df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    print(f"Files for {file_name} saved successfully!")
+
+
+class CsvChunkWriter:
+    """
+    Incremental CSV writer with the same interface as `ColumnarWriter`. The header is
+    written with the first chunk and the Time column uses the "%.3f" text format.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", newline="")
+        self._write_header = True
+
+    def write(self, data, columns, time_values):
+        chunk_df = pd.DataFrame(data, columns=columns)
+        chunk_df.insert(0, "Time", np.char.mod("%.3f", time_values))
+        chunk_df.to_csv(self._file, header=self._write_header, index=False)
+        self._write_header = False
+
+    def close(self):
+        self._file.close()
+
+
+def save_to_files_streaming(
+    reader,
+    file_name,
+    output_dir,
+    chunk_size=STREAM_CHUNK_FRAMES,
+    output_format="csv",
+    float_dtype="float64",
+):
+    """
+    Save markers, analogs and points residuals chunk by chunk, reading the C3D data
+    through a memory-mapped `C3DStreamReader`. Memory use is bounded by `chunk_size`
+    point frames regardless of the trial length. The output layout is the same as
+    `save_to_files`; `output_format` may be "csv", "parquet" or "feather".
+    """
+    if output_format not in ("csv", "parquet", "feather"):
+        raise ValueError(f"Unsupported streaming output format: {output_format}")
+
+    print(f"Saving data to files for {file_name} (streaming)")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    dir_name = os.path.join(output_dir, "vaila_c3d_to_csv", f"{file_name}_{timestamp}")
+    os.makedirs(dir_name, exist_ok=True)
+    print(f"Directory created: {dir_name}")
+
+    marker_labels = reader.marker_labels
+    analog_labels = reader.analog_labels
+    marker_freq = reader.marker_freq
+    analog_freq = reader.analog_freq
+
+    save_info_file(reader, file_name, dir_name)
+    save_short_info_file(
+        marker_labels,
+        marker_freq,
+        analog_labels,
+        reader.analog_units,
+        analog_freq,
+        dir_name,
+        file_name,
+    )
+    save_events(reader, file_name, dir_name)
+
+    marker_columns = [
+        f"{label}_{axis}" for label in marker_labels for axis in ["X", "Y", "Z"]
+    ]
+    has_markers = reader.point_count > 0 and reader.n_frames > 0
+    has_analogs = reader.n_channels > 0 and reader.n_frames > 0
+
+    # (table, chunk key, columns, rate, samples per point frame, metadata)
+    tables = []
+    if has_markers:
+        tables.append(
+            (
+                "markers",
+                "markers",
+                marker_columns,
+                marker_freq,
+                1,
+                _table_metadata(file_name, "markers", marker_freq, marker_labels),
+            )
+        )
+    if has_analogs:
+        tables.append(
+            (
+                "analogs",
+                "analogs",
+                analog_labels,
+                analog_freq,
+                reader.analog_per_frame,
+                _table_metadata(
+                    file_name, "analogs", analog_freq, analog_labels, reader.analog_units
+                ),
+            )
+        )
+    if has_markers:
+        tables.append(
+            (
+                "points_residuals",
+                "residuals",
+                list(range(len(marker_labels))),
+                marker_freq,
+                1,
+                _table_metadata(
+                    file_name, "points_residuals", marker_freq, marker_labels
+                ),
+            )
+        )
+
+    if output_format == "csv":
+        for table, has_data in (
+            ("markers", has_markers),
+            ("analogs", has_analogs),
+            ("points_residuals", has_markers),
+        ):
+            if not has_data:
+                name = table.replace("_", " ")
+                print(f"No {name} found for {file_name}, saving empty file.")
+                save_empty_file(os.path.join(dir_name, f"{file_name}_{table}.csv"))
+
+    if tables:
+        print(
+            f"Saving {output_format} files for {file_name} "
+            f"in chunks of {chunk_size} frames"
+        )
+        writers = []
+        try:
+            for table, _, _, _, _, metadata in tables:
+                path = os.path.join(dir_name, f"{file_name}_{table}.{output_format}")
+                if output_format == "csv":
+                    writers.append(CsvChunkWriter(path))
+                else:
+                    writers.append(
+                        ColumnarWriter(path, output_format, metadata, float_dtype)
+                    )
+
+            for chunk in reader.iter_chunks(chunk_size, include_analogs=has_analogs):
+                for writer, (_, key, columns, rate, per_frame, _) in zip(
+                    writers, tables
+                ):
+                    data = chunk[key]
+                    first_sample = chunk["start"] * per_frame
+                    samples = np.arange(first_sample, first_sample + data.shape[0])
+                    writer.write(data, columns, samples / rate)
+        finally:
+            for writer in writers:
+                writer.close()
 
     print(f"Files for {file_name} saved successfully!")
 
 
+def convert_c3d_file_streaming(
+    file_path,
+    output_dir,
+    chunk_size=STREAM_CHUNK_FRAMES,
+    output_format="csv",
+    float_dtype="float64",
+):
+    """
+    Convert a single C3D file to CSV (or Parquet/Feather) and .info files with bounded
+    memory.
+    """
+    print(f"\nProcessing file: {file_path}")
+    with C3DStreamReader(file_path, chunk_size=chunk_size) as reader:
+        print(f"Number of marker labels = {reader.point_count}")
+        print(f"Number of analog channels = {reader.n_channels}")
+        print(f"Marker frequency = {reader.marker_freq} Hz")
+        print(f"Analog frequency = {reader.analog_freq} Hz")
+        print(f"Number of frames = {reader.n_frames}")
+        file_name = os.path.splitext(os.path.basename(file_path))[0]
+        save_to_files_streaming(
+            reader, file_name, output_dir, chunk_size, output_format, float_dtype
+        )
+
+
+def convert_c3d_file(
+    file_path,
+    output_dir,
+    save_excel=False,
+    chunk_size=STREAM_CHUNK_FRAMES,
+    output_format="csv",
+    float_dtype="float64",
+):
+    """
+    Convert a single C3D file. CSV, Parquet and Feather conversions are streamed in
+    frame chunks; Excel and NPZ exports need the full tables and go through
+    `importc3d`.
+    """
+    if not save_excel and output_format != "npz":
+        convert_c3d_file_streaming(
+            file_path, output_dir, chunk_size, output_format, float_dtype
+        )
+        return
+
+    (
+        markers,
+        marker_labels,
+        marker_freq,
+        analogs,
+        points_residuals,
+        analog_labels,
+        analog_units,
+        analog_freq,
+        datac3d,
+    ) = importc3d(file_path)
+    file_name = os.path.splitext(os.path.basename(file_path))[0]
+    save_to_files(
+        markers,
+        marker_labels,
+        marker_freq,
+        analogs,
+        points_residuals,
+        analog_labels,
+        analog_units,
+        analog_freq,
+        file_name,
+        output_dir,
+        save_excel,
+        datac3d,
+        output_format,
+        float_dtype,
+    )
+
+
+def _convert_c3d_worker(
+    file_path, output_dir, save_excel, chunk_size, output_format, float_dtype
+):
+    """
+    Process pool entry point: convert one file and report the outcome instead of raising.
+    """
+    start = time.perf_counter()
+    try:
+        convert_c3d_file(
+            file_path, output_dir, save_excel, chunk_size, output_format, float_dtype
+        )
+        status, error = "ok", ""
+    except Exception as e:
+        status, error = "failed", str(e)
+    return {
+        "File": os.path.basename(file_path),
+        "Status": status,
+        "Seconds": round(time.perf_counter() - start, 3),
+        "Error": error,
+    }
+
+
+def batch_convert_c3d_to_csv(
+    input_directory,
+    output_directory,
+    save_excel=False,
+    max_workers=None,
+    chunk_size=STREAM_CHUNK_FRAMES,
+    output_format="csv",
+    float_dtype="float64",
+):
+    """
+    Convert every .c3d file in `input_directory` using a process pool.
+
+    Each file is converted independently in a worker process. Failures are collected
+    instead of stopping the batch, and a manifest CSV with the status, duration and
+    error message of every file is written to `output_directory/vaila_c3d_to_csv`.
+
+    Parameters:
+    - input_directory: str
+        Directory containing the .c3d files.
+    - output_directory: str
+        Directory where the `vaila_c3d_to_csv` results are written.
+    - save_excel: bool, default=False
+        Also write an Excel workbook per file (slow).
+    - max_workers: int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    - chunk_size: int, default=STREAM_CHUNK_FRAMES
+        Point frames per chunk for streaming export.
+    - output_format: str, default="csv"
+        One of "csv", "parquet", "feather" or "npz".
+    - float_dtype: str, default="float64"
+        Column precision of the binary formats ("float32" or "float64").
+
+    Returns:
+    - manifest_df: pandas.DataFrame
+        One row per file with the columns File, Status, Seconds and Error.
+    """
+    c3d_files = sorted(f for f in os.listdir(input_directory) if f.endswith(".c3d"))
+    print(f"Found {len(c3d_files)} .c3d files in the input directory.")
+
+    results = []
+    if c3d_files:
+        max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(c3d_files)))
+        print(f"Converting with {max_workers} worker process(es).")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _convert_c3d_worker,
+                    os.path.join(input_directory, c3d_file),
+                    output_directory,
+                    save_excel,
+                    chunk_size,
+                    output_format,
+                    float_dtype,
+                )
+                for c3d_file in c3d_files
+            ]
+            with tqdm(
+                total=len(futures), desc="Processing C3D files", unit="file"
+            ) as progress_bar:
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    if result["Status"] != "ok":
+                        print(f"Error processing {result['File']}: {result['Error']}")
+                    progress_bar.update(1)
+
+    manifest_df = pd.DataFrame(results, columns=["File", "Status", "Seconds", "Error"])
+    manifest_df = manifest_df.sort_values("File").reset_index(drop=True)
+
+    manifest_dir = os.path.join(output_directory, "vaila_c3d_to_csv")
+    os.makedirs(manifest_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    manifest_path = os.path.join(manifest_dir, f"batch_manifest_{timestamp}.csv")
+    manifest_df.to_csv(manifest_path, index=False)
+
+    n_failed = int((manifest_df["Status"] != "ok").sum())
+    print(
+        f"Converted {len(manifest_df) - n_failed} of {len(manifest_df)} files "
+        f"({n_failed} failed). Manifest saved at: {manifest_path}"
+    )
+    return manifest_df
+
+
 def convert_c3d_to_csv():
     """
     Main function to convert C3D files to CSV and .info files.
@@ -352,65 +852,109 @@ def convert_c3d_to_csv():
     output_directory = filedialog.askdirectory(title="Select Output Directory")
     print(f"Debug: output_directory = {output_directory}")
 
-    root.destroy()  # Use root.destroy() to properly close the Tkinter resources
-
     if input_directory and output_directory:
-        c3d_files = sorted(
-            [f for f in os.listdir(input_directory) if f.endswith(".c3d")]
+        output_format = (
+            simpledialog.askstring(
+                "Output Format",
+                "Data format for markers/analogs/residuals "
+                f"({', '.join(OUTPUT_FORMATS)}):",
+                initialvalue="csv",
+            )
+            or "csv"
+        ).strip().lower()
+        if output_format not in OUTPUT_FORMATS:
+            print(f"Unknown output format '{output_format}', using csv.")
+            output_format = "csv"
+        max_workers = simpledialog.askinteger(
+            "Worker Processes",
+            "Number of files to convert in parallel:",
+            initialvalue=os.cpu_count() or 1,
+            minvalue=1,
         )
-        print(f"Found {len(c3d_files)} .c3d files in the input directory.")
-
-        # Simplified progress bar
-        progress_bar = tqdm(
-            total=len(c3d_files), desc="Processing C3D files", unit="file"
-        )
-
-        for c3d_file in c3d_files:
-            print(f"Processing file: {c3d_file}")
-            try:
-                file_path = os.path.join(input_directory, c3d_file)
-                (
-                    markers,
-                    marker_labels,
-                    marker_freq,
-                    analogs,
-                    points_residuals,
-                    analog_labels,
-                    analog_units,
-                    analog_freq,
-                    datac3d,
-                ) = importc3d(file_path)
-                file_name = os.path.splitext(c3d_file)[0]
-                save_to_files(
-                    markers,
-                    marker_labels,
-                    marker_freq,
-                    analogs,
-                    points_residuals,
-                    analog_labels,
-                    analog_units,
-                    analog_freq,
-                    file_name,
-                    output_directory,
-                    save_excel,
-                    datac3d,
-                )
-            except Exception as e:
-                print(f"Error processing {c3d_file}: {e}")
-                messagebox.showerror("Error", f"Failed to process {c3d_file}: {e}")
-
-            # Update progress bar after each file
-            progress_bar.update(1)
-
-        progress_bar.close()
-        print("All files have been processed and saved successfully!")
-        messagebox.showinfo(
-            "Information", "C3D files conversion completed successfully!"
+        root.destroy()  # Use root.destroy() to properly close the Tkinter resources
+
+        manifest_df = batch_convert_c3d_to_csv(
+            input_directory,
+            output_directory,
+            save_excel,
+            max_workers,
+            output_format=output_format,
         )
+        failed = manifest_df[manifest_df["Status"] != "ok"]
+
+        if failed.empty:
+            print("All files have been processed and saved successfully!")
+            messagebox.showinfo(
+                "Information", "C3D files conversion completed successfully!"
+            )
+        else:
+            failed_list = "\n".join(
+                f"{row.File}: {row.Error}" for row in failed.head(10).itertuples()
+            )
+            messagebox.showwarning(
+                "Warning",
+                f"{len(failed)} of {len(manifest_df)} files failed to convert. "
+                f"See the batch manifest for details.\n\n{failed_list}",
+            )
     else:
+        root.destroy()
         print("Input or output directory not selected.")
         messagebox.showwarning("Warning", "Input or output directory not selected.")
 
 
+def main():
+    """
+    Command-line entry point. Without arguments the Tk dialogs are used; with
+    --input and --output the batch conversion runs headless.
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert .c3d files to CSV (and optionally Excel) files."
+    )
+    parser.add_argument("--input", help="Directory containing .c3d files")
+    parser.add_argument("--output", help="Output directory")
+    parser.add_argument(
+        "--excel", action="store_true", help="Also save Excel files (slow)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Data format for markers, analogs and residuals",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Store binary (Parquet/Feather/NPZ) columns as float32",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=STREAM_CHUNK_FRAMES,
+        help="Point frames per chunk for streaming export",
+    )
+    args = parser.parse_args()
+
+    if args.input is None and args.output is None:
+        convert_c3d_to_csv()
+        return
+    if not args.input or not args.output:
+        parser.error("--input and --output must be given together")
+
+    manifest_df = batch_convert_c3d_to_csv(
+        args.input,
+        args.output,
+        args.excel,
+        args.workers,
+        args.chunk_size,
+        args.format,
+        "float32" if args.float32 else "float64",
+    )
+    if (manifest_df["Status"] != "ok").any():
+        raise SystemExit(1)
+
+
 if __name__ == "__main__":
-    convert_c3d_to_csv()
+    main()
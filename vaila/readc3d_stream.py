@@ -0,0 +1,441 @@
+"""
+Module: readc3d_stream.py
+Description:
+This module provides a streaming, frame-chunked reader for .c3d files. The header and
+parameter blocks are parsed once, and the data section is exposed through a NumPy
+memory map, so markers, residuals and analogs can be consumed in fixed-size frame
+chunks with bounded memory, no matter how long the trial is.
+
+The main features of this module include:
+- **Header and Parameter Parsing**: Reads the C3D header and the full parameter section
+  into the same nested dictionary layout used by `ezc3d` (`reader["header"]`,
+  `reader["parameters"]`), so existing helpers such as `save_info_file` and
+  `save_events` in `readc3d_export.py` work unchanged.
+- **Memory-Mapped Data Access**: Maps the data section as a record array with one
+  record per point frame. Only the frames of the requested chunk are decoded.
+- **Aligned Chunks**: Each chunk returns markers, residuals and the analog samples that
+  belong to the same point frames.
+- **Processor Formats**: Supports Intel, DEC and MIPS files, with integer or floating
+  point storage.
+
+Author: Prof. Dr. Paulo R. P. Santiago
+Version: 1.0
+Date: 2024-12-20
+
+Usage:
+```python
+from vaila.readc3d_stream import C3DStreamReader
+
+with C3DStreamReader("trial.c3d") as reader:
+    print(reader.marker_labels, reader.marker_freq)
+    for chunk in reader.iter_chunks(chunk_size=5000):
+        markers = chunk["markers"]  # (frames, markers * 3)
+        analogs = chunk["analogs"]  # (frames * analog_per_frame, channels)
+```
+"""
+
+import os
+import numpy as np
+
+BLOCK_SIZE = 512
+
+PROCESSOR_INTEL = 84
+PROCESSOR_DEC = 85
+PROCESSOR_MIPS = 86
+
+
+def _dec_to_ieee(raw):
+    """
+    Converts an array of 32-bit DEC floats, read as little-endian uint32, to float32.
+    The two 16-bit words are swapped and the exponent bias difference is removed by
+    dividing by four.
+    """
+    raw = np.asarray(raw, dtype="<u4")
+    swapped = ((raw & 0xFFFF0000) >> 16) | ((raw & 0x0000FFFF) << 16)
+    return swapped.astype("<u4").view("<f4") / np.float32(4.0)
+
+
+def _decode_text(raw):
+    """
+    Decodes a C3D character field. Non UTF-8 bytes (e.g. "mm/s\xb2") fall back to Latin-1.
+    """
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+class C3DStreamReader:
+    """
+    Streaming reader for .c3d files backed by a memory-mapped data section.
+
+    Parameters:
+    - file_path: str
+        Path to the .c3d file.
+    - chunk_size: int, default=10000
+        Default number of point frames returned by `iter_chunks`.
+    """
+
+    def __init__(self, file_path, chunk_size=10000):
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"C3D file not found: {file_path}")
+
+        self.file_path = file_path
+        self.chunk_size = int(chunk_size)
+        self._data = None
+
+        with open(file_path, "rb") as f:
+            header_block = f.read(BLOCK_SIZE)
+            if len(header_block) < BLOCK_SIZE or header_block[1] != 0x50:
+                raise ValueError(f"Not a valid C3D file: {file_path}")
+            self.parameter_block = header_block[0]
+            f.seek((self.parameter_block - 1) * BLOCK_SIZE)
+            parameter_header = f.read(4)
+            self.processor = parameter_header[3]
+            if self.processor not in (PROCESSOR_INTEL, PROCESSOR_DEC, PROCESSOR_MIPS):
+                # Some writers leave the processor byte empty; Intel is the default.
+                self.processor = PROCESSOR_INTEL
+            f.seek((self.parameter_block - 1) * BLOCK_SIZE)
+            parameter_section = f.read(max(parameter_header[2], 1) * BLOCK_SIZE)
+
+        self._endian = ">" if self.processor == PROCESSOR_MIPS else "<"
+        self._parse_header(header_block)
+        self.parameters = self._parse_parameters(parameter_section)
+        self._resolve_layout()
+
+    # ------------------------------------------------------------------
+    # Header and parameter parsing
+    # ------------------------------------------------------------------
+    def _read_float(self, raw):
+        if self.processor == PROCESSOR_DEC:
+            return float(_dec_to_ieee(np.frombuffer(raw, dtype="<u4"))[0])
+        return float(np.frombuffer(raw, dtype=f"{self._endian}f4")[0])
+
+    def _parse_header(self, block):
+        words = np.frombuffer(block[:24], dtype=f"{self._endian}u2")
+        self.point_count = int(words[1])
+        self.analog_total = int(words[2])
+        self.first_frame = int(words[3])
+        self.last_frame = int(words[4])
+        self.point_scale = self._read_float(block[12:16])
+        self.data_start = int(words[8])
+        self.analog_per_frame = int(words[9])
+        self.marker_freq = self._read_float(block[20:24])
+
+    def _decode_value(self, data_type, dims, raw):
+        if data_type == -1:
+            if len(dims) == 0:
+                return [_decode_text(raw).strip()]
+            length = dims[0]
+            count = int(np.prod(dims[1:])) if len(dims) > 1 else 1
+            return [
+                _decode_text(raw[i * length : (i + 1) * length]).strip()
+                for i in range(count)
+            ]
+
+        if data_type == 1:
+            dtype = "i1"
+        elif data_type == 2:
+            dtype = f"{self._endian}i2"
+        else:
+            dtype = f"{self._endian}f4"
+
+        if data_type == 4 and self.processor == PROCESSOR_DEC:
+            values = _dec_to_ieee(np.frombuffer(raw, dtype="<u4"))
+        else:
+            values = np.frombuffer(raw, dtype=dtype)
+        values = values.astype(float if data_type == 4 else int)
+        if len(dims) > 1:
+            values = values.reshape(dims, order="F")
+        return values
+
+    def _parse_parameters(self, section):
+        groups = {}
+        group_names = {}
+        params = []
+        int16 = f"{self._endian}i2"
+        pos = 4
+        while pos + 2 <= len(section):
+            name_len = np.frombuffer(section[pos : pos + 1], dtype="i1")[0]
+            group_id = int(np.frombuffer(section[pos + 1 : pos + 2], dtype="i1")[0])
+            if name_len == 0 or group_id == 0:
+                break
+            is_locked = bool(name_len < 0)
+            name_len = abs(int(name_len))
+            name = _decode_text(section[pos + 2 : pos + 2 + name_len])
+            offset_pos = pos + 2 + name_len
+            offset = int(np.frombuffer(section[offset_pos : offset_pos + 2], int16)[0])
+            cursor = offset_pos + 2
+
+            if group_id < 0:
+                desc_len = section[cursor]
+                description = _decode_text(section[cursor + 1 : cursor + 1 + desc_len])
+                group_names[-group_id] = name.upper()
+                groups[name.upper()] = {
+                    "__METADATA__": {
+                        "DESCRIPTION": description,
+                        "IS_LOCKED": is_locked,
+                    }
+                }
+            else:
+                data_type = int(np.frombuffer(section[cursor : cursor + 1], "i1")[0])
+                ndims = section[cursor + 1]
+                dims = list(section[cursor + 2 : cursor + 2 + ndims])
+                cursor += 2 + ndims
+                nbytes = abs(data_type) * int(np.prod(dims)) if ndims else abs(data_type)
+                raw = section[cursor : cursor + nbytes]
+                cursor += nbytes
+                desc_len = section[cursor] if cursor < len(section) else 0
+                description = _decode_text(section[cursor + 1 : cursor + 1 + desc_len])
+                params.append(
+                    (
+                        group_id,
+                        name.upper(),
+                        {
+                            "type": data_type,
+                            "description": description,
+                            "is_locked": is_locked,
+                            "dimension": dims,
+                            "value": self._decode_value(data_type, dims, raw),
+                        },
+                    )
+                )
+
+            if offset == 0:
+                break
+            pos = offset_pos + offset
+
+        for group_id, name, content in params:
+            group_name = group_names.get(group_id, f"GROUP_{group_id}")
+            groups.setdefault(group_name, {})[name] = content
+        return groups
+
+    def get_parameter(self, group, name, default=None):
+        """
+        Returns the value of a parameter, or `default` if it is missing.
+        """
+        return self.parameters.get(group, {}).get(name, {}).get("value", default)
+
+    def _collect_labels(self, group, count):
+        labels = list(self.get_parameter(group, "LABELS", []))
+        suffix = 2
+        while len(labels) < count and f"LABELS{suffix}" in self.parameters.get(
+            group, {}
+        ):
+            labels.extend(self.get_parameter(group, f"LABELS{suffix}"))
+            suffix += 1
+        if len(labels) < count:
+            labels.extend(
+                f"{group.lower()}_{i + 1}" for i in range(len(labels), count)
+            )
+        return labels[:count]
+
+    def _resolve_layout(self):
+        point_rate = self.get_parameter("POINT", "RATE")
+        if not self.marker_freq and point_rate is not None and len(point_rate):
+            self.marker_freq = float(point_rate[0])
+
+        data_start = self.get_parameter("POINT", "DATA_START")
+        if not self.data_start and data_start is not None and len(data_start):
+            self.data_start = int(data_start[0]) & 0xFFFF
+
+        self.n_channels = (
+            self.analog_total // self.analog_per_frame if self.analog_per_frame else 0
+        )
+        self.analog_freq = self.marker_freq * self.analog_per_frame
+
+        self.marker_labels = self._collect_labels("POINT", self.point_count)
+        self.analog_labels = self._collect_labels("ANALOG", self.n_channels)
+        units = list(self.get_parameter("ANALOG", "UNITS", []))
+        self.analog_units = (units + ["Unknown"] * self.n_channels)[: self.n_channels]
+
+        # Analog conversion: (raw - offset) * scale * gen_scale
+        gen_scale = self.get_parameter("ANALOG", "GEN_SCALE", [1.0])
+        scale = np.ones(self.n_channels)
+        offset = np.zeros(self.n_channels)
+        scale_values = np.asarray(self.get_parameter("ANALOG", "SCALE", []), float)
+        offset_values = np.asarray(self.get_parameter("ANALOG", "OFFSET", []), float)
+        scale[: min(len(scale_values), self.n_channels)] = scale_values[
+            : self.n_channels
+        ]
+        offset[: min(len(offset_values), self.n_channels)] = offset_values[
+            : self.n_channels
+        ]
+        self._analog_scale = scale * float(gen_scale[0] if len(gen_scale) else 1.0)
+        self._analog_offset = offset
+
+        self.is_float = self.point_scale < 0
+        analog_format = self.get_parameter("ANALOG", "FORMAT", ["SIGNED"])
+        analog_unsigned = bool(analog_format) and analog_format[0].upper() == (
+            "UNSIGNED"
+        )
+        if self.is_float:
+            storage = "<u4" if self.processor == PROCESSOR_DEC else f"{self._endian}f4"
+            analog_storage = storage
+        else:
+            storage = f"{self._endian}i2"
+            analog_storage = f"{self._endian}u2" if analog_unsigned else storage
+            if analog_unsigned:
+                # Unsigned analog offsets are stored as int16 but mean uint16.
+                self._analog_offset = np.where(
+                    self._analog_offset < 0,
+                    self._analog_offset + 65536,
+                    self._analog_offset,
+                )
+
+        fields = [("points", storage, (self.point_count, 4))]
+        if self.analog_total:
+            fields.append(
+                ("analogs", analog_storage, (self.analog_per_frame, self.n_channels))
+            )
+        self.frame_dtype = np.dtype(fields)
+
+        # Frame count: header words are 16 bit, so long trials rely on POINT:FRAMES
+        n_frames = self.last_frame - self.first_frame + 1
+        frames_param = self.get_parameter("POINT", "FRAMES")
+        if frames_param is not None and len(frames_param):
+            frames_value = int(frames_param[0])
+            if frames_value < 0:
+                frames_value += 65536
+            n_frames = max(n_frames, frames_value)
+
+        self.data_offset = (self.data_start - 1) * BLOCK_SIZE
+        available = os.path.getsize(self.file_path) - self.data_offset
+        max_frames = available // self.frame_dtype.itemsize if available > 0 else 0
+        self.n_frames = int(max(0, min(n_frames, max_frames)))
+
+    # ------------------------------------------------------------------
+    # ezc3d-compatible access
+    # ------------------------------------------------------------------
+    @property
+    def header(self):
+        analog_frames = self.n_frames * self.analog_per_frame
+        return {
+            "points": {
+                "size": self.point_count,
+                "frame_rate": self.marker_freq,
+                "first_frame": self.first_frame - 1,
+                "last_frame": self.first_frame - 2 + self.n_frames,
+            },
+            "analogs": {
+                "size": self.n_channels,
+                "frame_rate": self.analog_freq,
+                "first_frame": (self.first_frame - 1) * self.analog_per_frame,
+                "last_frame": (self.first_frame - 1) * self.analog_per_frame
+                + analog_frames
+                - 1,
+            },
+        }
+
+    def __getitem__(self, key):
+        if key == "header":
+            return self.header
+        if key == "parameters":
+            return self.parameters
+        raise KeyError(key)
+
+    # ------------------------------------------------------------------
+    # Data access
+    # ------------------------------------------------------------------
+    @property
+    def data(self):
+        """Lazily created memory map of the data section (one record per frame)."""
+        if self._data is None:
+            if self.n_frames == 0:
+                self._data = np.zeros(0, dtype=self.frame_dtype)
+            else:
+                self._data = np.memmap(
+                    self.file_path,
+                    dtype=self.frame_dtype,
+                    mode="r",
+                    offset=self.data_offset,
+                    shape=(self.n_frames,),
+                )
+        return self._data
+
+    def _decode(self, raw):
+        if self.processor == PROCESSOR_DEC and self.is_float:
+            return _dec_to_ieee(raw)
+        return raw
+
+    def read_frames(self, start=0, stop=None, include_analogs=True):
+        """
+        Decodes the point frames in [start, stop). Analog decoding is skipped when
+        `include_analogs` is False.
+
+        Returns:
+        - chunk: dict
+            - "start": int, index of the first frame of the chunk.
+            - "points": ndarray (frames, markers, 3), NaN where the residual is invalid.
+            - "markers": ndarray (frames, markers * 3), same layout as `importc3d`.
+            - "residuals": ndarray (frames, markers).
+            - "analogs": ndarray (frames * analog_per_frame, channels).
+        """
+        stop = self.n_frames if stop is None else min(stop, self.n_frames)
+        start = max(0, min(start, stop))
+        records = self.data[start:stop]
+        n = stop - start
+
+        raw_points = self._decode(np.asarray(records["points"]))
+        if self.is_float:
+            xyz = raw_points[:, :, :3].astype(np.float64)
+            residual_word = raw_points[:, :, 3].astype(np.int64)
+        else:
+            xyz = raw_points[:, :, :3].astype(np.float64) * self.point_scale
+            residual_word = raw_points[:, :, 3].astype(np.int64)
+
+        scale = abs(self.point_scale)
+        invalid = residual_word < 0
+        residuals = (residual_word & 0xFF).astype(np.float64) * scale
+        residuals[invalid] = -1.0
+        xyz[invalid] = np.nan
+
+        if self.analog_total and include_analogs:
+            raw_analogs = self._decode(np.asarray(records["analogs"]))
+            analogs = raw_analogs.reshape(n * self.analog_per_frame, self.n_channels)
+            analogs = (analogs.astype(np.float64) - self._analog_offset) * (
+                self._analog_scale
+            )
+        else:
+            analogs = np.empty((0, 0))
+
+        return {
+            "start": start,
+            "points": xyz,
+            "markers": xyz.reshape(n, self.point_count * 3),
+            "residuals": residuals,
+            "analogs": analogs,
+        }
+
+    def iter_chunks(self, chunk_size=None, start=0, stop=None, include_analogs=True):
+        """
+        Yields consecutive frame chunks (see `read_frames`) of at most `chunk_size` frames.
+        """
+        chunk_size = int(chunk_size or self.chunk_size)
+        stop = self.n_frames if stop is None else min(stop, self.n_frames)
+        for chunk_start in range(start, stop, chunk_size):
+            yield self.read_frames(
+                chunk_start, min(chunk_start + chunk_size, stop), include_analogs
+            )
+
+    def read_points(self):
+        """
+        Returns all marker coordinates as a (frames, markers, 3) array without decoding
+        the analog channels.
+        """
+        points = np.empty((self.n_frames, self.point_count, 3))
+        for chunk in self.iter_chunks(include_analogs=False):
+            n = chunk["points"].shape[0]
+            points[chunk["start"] : chunk["start"] + n] = chunk["points"]
+        return points
+
+    def close(self):
+        if isinstance(self._data, np.memmap):
+            self._data._mmap.close()
+        self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
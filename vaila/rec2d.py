@@ -1,7 +1,7 @@
 # rec2d.py
 # Author: Paulo Santiago
-# Version: 0.0.5
-# Last Updated: August 9, 2024
+# Version: 0.0.6
+# Last Updated: October 18, 2026
 # Description: Batch processing of 2D coordinates reconstruction using corresponding DLT parameters for each frame.
 # --------------------------------------------------
 # Usage Instructions:
@@ -9,11 +9,12 @@
 # - Select the DLT parameters file (can contain multiple sets of DLT parameters).
 # - The script will process each CSV file in the directory and save the reconstructed 2D coordinates in a new directory with a timestamp.
 # - The script matches each frame in the pixel coordinates file with the corresponding DLT parameters based on frame number.
+# - All frames and markers of a file are reconstructed at once (closed-form 2x2 solve per point);
+#   frames without valid DLT parameters, or points with NaN pixels, give NaN.
 # --------------------------------------------------
 
 import numpy as np
 import pandas as pd
-from numpy.linalg import inv
 from tkinter import filedialog, Tk, messagebox
 from datetime import datetime
 import os
@@ -25,19 +26,84 @@ def read_coordinates(file_path, usecols=None):
     return coordinates
 
 
+def rec2d_batch(A, cc2d):
+    """
+    Reconstructs 2D coordinates for many frames and markers in one operation.
+
+    Parameters:
+    - A: array-like, shape (8,) or (frames, 8)
+        DLT parameters, shared or one set per frame.
+    - cc2d: array-like, shape (frames, markers, 2)
+        Pixel coordinates.
+
+    Returns:
+    - H: ndarray, shape (frames, markers, 2)
+        Reconstructed coordinates (NaN for NaN inputs or singular systems).
+    """
+    A = np.asarray(A, dtype=float)
+    cc2d = np.asarray(cc2d, dtype=float)
+    if A.ndim == 1:
+        A = A[np.newaxis]
+    A = A[:, np.newaxis, :]  # broadcast over markers
+    x = cc2d[..., 0]
+    y = cc2d[..., 1]
+
+    # [[a, b], [c, d]] @ [X, Y] = [r1, r2], solved by Cramer's rule
+    a = A[..., 0] - x * A[..., 6]
+    b = A[..., 1] - x * A[..., 7]
+    c = A[..., 3] - y * A[..., 6]
+    d = A[..., 4] - y * A[..., 7]
+    r1 = x - A[..., 2]
+    r2 = y - A[..., 5]
+    det = a * d - b * c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        det = np.where(det == 0, np.nan, det)
+        H = np.stack(((d * r1 - b * r2) / det, (a * r2 - c * r1) / det), axis=-1)
+    return H
+
+
 def rec2d(A, cc2d):
-    nlin = np.size(cc2d, 0)
-    H = np.matrix(np.zeros((nlin, 2)))
-    for k in range(nlin):
-        x = cc2d[k, 0]
-        y = cc2d[k, 1]
-        cc2d1 = np.matrix(
-            [[A[0] - x * A[6], A[1] - x * A[7]], [A[3] - y * A[6], A[4] - y * A[7]]]
-        )
-        cc2d2 = np.matrix([[x - A[2]], [y - A[5]]])
-        G1 = inv(cc2d1) * cc2d2
-        H[k, :] = G1.transpose()
-    return np.asarray(H)
+    cc2d = np.asarray(cc2d, dtype=float)
+    return rec2d_batch(A, cc2d[np.newaxis])[0]
+
+
+def frame_param_index(frames, frame_numbers):
+    """
+    Maps each frame number to the row of its DLT parameters (first match),
+    or -1 when the frame has no parameters.
+    """
+    unique_frames, first_rows = np.unique(np.asarray(frames), return_index=True)
+    index = np.full(len(frame_numbers), -1)
+    if len(unique_frames) == 0:
+        return index
+    pos = np.searchsorted(unique_frames, frame_numbers)
+    pos = np.clip(pos, 0, len(unique_frames) - 1)
+    found = unique_frames[pos] == frame_numbers
+    index[found] = first_rows[pos[found]]
+    return index
+
+
+def reconstruct_dataframe(pixel_coords_df, frames, dlt_params):
+    """
+    Reconstructs every row of a pixel coordinates DataFrame (first column 'frame',
+    then x, y pairs) with the DLT parameters of its frame.
+    """
+    frame_numbers = pixel_coords_df["frame"].to_numpy().astype(int)
+    pixels = pixel_coords_df.iloc[:, 1:].to_numpy(dtype=float)
+    n_rows, n_cols = pixels.shape
+
+    param_index = frame_param_index(frames, frame_numbers)
+    A = np.full((n_rows, dlt_params.shape[1]), np.nan)
+    has_params = param_index >= 0
+    A[has_params] = dlt_params[param_index[has_params]]
+
+    rec = rec2d_batch(A, pixels.reshape(n_rows, -1, 2)).reshape(n_rows, n_cols)
+    # Frames with missing or incomplete DLT parameters are left as NaN
+    rec[np.isnan(A).any(axis=1)] = np.nan
+
+    rec_coords_df = pd.DataFrame(rec, columns=pixel_coords_df.columns[1:])
+    rec_coords_df.insert(0, pixel_coords_df.columns[0], frame_numbers)
+    return rec_coords_df
 
 
 def process_files_in_directory(dlt_params_df, directory):
@@ -47,7 +113,7 @@ def process_files_in_directory(dlt_params_df, directory):
 
     dlt_params = dlt_params_df.to_numpy()
     frames = dlt_params[:, 0]
-    dlt_params = dlt_params[:, 1:]
+    dlt_params = dlt_params[:, 1:].astype(float)
 
     csv_files = sorted([f for f in os.listdir(directory) if f.endswith(".csv")])
 
@@ -55,26 +121,7 @@ def process_files_in_directory(dlt_params_df, directory):
         pixel_file = os.path.join(directory, csv_file)
         pixel_coords_df = pd.read_csv(pixel_file)
 
-        rec_coords = []
-        for i, row in pixel_coords_df.iterrows():
-            frame_num = int(row["frame"])
-            if frame_num in frames:
-                A_index = np.where(frames == frame_num)[0][0]
-                A = dlt_params[A_index]
-                if not np.isnan(A).any():
-                    pixel_coords = row[1:].to_numpy().reshape(-1, 2)
-                    rec2d_coords = rec2d(A, pixel_coords)
-                    rec_coords.append((frame_num, *rec2d_coords.flatten()))
-                else:
-                    rec_coords.append(
-                        (frame_num, *[np.nan] * (pixel_coords_df.shape[1] - 1))
-                    )
-            else:
-                rec_coords.append(
-                    (frame_num, *[np.nan] * (pixel_coords_df.shape[1] - 1))
-                )
-
-        rec_coords_df = pd.DataFrame(rec_coords, columns=pixel_coords_df.columns)
+        rec_coords_df = reconstruct_dataframe(pixel_coords_df, frames, dlt_params)
 
         output_file = os.path.join(
             output_dir, f"{os.path.splitext(csv_file)[0]}_{timestamp}.2d"
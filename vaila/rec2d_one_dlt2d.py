@@ -1,7 +1,7 @@
 # rec2d_one_dlt2d.py
 # Author: Paulo Santiago
-# Version: 0.0.5
-# Last Updated: August 9, 2024
+# Version: 0.0.6
+# Last Updated: October 18, 2026
 # Description: Batch processing of 2D coordinates reconstruction using DLT parameters from a single set of DLT parameters.
 # --------------------------------------------------
 # Usage Instructions:
@@ -12,7 +12,7 @@
 
 import numpy as np
 import pandas as pd
-from numpy.linalg import inv
+from vaila.rec2d import rec2d_batch
 from tkinter import filedialog, Tk, messagebox
 from datetime import datetime
 import os
@@ -25,18 +25,8 @@ def read_coordinates(file_path, usecols=None):
 
 
 def rec2d(A, cc2d):
-    nlin = np.size(cc2d, 0)
-    H = np.matrix(np.zeros((nlin, 2)))
-    for k in range(nlin):
-        x = cc2d[k, 0]
-        y = cc2d[k, 1]
-        cc2d1 = np.matrix(
-            [[A[0] - x * A[6], A[1] - x * A[7]], [A[3] - y * A[6], A[4] - y * A[7]]]
-        )
-        cc2d2 = np.matrix([[x - A[2]], [y - A[5]]])
-        G1 = inv(cc2d1) * cc2d2
-        H[k, :] = G1.transpose()
-    return np.asarray(H)
+    cc2d = np.asarray(cc2d, dtype=float)
+    return rec2d_batch(A, cc2d[np.newaxis])[0]
 
 
 def process_files_in_directory(dlt_params, directory):
@@ -50,17 +40,15 @@ def process_files_in_directory(dlt_params, directory):
         pixel_file = os.path.join(directory, csv_file)
         pixel_coords_df = pd.read_csv(pixel_file)
 
-        rec_coords = []
-        for i, row in pixel_coords_df.iterrows():
-            frame_num = int(row["frame"])
-            pixel_coords = row[1:].to_numpy().reshape(-1, 2)
-            if not np.isnan(pixel_coords).all():
-                rec2d_coords = rec2d(dlt_params, pixel_coords)
-                rec_coords.append((frame_num, *rec2d_coords.flatten()))
-            else:
-                rec_coords.append((frame_num, *[np.nan] * (len(row) - 1)))
-
-        rec_coords_df = pd.DataFrame(rec_coords, columns=pixel_coords_df.columns)
+        frame_numbers = pixel_coords_df["frame"].to_numpy().astype(int)
+        pixels = pixel_coords_df.iloc[:, 1:].to_numpy(dtype=float)
+        # All frames and markers at once; rows without valid pixels stay NaN
+        rec_coords = rec2d_batch(
+            dlt_params.astype(float), pixels.reshape(len(pixels), -1, 2)
+        ).reshape(pixels.shape)
+
+        rec_coords_df = pd.DataFrame(rec_coords, columns=pixel_coords_df.columns[1:])
+        rec_coords_df.insert(0, pixel_coords_df.columns[0], frame_numbers)
 
         output_file = os.path.join(
             output_dir, f"{os.path.splitext(csv_file)[0]}_{timestamp}.2d"
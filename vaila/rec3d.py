@@ -0,0 +1,258 @@
+# rec3d.py
+# Author: Paulo Santiago
+# Version: 0.0.1
+# Last Updated: October 18, 2026
+# Description: Batch 3D reconstruction of markers from N cameras using the DLT3D parameters
+# of each camera (one set of parameters per frame, as written by dlt3d.py).
+# --------------------------------------------------
+# Usage Instructions:
+# - Select the .dlt3d file of each camera, then the pixel coordinate CSV of each camera
+#   (same camera order; columns: frame, p1_x, p1_y, p2_x, p2_y, ...).
+# - Every marker of every frame is triangulated from all cameras where it is visible
+#   (non-NaN pixels and DLT parameters) with one batched least-squares solve.
+# - Points seen by fewer than two cameras are NaN.
+# - Output (in a timestamped Rec3D directory next to the first pixel file):
+#   <name>_<timestamp>.3d with frame, p1_x, p1_y, p1_z, ... and
+#   <name>_<timestamp>_residuals.csv with the reprojection RMS (pixels) and the number
+#   of cameras used for each point.
+# --------------------------------------------------
+
+import numpy as np
+import pandas as pd
+from tkinter import filedialog, Tk, messagebox
+from datetime import datetime
+import os
+from vaila.rec2d import frame_param_index
+
+CHUNK_FRAMES = 20000
+
+
+def _triangulate_chunk(dlt, uv):
+    """
+    Triangulates one chunk of frames.
+
+    dlt: (cams, frames, 11); uv: (cams, frames, markers, 2).
+    Returns xyz (frames, markers, 3), rms (frames, markers), ncams (frames, markers).
+    """
+    L = dlt[:, :, np.newaxis, :]  # broadcast over markers
+    u = uv[..., 0]
+    v = uv[..., 1]
+    visible = ~(np.isnan(u) | np.isnan(v) | np.isnan(L).any(axis=-1))
+
+    # Two linear equations per camera: a_u . [X, Y, Z] = b_u and a_v . [X, Y, Z] = b_v
+    a_u = L[..., 0:3] - u[..., np.newaxis] * L[..., 8:11]
+    a_v = L[..., 4:7] - v[..., np.newaxis] * L[..., 8:11]
+    b_u = u - L[..., 3]
+    b_v = v - L[..., 7]
+    a_u = np.where(visible[..., np.newaxis], a_u, 0.0)
+    a_v = np.where(visible[..., np.newaxis], a_v, 0.0)
+    b_u = np.where(visible, b_u, 0.0)
+    b_v = np.where(visible, b_v, 0.0)
+
+    # Normal equations accumulated over cameras: (frames, markers, 3, 3) and (..., 3)
+    AtA = np.einsum("cfmi,cfmj->fmij", a_u, a_u) + np.einsum(
+        "cfmi,cfmj->fmij", a_v, a_v
+    )
+    Atb = np.einsum("cfmi,cfm->fmi", a_u, b_u) + np.einsum(
+        "cfmi,cfm->fmi", a_v, b_v
+    )
+    ncams = visible.sum(axis=0)
+    # At least two views and a well-conditioned (non-degenerate) system
+    trace = np.trace(AtA, axis1=-2, axis2=-1)
+    solvable = (ncams >= 2) & (
+        np.linalg.det(AtA) > np.finfo(float).eps * np.maximum(trace, 0) ** 3
+    )
+
+    xyz = np.full(AtA.shape[:-1], np.nan)
+    if solvable.any():
+        xyz[solvable] = np.linalg.solve(AtA[solvable], Atb[solvable][..., np.newaxis])[
+            ..., 0
+        ]
+
+    # Reprojection residuals over the cameras used
+    X = xyz[np.newaxis]
+    den = np.sum(L[..., 8:11] * X, axis=-1) + 1
+    u_hat = (np.sum(L[..., 0:3] * X, axis=-1) + L[..., 3]) / den
+    v_hat = (np.sum(L[..., 4:7] * X, axis=-1) + L[..., 7]) / den
+    err2 = np.where(visible, (u_hat - u) ** 2 + (v_hat - v) ** 2, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rms = np.sqrt(err2.sum(axis=0) / ncams)
+    rms[~solvable] = np.nan
+    return xyz, rms, ncams
+
+
+def rec3d_multicam(dlt_params, pixel_coords, chunk_frames=CHUNK_FRAMES):
+    """
+    Reconstructs 3D coordinates of all markers and frames from N cameras.
+
+    Parameters:
+    - dlt_params: array-like, shape (cams, 11) or (cams, frames, 11)
+        DLT3D parameters of each camera, shared or one set per frame (NaN rows mark
+        frames without calibration).
+    - pixel_coords: array-like, shape (cams, frames, markers, 2)
+        Pixel coordinates of each camera (NaN where the marker is not visible).
+    - chunk_frames: int
+        Frames solved per batch, so memory and time grow linearly with frames.
+
+    Returns:
+    - xyz: ndarray, shape (frames, markers, 3)
+    - residual_rms: ndarray, shape (frames, markers), reprojection RMS in pixels
+    - n_cameras: ndarray, shape (frames, markers), cameras used for each point
+    """
+    pixel_coords = np.asarray(pixel_coords, dtype=float)
+    dlt_params = np.asarray(dlt_params, dtype=float)
+    n_cams, n_frames, n_markers = pixel_coords.shape[:3]
+    if dlt_params.ndim == 2:
+        dlt_params = np.broadcast_to(
+            dlt_params[:, np.newaxis, :], (n_cams, n_frames, 11)
+        )
+
+    xyz = np.full((n_frames, n_markers, 3), np.nan)
+    residual_rms = np.full((n_frames, n_markers), np.nan)
+    n_cameras = np.zeros((n_frames, n_markers), dtype=int)
+    for start in range(0, n_frames, chunk_frames):
+        stop = min(start + chunk_frames, n_frames)
+        xyz[start:stop], residual_rms[start:stop], n_cameras[start:stop] = (
+            _triangulate_chunk(dlt_params[:, start:stop], pixel_coords[:, start:stop])
+        )
+    return xyz, residual_rms, n_cameras
+
+
+def load_camera_data(dlt_files, pixel_files, one_dlt=False):
+    """
+    Reads the DLT3D and pixel files of each camera and aligns them by frame number
+    (frames of the first pixel file).
+
+    Returns:
+    - frames: ndarray (frames,)
+    - dlt_params: ndarray (cams, 11) if one_dlt else (cams, frames, 11)
+    - pixel_coords: ndarray (cams, frames, markers, 2)
+    - marker_names: list of str
+    """
+    pixel_dfs = [pd.read_csv(f) for f in pixel_files]
+    frames = pixel_dfs[0]["frame"].to_numpy().astype(int)
+    columns = list(pixel_dfs[0].columns[1:])
+    marker_names = [
+        col[:-2] if col.lower().endswith("_x") else col for col in columns[0::2]
+    ]
+
+    pixel_coords = np.full((len(pixel_files), len(frames), len(columns)), np.nan)
+    for cam, df in enumerate(pixel_dfs):
+        if df.shape[1] - 1 != len(columns):
+            raise ValueError(
+                f"{os.path.basename(pixel_files[cam])} has {df.shape[1] - 1} coordinate "
+                f"columns; expected {len(columns)}."
+            )
+        index = frame_param_index(df["frame"].to_numpy(), frames)
+        found = index >= 0
+        pixel_coords[cam, found] = df.iloc[:, 1:].to_numpy(dtype=float)[index[found]]
+    pixel_coords = pixel_coords.reshape(len(pixel_files), len(frames), -1, 2)
+
+    dlt_params = []
+    for dlt_file in dlt_files:
+        dlt = pd.read_csv(dlt_file).to_numpy(dtype=float)
+        if one_dlt:
+            dlt_params.append(dlt[0, 1:12])
+            continue
+        params = np.full((len(frames), 11), np.nan)
+        index = frame_param_index(dlt[:, 0], frames)
+        found = index >= 0
+        params[found] = dlt[index[found], 1:12]
+        dlt_params.append(params)
+
+    return frames, np.array(dlt_params), pixel_coords, marker_names
+
+
+def save_rec3d(output_dir, name, frames, marker_names, xyz, residual_rms, n_cameras):
+    """Saves the reconstructed coordinates (.3d) and the per-point residuals (CSV)."""
+    columns = [f"{m}_{axis}" for m in marker_names for axis in ("x", "y", "z")]
+    rec_df = pd.DataFrame(xyz.reshape(len(frames), -1), columns=columns)
+    rec_df.insert(0, "frame", frames)
+    output_file = os.path.join(output_dir, f"{name}.3d")
+    rec_df.to_csv(output_file, index=False, float_format="%.6f")
+
+    residuals = {"frame": frames}
+    for k, m in enumerate(marker_names):
+        residuals[f"{m}_rms_px"] = residual_rms[:, k]
+        residuals[f"{m}_ncams"] = n_cameras[:, k]
+    pd.DataFrame(residuals).to_csv(
+        os.path.join(output_dir, f"{name}_residuals.csv"),
+        index=False,
+        float_format="%.6f",
+    )
+    return output_file
+
+
+def run_rec3d(dlt_files, pixel_files, one_dlt=False):
+    """Reconstructs one session and returns the path of the saved .3d file."""
+    if len(dlt_files) != len(pixel_files) or len(dlt_files) < 2:
+        raise ValueError("Select one DLT3D file and one pixel file for each camera (>= 2).")
+
+    for cam, (dlt_file, pixel_file) in enumerate(zip(dlt_files, pixel_files), start=1):
+        print(
+            f"Camera {cam}: {os.path.basename(dlt_file)} <-> {os.path.basename(pixel_file)}"
+        )
+
+    frames, dlt_params, pixel_coords, marker_names = load_camera_data(
+        dlt_files, pixel_files, one_dlt=one_dlt
+    )
+    xyz, residual_rms, n_cameras = rec3d_multicam(dlt_params, pixel_coords)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_dir = os.path.join(os.path.dirname(pixel_files[0]), f"Rec3D_{timestamp}")
+    os.makedirs(output_dir, exist_ok=True)
+    name = f"{os.path.splitext(os.path.basename(pixel_files[0]))[0]}_{timestamp}"
+    output_file = save_rec3d(
+        output_dir, name, frames, marker_names, xyz, residual_rms, n_cameras
+    )
+
+    reconstructed = np.isfinite(xyz[..., 0])
+    print(
+        f"Reconstructed {reconstructed.sum()} of {reconstructed.size} points "
+        f"({len(frames)} frames, {len(marker_names)} markers, {len(dlt_files)} cameras)."
+    )
+    if reconstructed.any():
+        print(f"Mean reprojection RMS: {np.nanmean(residual_rms):.4f} pixels")
+    print(f"Reconstructed 3D coordinates saved to {output_file}")
+    return output_file
+
+
+def select_camera_files():
+    dlt_files = filedialog.askopenfilenames(
+        title="Select the DLT3D file of each camera (in camera order)",
+        filetypes=[("DLT3D files", "*.dlt3d")],
+    )
+    if not dlt_files:
+        print("DLT file selection cancelled.")
+        return None, None
+
+    pixel_files = filedialog.askopenfilenames(
+        title="Select the pixel coordinate CSV of each camera (same order)",
+        filetypes=[("CSV files", "*.csv")],
+    )
+    if not pixel_files:
+        print("Pixel file selection cancelled.")
+        return None, None
+    return list(dlt_files), list(pixel_files)
+
+
+def main(one_dlt=False):
+    root = Tk()
+    root.withdraw()
+
+    dlt_files, pixel_files = select_camera_files()
+    if not dlt_files:
+        return
+
+    try:
+        output_file = run_rec3d(dlt_files, pixel_files, one_dlt=one_dlt)
+    except ValueError as e:
+        messagebox.showerror("Error", str(e))
+        print(f"Error: {e}")
+        return
+
+    messagebox.showinfo("Success", f"Reconstructed 3D coordinates saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# rec3d_one_dlt3d.py
+# Author: Paulo Santiago
+# Version: 0.0.1
+# Last Updated: October 18, 2026
+# Description: Batch 3D reconstruction of markers from N cameras using a single set of DLT3D
+# parameters per camera (the first row of each camera's .dlt3d file).
+# --------------------------------------------------
+# Usage Instructions:
+# - Select the .dlt3d file of each camera, then the pixel coordinate CSV of each camera
+#   (same camera order; columns: frame, p1_x, p1_y, p2_x, p2_y, ...).
+# - The reconstruction engine and output files are those of rec3d.py.
+# --------------------------------------------------
+
+from vaila.rec3d import main as rec3d_main
+
+
+def main():
+    rec3d_main(one_dlt=True)
+
+
+if __name__ == "__main__":
+    main()
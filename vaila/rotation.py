@@ -3,8 +3,8 @@
 Rotation Tools - 3D Rotation and Transformation Toolkit
 ================================================================================
 Author: Prof. Dr. Paulo R. P. Santiago
-Date: 2024-07-19
-Version: 1.0
+Date: 2026-10-18
+Version: 1.1
 
 Overview:
 
@@ -51,6 +51,12 @@ Usage Notes:
     - The functions in this script are particularly useful for biomechanical analysis, especially when dealing with motion capture data where body segment orientations are calculated.
     - The `createortbase` and `createortbase_4points` functions are configured to handle anatomical points, making this toolkit essential for analyzing kinematic data from motion capture systems.
 
+Changelog for Version 1.1:
+
+    - `createortbase` and `createortbase_4points` accept stacked points of shape (..., 3), e.g.
+      (segments, frames, 3), so many segments can be built in one call (see segment_kinematics.py).
+    - Removed the script path prints from every call.
+
 Changelog for Version 1.0:
 
     - Initial release with full support for orthonormal base creation, rotation matrix calculation, and conversion to Euler angles and quaternions.
@@ -62,7 +68,6 @@ This script is distributed under the GPL3 License.
 ================================================================================
 """
 
-import os
 import numpy as np
 from scipy.spatial.transform import Rotation as R
 
@@ -74,6 +79,7 @@ def createortbase(p1, p2, p3, configuration="C"):
 
     Parameters:
     p1, p2, p3 (np.ndarray): Arrays representing the coordinates of points over time.
+        Shape (n, 3), or (..., 3) to build several segments at once.
     configuration (str): The configuration to use for the basis ('A', 'B', 'C', 'D').
 
          (A)               (B)
@@ -93,69 +99,68 @@ def createortbase(p1, p2, p3, configuration="C"):
 
     Returns:
     np.ndarray: An array containing the orthonormal basis vectors for each time step.
+        Shape (n, 3, 3), or (..., 3, 3) for stacked points.
     """
 
-    # Print the directory and name of the script being executed
-    print(f"Running script: {os.path.basename(__file__)}")
-    print(f"Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-
     if configuration == "A":
-        v1 = (p1 - p3) / np.linalg.norm(p3 - p2, axis=1, keepdims=True)
-        v2 = (p2 - p3) / np.linalg.norm(p3 - p2, axis=1, keepdims=True)
-        v3_up = (p2 - p1) / np.linalg.norm(p2 - p1, axis=1, keepdims=True)
-        v3_up /= np.linalg.norm(v3_up, axis=1, keepdims=True)
+        v1 = (p1 - p3) / np.linalg.norm(p3 - p2, axis=-1, keepdims=True)
+        v2 = (p2 - p3) / np.linalg.norm(p3 - p2, axis=-1, keepdims=True)
+        v3_up = (p2 - p1) / np.linalg.norm(p2 - p1, axis=-1, keepdims=True)
+        v3_up /= np.linalg.norm(v3_up, axis=-1, keepdims=True)
         v4_ap = np.cross(v2, v1)
-        v4_ap /= np.linalg.norm(v4_ap, axis=1, keepdims=True)
+        v4_ap /= np.linalg.norm(v4_ap, axis=-1, keepdims=True)
         v5_ml = np.cross(v4_ap, v3_up)
-        v5_ml /= np.linalg.norm(v5_ml, axis=1, keepdims=True)
+        v5_ml /= np.linalg.norm(v5_ml, axis=-1, keepdims=True)
         z_axis = np.cross(v5_ml, v4_ap)
-        z_axis /= np.linalg.norm(z_axis, axis=1, keepdims=True)
+        z_axis /= np.linalg.norm(z_axis, axis=-1, keepdims=True)
         y_axis = np.cross(z_axis, v5_ml)
-        y_axis /= np.linalg.norm(y_axis, axis=1, keepdims=True)
+        y_axis /= np.linalg.norm(y_axis, axis=-1, keepdims=True)
         x_axis = np.cross(y_axis, z_axis)
-        x_axis /= np.linalg.norm(x_axis, axis=1, keepdims=True)
+        x_axis /= np.linalg.norm(x_axis, axis=-1, keepdims=True)
     elif configuration == "B":
-        v1 = (p3 - p2) / np.linalg.norm(p3 - p2, axis=1, keepdims=True)
-        v2 = (p1 - p2) / np.linalg.norm(p1 - p2, axis=1, keepdims=True)
-        v3_up = (p3 - p1) / np.linalg.norm(p3 - p1, axis=1, keepdims=True)
-        v3_up /= np.linalg.norm(v3_up, axis=1, keepdims=True)
+        v1 = (p3 - p2) / np.linalg.norm(p3 - p2, axis=-1, keepdims=True)
+        v2 = (p1 - p2) / np.linalg.norm(p1 - p2, axis=-1, keepdims=True)
+        v3_up = (p3 - p1) / np.linalg.norm(p3 - p1, axis=-1, keepdims=True)
+        v3_up /= np.linalg.norm(v3_up, axis=-1, keepdims=True)
         v4_ap = np.cross(v2, v1)
-        v4_ap /= np.linalg.norm(v4_ap, axis=1, keepdims=True)
+        v4_ap /= np.linalg.norm(v4_ap, axis=-1, keepdims=True)
         v5_ml = np.cross(v4_ap, v3_up)
-        v5_ml /= np.linalg.norm(v5_ml, axis=1, keepdims=True)
+        v5_ml /= np.linalg.norm(v5_ml, axis=-1, keepdims=True)
         z_axis = np.cross(v5_ml, v4_ap)
-        z_axis /= np.linalg.norm(z_axis, axis=1, keepdims=True)
+        z_axis /= np.linalg.norm(z_axis, axis=-1, keepdims=True)
         y_axis = np.cross(z_axis, v5_ml)
-        y_axis /= np.linalg.norm(y_axis, axis=1, keepdims=True)
+        y_axis /= np.linalg.norm(y_axis, axis=-1, keepdims=True)
         x_axis = np.cross(y_axis, z_axis)
-        x_axis /= np.linalg.norm(x_axis, axis=1, keepdims=True)
+        x_axis /= np.linalg.norm(x_axis, axis=-1, keepdims=True)
     elif configuration == "C":
-        v1 = (p2 - p1) / np.linalg.norm(p2 - p1, axis=1, keepdims=True)
-        v2 = (p3 - p1) / np.linalg.norm(p3 - p1, axis=1, keepdims=True)
-        v3_ml = (p2 - p3) / np.linalg.norm(p2 - p3, axis=1, keepdims=True)
+        v1 = (p2 - p1) / np.linalg.norm(p2 - p1, axis=-1, keepdims=True)
+        v2 = (p3 - p1) / np.linalg.norm(p3 - p1, axis=-1, keepdims=True)
+        v3_ml = (p2 - p3) / np.linalg.norm(p2 - p3, axis=-1, keepdims=True)
         v4_ap = np.cross(v2, v1)
-        v4_ap /= np.linalg.norm(v4_ap, axis=1, keepdims=True)
+        v4_ap /= np.linalg.norm(v4_ap, axis=-1, keepdims=True)
         z_axis = np.cross(v3_ml, v4_ap)
-        z_axis /= np.linalg.norm(z_axis, axis=1, keepdims=True)
+        z_axis /= np.linalg.norm(z_axis, axis=-1, keepdims=True)
         x_axis = np.cross(v4_ap, z_axis)
-        x_axis /= np.linalg.norm(x_axis, axis=1, keepdims=True)
+        x_axis /= np.linalg.norm(x_axis, axis=-1, keepdims=True)
         y_axis = np.cross(z_axis, x_axis)
-        y_axis /= np.linalg.norm(y_axis, axis=1, keepdims=True)
+        y_axis /= np.linalg.norm(y_axis, axis=-1, keepdims=True)
     elif configuration == "D":
-        v1 = (p1 - p2) / np.linalg.norm(p1 - p2, axis=1, keepdims=True)
-        v2 = (p3 - p2) / np.linalg.norm(p3 - p2, axis=1, keepdims=True)
-        v3_ml = (p1 - p3) / np.linalg.norm(p1 - p3, axis=1, keepdims=True)
+        v1 = (p1 - p2) / np.linalg.norm(p1 - p2, axis=-1, keepdims=True)
+        v2 = (p3 - p2) / np.linalg.norm(p3 - p2, axis=-1, keepdims=True)
+        v3_ml = (p1 - p3) / np.linalg.norm(p1 - p3, axis=-1, keepdims=True)
         v4_ap = np.cross(v1, v2)
-        v4_ap /= np.linalg.norm(v4_ap, axis=1, keepdims=True)
+        v4_ap /= np.linalg.norm(v4_ap, axis=-1, keepdims=True)
         z_axis = np.cross(v3_ml, v4_ap)
-        z_axis /= np.linalg.norm(z_axis, axis=1, keepdims=True)
+        z_axis /= np.linalg.norm(z_axis, axis=-1, keepdims=True)
         x_axis = np.cross(v4_ap, z_axis)
-        x_axis /= np.linalg.norm(x_axis, axis=1, keepdims=True)
+        x_axis /= np.linalg.norm(x_axis, axis=-1, keepdims=True)
         y_axis = np.cross(z_axis, x_axis)
-        y_axis /= np.linalg.norm(y_axis, axis=1, keepdims=True)
+        y_axis /= np.linalg.norm(y_axis, axis=-1, keepdims=True)
+    else:
+        raise ValueError("Error: Configuration not implemented yet.")
 
     pm = (p1 + p2 + p3) / 3
-    localbase = np.stack((x_axis, y_axis, z_axis), axis=1)
+    localbase = np.stack((x_axis, y_axis, z_axis), axis=-2)
 
     return localbase, pm
 
@@ -182,57 +187,53 @@ def createortbase_4points(p1, p2, p3, p4, configuration="y"):
     Returns:
         numpy.ndarray: Orthonormal base matrix and the mean point. Shape (n, 3, 3) and (n, 3).
     """
-    # Print the directory and name of the script being executed
-    print(f"Running script: {os.path.basename(__file__)}")
-    print(f"Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-
     # Calculate the mean point
     pm = (p1 + p2 + p3 + p4) / 4
 
     if configuration == "x":
         # Trunk configuration
         v1 = (p2 - pm) / np.linalg.norm(
-            p2 - pm, axis=1, keepdims=True
+            p2 - pm, axis=-1, keepdims=True
         )  # CLAV - PM normalized
         v2 = (p1 - pm) / np.linalg.norm(
-            p1 - pm, axis=1, keepdims=True
+            p1 - pm, axis=-1, keepdims=True
         )  # STRN - PM normalized
         v3_ml = np.cross(v2, v1)  # Right ML direction
-        v3_ml /= np.linalg.norm(v3_ml, axis=1, keepdims=True)
+        v3_ml /= np.linalg.norm(v3_ml, axis=-1, keepdims=True)
         pm_tprox = (p2 + p3) / 2
         v4_up = (pm_tprox - pm) / np.linalg.norm(
-            pm_tprox - pm, axis=1, keepdims=True
+            pm_tprox - pm, axis=-1, keepdims=True
         )  # UP direction
         y_axis = np.cross(v4_up, v3_ml)
-        y_axis /= np.linalg.norm(y_axis, axis=1, keepdims=True)
+        y_axis /= np.linalg.norm(y_axis, axis=-1, keepdims=True)
         z_axis = np.cross(v3_ml, y_axis)
-        z_axis /= np.linalg.norm(z_axis, axis=1, keepdims=True)
+        z_axis /= np.linalg.norm(z_axis, axis=-1, keepdims=True)
         x_axis = np.cross(y_axis, z_axis)
-        x_axis /= np.linalg.norm(x_axis, axis=1, keepdims=True)
+        x_axis /= np.linalg.norm(x_axis, axis=-1, keepdims=True)
     elif configuration == "z":
         # Pelvis configuration
         v1 = (p2 - pm) / np.linalg.norm(
-            p2 - pm, axis=1, keepdims=True
+            p2 - pm, axis=-1, keepdims=True
         )  # LASI - PM normalized
         v2 = (p1 - pm) / np.linalg.norm(
-            p1 - pm, axis=1, keepdims=True
+            p1 - pm, axis=-1, keepdims=True
         )  # RASI - PM normalized
         v4_up = np.cross(v2, v1)  # UP direction
-        v4_up /= np.linalg.norm(v4_up, axis=1, keepdims=True)
+        v4_up /= np.linalg.norm(v4_up, axis=-1, keepdims=True)
         pm_ant = (p1 + p2) / 2
         v5_ap = (pm_ant - pm) / np.linalg.norm(
-            pm_ant - pm, axis=1, keepdims=True
+            pm_ant - pm, axis=-1, keepdims=True
         )  # AP direction
         x_axis = np.cross(v5_ap, v4_up)
-        x_axis /= np.linalg.norm(x_axis, axis=1, keepdims=True)
+        x_axis /= np.linalg.norm(x_axis, axis=-1, keepdims=True)
         y_axis = np.cross(v4_up, x_axis)
-        y_axis /= np.linalg.norm(y_axis, axis=1, keepdims=True)
+        y_axis /= np.linalg.norm(y_axis, axis=-1, keepdims=True)
         z_axis = np.cross(x_axis, y_axis)
-        z_axis /= np.linalg.norm(z_axis, axis=1, keepdims=True)
+        z_axis /= np.linalg.norm(z_axis, axis=-1, keepdims=True)
     else:
         raise ValueError("Error: Configuration not implemented yet.")
 
-    localbase = np.stack((x_axis, y_axis, z_axis), axis=1)
+    localbase = np.stack((x_axis, y_axis, z_axis), axis=-2)
     return localbase, pm
 
 
@@ -248,10 +249,6 @@ def calcmatrot(base1, base2=None):
     np.ndarray: An array containing the rotation matrices for each time step. Shape will be (3, 3) for a single time step or (n, 3, 3) for multiple time steps.
     """
 
-    # Print the directory and name of the script being executed
-    print(f"Running script: {os.path.basename(__file__)}")
-    print(f"Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-
     if base2 is None:
         base2 = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
 
@@ -275,10 +272,6 @@ def rotmat2euler(matrot):
     Returns:
     np.ndarray: The Euler angles (phi, theta, psi) in degrees.
     """
-    # Print the directory and name of the script being executed
-    print(f"Running script: {os.path.basename(__file__)}")
-    print(f"Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-
     rotation_object = R.from_matrix(matrot)
     euler_angles = rotation_object.as_euler("xyz", degrees=False)
     euler_angles_degrees = np.degrees(euler_angles)
@@ -295,10 +288,6 @@ def rotmat2quat(matrot):
     Returns:
     np.ndarray: The quaternions (w, x, y, z).
     """
-    # Print the directory and name of the script being executed
-    print(f"Running script: {os.path.basename(__file__)}")
-    print(f"Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-
     rotation_object = R.from_matrix(matrot)
     quaternions = rotation_object.as_quat()
     return quaternions
@@ -316,10 +305,6 @@ def rotdata(data, xth=0, yth=0, zth=0, ordem="xyz"):
     Returns:
     np.ndarray: The rotated data.
     """
-    # Print the directory and name of the script being executed
-    print(f"Running script: {os.path.basename(__file__)}")
-    print(f"Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-
     # Create the rotation object using Euler angles
     rotation_object = R.from_euler(ordem, [xth, yth, zth], degrees=True)
 
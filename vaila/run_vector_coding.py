@@ -30,13 +30,17 @@ def get_coupling_angle(
         raise ValueError("Currently, only C3D file format is supported.")
 
     print("\n Loading C3D file.")
-    dict_kin = tools.get_kinematics_c3d(file)
-    freq = tools.get_kinematic_framerate(file)
-
-    df_joint1 = tools.get_joint_df(dict_kin, joint1_name)
-    df_joint2 = tools.get_joint_df(dict_kin, joint2_name)
-    array_joint1_raw = tools.timenormalize_data(df_joint1[[axis]]).flatten()
-    array_joint2_raw = tools.timenormalize_data(df_joint2[[axis]]).flatten()
+    kinematics = tools.get_kinematics_c3d(file)
+    if not kinematics:
+        raise ValueError(f"Could not read kinematics from {file}")
+    freq = kinematics.freq
+
+    array_joint1_raw = tools.timenormalize_data(
+        kinematics.axis(joint1_name, axis)
+    ).flatten()
+    array_joint2_raw = tools.timenormalize_data(
+        kinematics.axis(joint2_name, axis)
+    ).flatten()
 
     print("\n Filtering data - Butterworth Filter Low Pass")
     array_joint1 = tools.butter_lowpass(freq, array_joint1_raw, fc=6)
@@ -0,0 +1,335 @@
+"""
+Module: segment_kinematics.py
+Description: Session-wide segment kinematics from marker trajectories.
+
+             A trial is a (frames x markers x 3) array and the segments are described by a
+             definition table (one row per segment):
+
+                 segment,markers,configuration,reference
+                 pelvis,RASI;LASI;RPSI;LPSI,z,
+                 trunk,STRN;CLAV;C7;T10,x,
+                 trunk_pelvis,STRN;CLAV;C7;T10,x,pelvis
+
+             - markers: 3 marker names (configurations A, B, C, D of `rotation.createortbase`)
+               or 4 marker names (configurations x = trunk, z = pelvis of
+               `rotation.createortbase_4points`). Names match the `<name>_X/_Y/_Z` CSV columns;
+               integer marker indices are also accepted.
+             - reference: segment whose base is the reference of the rotation (empty = laboratory).
+
+             All segments sharing a configuration are built in one call on stacked
+             (segments, frames, 3) points, the relative rotation matrices of every segment and
+             frame come from one einsum, and Euler angles and quaternions from one
+             `Rotation.from_matrix` on the flattened stack. Frames with missing markers are NaN.
+             Results match `createortbase`/`calcmatrot`/`rotmat2euler`/`rotmat2quat`.
+
+             `batch_segment_kinematics` processes a directory of trials in parallel and writes one
+             `<trial>_segment_kinematics.csv` per trial.
+
+Usage:
+    result = compute_segment_kinematics(points, "segments.csv", labels=marker_names)
+    result["euler"]  # (segments, frames, 3) in degrees
+
+    python -m vaila.segment_kinematics --input trials_dir --segments segments.csv --workers 4
+
+Author: Prof. Dr. Paulo R. P. Santiago
+Version: 1.0
+Date: 2026-10-18
+"""
+
+import os
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from scipy.spatial.transform import Rotation as R
+from vaila.rotation import createortbase, createortbase_4points
+
+THREE_POINT_CONFIGURATIONS = ("A", "B", "C", "D")
+FOUR_POINT_CONFIGURATIONS = ("x", "z")
+
+
+def load_segment_table(segments):
+    """
+    Reads a segment definition table.
+
+    Parameters:
+    - segments: str, pandas.DataFrame or list of dict
+        CSV path, DataFrame or records with the columns segment, markers, configuration
+        and (optionally) reference. Markers are a list or a string separated by ";".
+
+    Returns:
+    - list of dict with keys "segment", "markers", "configuration", "reference".
+    """
+    if isinstance(segments, str):
+        segments = pd.read_csv(segments, dtype=str, keep_default_na=False)
+    if isinstance(segments, pd.DataFrame):
+        segments = segments.to_dict("records")
+
+    table = []
+    for row in segments:
+        markers = row["markers"]
+        if isinstance(markers, str):
+            markers = [m.strip() for m in markers.split(";") if m.strip()]
+        configuration = str(row.get("configuration") or "C").strip()
+        if configuration.upper() in THREE_POINT_CONFIGURATIONS:
+            configuration = configuration.upper()
+            expected = 3
+        elif configuration.lower() in FOUR_POINT_CONFIGURATIONS:
+            configuration = configuration.lower()
+            expected = 4
+        else:
+            raise ValueError(
+                f"Segment '{row['segment']}': unknown configuration '{configuration}'."
+            )
+        if len(markers) != expected:
+            raise ValueError(
+                f"Segment '{row['segment']}': configuration {configuration} needs "
+                f"{expected} markers, got {len(markers)}."
+            )
+        reference = row.get("reference") or None
+        if isinstance(reference, float) and np.isnan(reference):
+            reference = None
+        table.append(
+            {
+                "segment": str(row["segment"]).strip(),
+                "markers": list(markers),
+                "configuration": configuration,
+                "reference": str(reference).strip() if reference else None,
+            }
+        )
+    return table
+
+
+def _marker_indices(markers, labels):
+    if labels is None:
+        return [int(m) for m in markers]
+    lookup = {str(label).lower(): i for i, label in enumerate(labels)}
+    indices = []
+    for m in markers:
+        if isinstance(m, (int, np.integer)):
+            indices.append(int(m))
+        elif str(m).lower() in lookup:
+            indices.append(lookup[str(m).lower()])
+        elif str(m).isdigit():
+            indices.append(int(m))
+        else:
+            raise ValueError(f"Marker '{m}' not found in the trial.")
+    return indices
+
+
+def compute_segment_kinematics(points, segments, labels=None, sequence="xyz"):
+    """
+    Computes the bases, rotation matrices, Euler angles and quaternions of all segments.
+
+    Parameters:
+    - points: array-like, shape (frames, markers, 3)
+        Marker trajectories.
+    - segments: segment table (see `load_segment_table`).
+    - labels: list of str or None
+        Marker names of the second axis of `points` (needed when markers are given by name).
+    - sequence: str
+        Euler sequence passed to `Rotation.as_euler` ("xyz" as in `rotmat2euler`).
+
+    Returns:
+    - dict with:
+        "segments": list of segment names,
+        "references": list of reference names (None = laboratory),
+        "bases": (segments, frames, 3, 3), rows are the x, y, z axes,
+        "origins": (segments, frames, 3), mean point of the segment markers,
+        "rotations": (segments, frames, 3, 3), base relative to the reference base,
+        "euler": (segments, frames, 3) in degrees,
+        "quaternions": (segments, frames, 4) as (x, y, z, w).
+    """
+    points = np.asarray(points, dtype=float)
+    table = load_segment_table(segments)
+    names = [row["segment"] for row in table]
+    n_segments, n_frames = len(table), points.shape[0]
+
+    bases = np.empty((n_segments, n_frames, 3, 3))
+    origins = np.empty((n_segments, n_frames, 3))
+    groups = {}
+    for s, row in enumerate(table):
+        groups.setdefault(row["configuration"], []).append(s)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for configuration, members in groups.items():
+            idx = np.array(
+                [_marker_indices(table[s]["markers"], labels) for s in members]
+            )
+            # (segments, frames, points, 3)
+            p = np.moveaxis(points[:, idx], 0, 1)
+            p = [p[:, :, j] for j in range(idx.shape[1])]
+            if configuration in FOUR_POINT_CONFIGURATIONS:
+                base, pm = createortbase_4points(*p, configuration=configuration)
+            else:
+                base, pm = createortbase(*p, configuration=configuration)
+            bases[members] = base
+            origins[members] = pm
+
+    reference_bases = np.broadcast_to(np.eye(3), bases.shape).copy()
+    references = []
+    for s, row in enumerate(table):
+        reference = row["reference"]
+        if reference and reference.lower() not in ("lab", "global"):
+            if reference not in names:
+                raise ValueError(
+                    f"Segment '{row['segment']}': reference '{reference}' is not defined."
+                )
+            reference_bases[s] = bases[names.index(reference)]
+        else:
+            reference = None
+        references.append(reference)
+
+    # Same as calcmatrot(base, reference_base) for every segment and frame
+    rotations = np.einsum("sfij,sfkj->sfik", bases, reference_bases)
+
+    flat = rotations.reshape(-1, 3, 3)
+    valid = np.isfinite(flat).all(axis=(1, 2))
+    euler = np.full((len(flat), 3), np.nan)
+    quaternions = np.full((len(flat), 4), np.nan)
+    if valid.any():
+        rotation_object = R.from_matrix(flat[valid])
+        euler[valid] = np.degrees(rotation_object.as_euler(sequence, degrees=False))
+        quaternions[valid] = rotation_object.as_quat()
+
+    return {
+        "segments": names,
+        "references": references,
+        "bases": bases,
+        "origins": origins,
+        "rotations": rotations,
+        "euler": euler.reshape(n_segments, n_frames, 3),
+        "quaternions": quaternions.reshape(n_segments, n_frames, 4),
+    }
+
+
+def read_marker_csv(file_path):
+    """
+    Reads a marker CSV with an optional time/frame first column followed by
+    `<name>_X, <name>_Y, <name>_Z` columns.
+
+    Returns:
+    - time: ndarray (frames,) or None
+    - points: ndarray (frames, markers, 3)
+    - labels: list of marker names
+    """
+    df = pd.read_csv(file_path)
+    columns = list(df.columns)
+    time = None
+    if not str(columns[0]).lower().endswith("_x"):
+        time = df.iloc[:, 0].to_numpy()
+        columns = columns[1:]
+    if len(columns) % 3:
+        raise ValueError(
+            f"{os.path.basename(file_path)}: {len(columns)} coordinate columns is not a "
+            "multiple of 3."
+        )
+    labels = [
+        col[:-2] if str(col).lower().endswith("_x") else str(col) for col in columns[0::3]
+    ]
+    points = df[columns].to_numpy(dtype=float).reshape(len(df), -1, 3)
+    return time, points, labels
+
+
+def kinematics_to_dataframe(result, time=None, sequence="xyz"):
+    """Flattens a `compute_segment_kinematics` result into one table per trial."""
+    data = {}
+    if time is not None:
+        data["Time"] = time
+    for s, name in enumerate(result["segments"]):
+        for k, axis in enumerate(sequence):
+            data[f"{name}_euler_{axis}"] = result["euler"][s, :, k]
+        for k, axis in enumerate("xyzw"):
+            data[f"{name}_quat_{axis}"] = result["quaternions"][s, :, k]
+        for k, axis in enumerate("xyz"):
+            data[f"{name}_origin_{axis}"] = result["origins"][s, :, k]
+    return pd.DataFrame(data)
+
+
+def process_trial(file_path, segments, output_dir, sequence="xyz"):
+    """Computes the segment kinematics of one trial and saves them to CSV."""
+    time, points, labels = read_marker_csv(file_path)
+    result = compute_segment_kinematics(points, segments, labels, sequence)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    output_file = os.path.join(output_dir, f"{name}_segment_kinematics.csv")
+    kinematics_to_dataframe(result, time, sequence).to_csv(
+        output_file, index=False, float_format="%.6f"
+    )
+    return output_file
+
+
+def _trial_worker(args):
+    file_path = args[0]
+    try:
+        return process_trial(*args), None
+    except Exception as e:
+        return None, f"{os.path.basename(file_path)}: {e}"
+
+
+def batch_segment_kinematics(
+    input_dir, segments, output_dir=None, max_workers=None, sequence="xyz"
+):
+    """
+    Runs `process_trial` on every CSV file in `input_dir` using a process pool.
+
+    Returns:
+    - list of str, the saved files (errors go to log_errors.txt).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if output_dir is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = os.path.join(input_dir, f"segment_kinematics_{timestamp}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Parse the table once so every worker gets the same validated records
+    table = load_segment_table(segments)
+    files = sorted(
+        os.path.join(input_dir, f)
+        for f in os.listdir(input_dir)
+        if f.lower().endswith(".csv")
+    )
+    tasks = [(f, table, output_dir, sequence) for f in files]
+
+    outputs = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for i, (output_file, error) in enumerate(
+            executor.map(_trial_worker, tasks), start=1
+        ):
+            if error:
+                errors.append(error)
+                print(f"[{i}/{len(tasks)}] Error: {error}")
+            else:
+                outputs.append(output_file)
+                print(f"[{i}/{len(tasks)}] {os.path.basename(output_file)}")
+
+    if errors:
+        with open(os.path.join(output_dir, "log_errors.txt"), "w") as f:
+            f.write("\n".join(errors) + "\n")
+    print(f"Segment kinematics saved to {output_dir}")
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Segment bases, Euler angles and quaternions for a directory of trials."
+    )
+    parser.add_argument("--input", required=True, help="Directory with marker CSV files")
+    parser.add_argument("--segments", required=True, help="Segment definition CSV")
+    parser.add_argument("--output", help="Output directory")
+    parser.add_argument("--workers", type=int, help="Number of processes")
+    parser.add_argument("--sequence", default="xyz", help="Euler sequence")
+    args = parser.parse_args()
+
+    batch_segment_kinematics(
+        args.input,
+        args.segments,
+        output_dir=args.output,
+        max_workers=args.workers,
+        sequence=args.sequence,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ Version: 0.1
 import os
 import numpy as np
 from ezc3d import c3d
+from vaila.readc3d_stream import C3DStreamReader
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output, State
@@ -36,8 +37,9 @@ import webbrowser
 
 # Function to read marker labels from .c3d file
 def get_marker_labels(dat):
-    datac3d = c3d(dat)
-    marker_labels = datac3d["parameters"]["POINT"]["LABELS"]["value"]
+    # Only the header and parameter section are read
+    with C3DStreamReader(dat) as reader:
+        marker_labels = reader.marker_labels
     return marker_labels
 
 
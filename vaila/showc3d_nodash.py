@@ -1,6 +1,7 @@
 import os
 import numpy as np
 from ezc3d import c3d
+from vaila.readc3d_stream import C3DStreamReader
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 import tkinter as tk
@@ -18,8 +19,9 @@ from tkinter import (
 
 # Function to read marker labels from .c3d file
 def get_marker_labels(dat):
-    datac3d = c3d(dat)
-    marker_labels = datac3d["parameters"]["POINT"]["LABELS"]["value"]
+    # Only the header and parameter section are read
+    with C3DStreamReader(dat) as reader:
+        marker_labels = reader.marker_labels
     return marker_labels
 
 
@@ -5,10 +5,13 @@ including total power, power frequency percentiles, power mode, spectral moments
 frequency dispersion, energy content in specific frequency bands, and frequency quotient.
 
 Author: Prof. Dr. Paulo R. P. Santiago
-Version: 1.1
-Date: 2024-11-13
+Version: 1.2
+Date: 2026-10-18
 
 Changelog:
+- Version 1.2 (2026-10-18):
+  - Added `spectral_features_all`, which computes every feature for a
+    (channels x freqs) PSD matrix from one cumulative PSD.
 - Version 1.1 (2024-11-13):
   - Added robust handling for empty frequency ranges.
   - Adjusted frequency range dynamically when out of bounds.
@@ -21,6 +24,9 @@ Usage:
   total_power_ml = total_power(freqs_ml, psd_ml)
   power_freq_50_ml = power_frequency_50(freqs_ml, psd_ml)
   # etc.
+- All features for many PSDs at once (e.g. ML and AP, or a batch of trials):
+  features = spectral_features_all(freqs, np.vstack((psd_ml, psd_ap)))
+  features["Total_Power"]  # array with one value per PSD row
 """
 
 import numpy as np
@@ -171,3 +177,99 @@ def frequency_quotient(freqs, psd, fmin=0.15, fmax=5):
     if power_below_2 == 0:
         return np.nan
     return power_above_2 / power_below_2
+
+
+def spectral_features_all(freqs, psd, fmin=0.15, fmax=5):
+    """
+    Calculates all spectral features of this module in a single pass.
+
+    The frequency range is masked once and the cumulative PSD is computed once;
+    power percentiles come from searching the cumulative sum and the band
+    energies from differences of it. Results match the individual functions.
+
+    Parameters:
+    - freqs: array-like, shape (n_freqs,)
+        Frequencies shared by all PSDs.
+    - psd: array-like, shape (n_freqs,) or (..., n_freqs)
+        One PSD or a stack of PSDs (e.g. channels x freqs, or trials x axes x freqs).
+    - fmin, fmax: float
+        Frequency range, as in the individual functions.
+
+    Returns:
+    - features: dict
+        Keys "Total_Power", "Power_Frequency_50", "Power_Frequency_95", "Power_Mode",
+        "Centroid_Frequency", "Frequency_Dispersion", "Energy_Content_Below_0.5",
+        "Energy_Content_0.5_2", "Energy_Content_Above_2" and "Frequency_Quotient",
+        each an array with the leading shape of `psd` (a float for a 1D PSD).
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    psd = np.asarray(psd, dtype=float)
+    fmin, fmax = adjust_frequency_range(freqs, fmin, fmax)
+    mask = (freqs >= fmin) & (freqs <= fmax)
+    sel_freqs = freqs[mask]
+    sel_psd = psd[..., mask]
+    shape = psd.shape[:-1]
+    keys = [
+        "Total_Power",
+        "Power_Frequency_50",
+        "Power_Frequency_95",
+        "Power_Mode",
+        "Centroid_Frequency",
+        "Frequency_Dispersion",
+        "Energy_Content_Below_0.5",
+        "Energy_Content_0.5_2",
+        "Energy_Content_Above_2",
+        "Frequency_Quotient",
+    ]
+    if sel_freqs.size == 0:
+        features = {key: np.full(shape, np.nan) for key in keys}
+        return {k: v if shape else float(v) for k, v in features.items()}
+
+    # Cumulative PSD with a leading zero: band sum over [i0, i1) = cum[i1] - cum[i0]
+    cum = np.concatenate(
+        (np.zeros(shape + (1,)), np.cumsum(sel_psd, axis=-1)), axis=-1
+    )
+    total = cum[..., -1]
+
+    def band(f_low, f_high):
+        i0 = np.searchsorted(sel_freqs, f_low, side="left")
+        i1 = np.searchsorted(sel_freqs, f_high, side="right")
+        if i1 <= i0:
+            return np.full(shape, np.nan)
+        return cum[..., i1] - cum[..., i0]
+
+    def percentile_frequency(fraction):
+        reached = cum[..., 1:] >= (total * fraction)[..., np.newaxis]
+        idx = np.argmax(reached, axis=-1)
+        result = sel_freqs[idx]
+        invalid = (total == 0) | ~reached.any(axis=-1)
+        return np.where(invalid, np.nan, result)
+
+    m0 = total
+    m1 = np.sum(sel_freqs * sel_psd, axis=-1)
+    m2 = np.sum(sel_freqs**2 * sel_psd, axis=-1)
+    below_2 = band(0, 2)
+    above_2 = band(2, fmax)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centroid = np.where(m0 == 0, np.nan, np.sqrt(m2 / m0))
+        dispersion = np.where(
+            m0 * m2 == 0, np.nan, np.sqrt(1 - (m1**2) / (m0 * m2))
+        )
+        quotient = np.where(below_2 == 0, np.nan, above_2 / below_2)
+
+    features = {
+        "Total_Power": total,
+        "Power_Frequency_50": percentile_frequency(0.5),
+        "Power_Frequency_95": percentile_frequency(0.95),
+        "Power_Mode": sel_freqs[np.argmax(sel_psd, axis=-1)],
+        "Centroid_Frequency": centroid,
+        "Frequency_Dispersion": dispersion,
+        "Energy_Content_Below_0.5": band(0, 0.5),
+        "Energy_Content_0.5_2": band(0.5, 2),
+        "Energy_Content_Above_2": above_2,
+        "Frequency_Quotient": quotient,
+    }
+    if not shape:
+        return {key: float(value) for key, value in features.items()}
+    return features
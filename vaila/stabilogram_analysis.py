@@ -9,21 +9,25 @@ The main features of this module include:
 - **Power Spectral Density (PSD) Analysis**: Computes the PSD of the CoP signals using Welch's method, providing insight into the frequency components of postural sway.
 - **Mean Square Displacement (MSD) Calculation**: Calculates the MSD over a specified time interval, which can be used to analyze the temporal characteristics of postural sway.
 - **Zero-Crossings and Peaks Count**: Identifies and counts the zero-crossings and peaks in the CoP signals, which can be used to assess the regularity and variability of postural control.
-- **Sway Density Calculation**: Computes the sway density of the CoP data, a measure that reflects the concentration of CoP points within a given radius over time.
+- **Sway Density Calculation**: Computes the sway density of the CoP data, a measure that reflects the concentration of CoP points within a given radius over time. Per-axis counts use a sorted binary search and the circular 2D radius uses a KD-tree (O(N log N)); a time-windowed variant and the peak/interval descriptors of the sway density curve are also provided.
 - **Total Path Length Computation**: Calculates the total distance traveled by the CoP, providing a measure of the overall effort required to maintain balance.
 - **Stabilogram Plotting**: Generates time series plots (stabilograms) for ML and AP CoP displacements to visualize postural sway.
 - **Power Spectrum Plotting**: Creates plots of the power spectral density, highlighting maximum PSD values, their corresponding frequencies, and median frequencies to evaluate the distribution of sway energy across different frequencies.
 - **CSV Export of Metrics**: Saves computed metrics to a CSV file with standardized headers, ensuring compatibility with other data analysis tools.
 
 Author: Prof. Dr. Paulo R. P. Santiago
-Version: 1.3
-Date: 2024-09-12
+Version: 1.4
+Date: 2026-10-18
 
 References:
 - GitHub Repository: Code Descriptors Postural Control. https://github.com/Jythen/code_descriptors_postural_control
 - "Physiological Reports" - A detailed article on the usage of stabilogram analysis in postural control research. https://doi.org/10.14814/phy2.15067
 
 Changelog:
+- Version 1.4 (2026-10-18):
+  - `compute_sway_density` counts neighbours by binary search over the sorted signal (same results, O(N log N) instead of O(N²)).
+  - Added `compute_sway_density_2d`, `compute_sway_density_windowed` and `compute_sway_density_descriptors`.
+  - `compute_sway_density_descriptors` low-pass filters the sway density curve (4th-order Butterworth, 2.5 Hz) before peak detection, as in Baratto et al. (2002), with optional minimum peak distance and prominence.
 - Version 1.3 (2024-09-12):
   - Enhanced `plot_power_spectrum` function to include indicators for maximum PSD values and their corresponding frequencies.
   - Introduced `compute_total_path_length` function to calculate the total path length of the CoP trajectory.
@@ -47,7 +51,10 @@ compute_msd(S_n, fs, delta_t)
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import welch, savgol_filter, find_peaks
+from scipy.signal import welch, savgol_filter, find_peaks, sosfiltfilt
+from scipy.spatial import cKDTree
+from numpy.lib.stride_tricks import sliding_window_view
+from vaila.filter_utils import butter_design
 
 
 def compute_rms(cop_x, cop_y):
@@ -188,10 +195,72 @@ def count_peaks(signal):
     return num_peaks
 
 
+def _count_within_radius_1d(values, queries, radius):
+    """
+    Counts, for each query, the values with |value - query| <= radius.
+
+    Uses the sorted unique values and binary search (O((N + M) log N)). The bounds
+    are then corrected with the exact |value - query| <= radius test, which is
+    monotonic over the sorted values, so the counts are identical to a brute-force
+    comparison. NaN values are never counted and NaN queries return 0.
+    """
+    values = np.asarray(values, dtype=float)
+    queries = np.asarray(queries, dtype=float)
+    unique_values, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+    cumulative = np.concatenate(([0], np.cumsum(counts)))
+    n_unique = len(unique_values)
+    result = np.zeros(len(queries), dtype=int)
+    valid = ~np.isnan(queries)
+    if n_unique == 0 or not valid.any():
+        return result
+
+    q = queries[valid]
+
+    def inside(idx):
+        return np.abs(unique_values[idx] - q) <= radius
+
+    hi = np.searchsorted(unique_values, q + radius, side="right")
+    lo = np.searchsorted(unique_values, q - radius, side="left")
+    # Exact correction of the floating point bounds
+    while True:
+        move = hi < n_unique
+        move[move] = inside(np.minimum(hi, n_unique - 1))[move]
+        if not move.any():
+            break
+        hi[move] += 1
+    while True:
+        move = hi > 0
+        move[move] = ~inside(np.maximum(hi - 1, 0))[move]
+        if not move.any():
+            break
+        hi[move] -= 1
+    while True:
+        move = lo > 0
+        move[move] = inside(np.maximum(lo - 1, 0))[move]
+        if not move.any():
+            break
+        lo[move] -= 1
+    while True:
+        move = lo < hi
+        move[move] = ~inside(np.minimum(lo, n_unique - 1))[move]
+        if not move.any():
+            break
+        lo[move] += 1
+
+    result[valid] = cumulative[hi] - cumulative[np.minimum(lo, hi)]
+    return result
+
+
 def compute_sway_density(cop_signal, fs, radius=0.3):
     """
     Calculates the sway density of the CoP signal.
 
+    For every sample t, counts the samples whose distance to sample t is at most
+    `radius` and divides by the number of samples. For 2D input the comparison is
+    made per axis and the counts of both axes are summed (use
+    `compute_sway_density_2d` for a true circular radius). Counts are obtained by
+    binary search over the sorted signal, O(N log N) instead of O(N²).
+
     Parameters:
     - cop_signal: array-like or ndarray
         CoP data, can be 1D or 2D array.
@@ -204,14 +273,175 @@ def compute_sway_density(cop_signal, fs, radius=0.3):
     - sway_density: array-like
         Sway density values.
     """
+    cop_signal = np.asarray(cop_signal, dtype=float)
     N = len(cop_signal)
-    sway_density = np.zeros(N)
-    for t in range(N):
-        distances = np.abs(cop_signal - cop_signal[t])
-        sway_density[t] = np.sum(distances <= radius) / N
+    if cop_signal.ndim == 1:
+        counts = _count_within_radius_1d(cop_signal, cop_signal, radius)
+    else:
+        columns = cop_signal.reshape(N, -1)
+        counts = sum(
+            _count_within_radius_1d(columns[:, i], columns[:, i], radius)
+            for i in range(columns.shape[1])
+        )
+    sway_density = counts / N
+    return sway_density
+
+
+def compute_sway_density_2d(cop_x, cop_y, fs, radius=0.3):
+    """
+    Calculates the sway density with a true circular radius in the ML-AP plane.
+
+    For every sample t, counts the samples inside the circle of radius `radius`
+    centered on the CoP position at t (KD-tree query, O(N log N)) and divides by
+    the number of samples.
+
+    Parameters:
+    - cop_x: array-like
+        CoP data in the ML direction.
+    - cop_y: array-like
+        CoP data in the AP direction.
+    - fs: float
+        Sampling frequency in Hz.
+    - radius: float, default=0.3
+        Radius in cm.
+
+    Returns:
+    - sway_density: array-like
+        Sway density values.
+    """
+    points = np.column_stack((cop_x, cop_y)).astype(float)
+    N = len(points)
+    tree = cKDTree(points)
+    counts = tree.query_ball_point(points, r=radius, return_length=True)
+    sway_density = np.asarray(counts) / N
     return sway_density
 
 
+def compute_sway_density_windowed(cop_signal, fs, radius=0.3, window=1.0, block=None):
+    """
+    Calculates a time-windowed sway density: for every sample t, the time (s) spent
+    within `radius` of the CoP position at t, counting only the samples within
+    ±`window` seconds of t.
+
+    Each sample is compared with a strided view of its own window, processed in
+    blocks of query samples, so the cost is O(N·W) with W = 2·window·fs and memory
+    is bounded by the block size.
+
+    Parameters:
+    - cop_signal: array-like or ndarray
+        CoP data, 1D (one axis) or 2D (N, 2) for a circular radius in the ML-AP plane.
+    - fs: float
+        Sampling frequency in Hz.
+    - radius: float, default=0.3
+        Radius in cm.
+    - window: float, default=1.0
+        Half-width of the time window in seconds.
+    - block: int, optional
+        Number of query samples per block. Defaults to the window length.
+
+    Returns:
+    - sway_density: array-like
+        Time in seconds spent within the radius, for each sample.
+    """
+    cop_signal = np.asarray(cop_signal, dtype=float)
+    if cop_signal.ndim == 1:
+        cop_signal = cop_signal[:, np.newaxis]
+    N = len(cop_signal)
+    half_window = max(int(round(window * fs)), 0)
+    width = 2 * half_window + 1
+    block = block or max(half_window, 1)
+
+    # NaN padding keeps every window the same width; NaN never counts as inside
+    padded = np.pad(
+        cop_signal,
+        ((half_window, half_window), (0, 0)),
+        mode="constant",
+        constant_values=np.nan,
+    )
+    windows = [
+        sliding_window_view(padded[:, axis], width) for axis in range(padded.shape[1])
+    ]
+    radius_sq = radius**2
+    counts = np.zeros(N, dtype=int)
+
+    for start in range(0, N, block):
+        stop = min(start + block, N)
+        dist_sq = np.zeros((stop - start, width))
+        for axis, axis_windows in enumerate(windows):
+            diff = axis_windows[start:stop] - cop_signal[start:stop, axis, np.newaxis]
+            dist_sq += diff * diff
+        counts[start:stop] = np.count_nonzero(dist_sq <= radius_sq, axis=1)
+
+    sway_density = counts / fs
+    return sway_density
+
+
+def compute_sway_density_descriptors(
+    sway_density,
+    fs,
+    cop_x=None,
+    cop_y=None,
+    cutoff=2.5,
+    order=4,
+    min_distance=None,
+    prominence=None,
+):
+    """
+    Calculates the peak/interval descriptors of a sway density curve.
+
+    The windowed sway density is a staircase of sample counts, so every small ripple
+    would be a peak. As in Baratto et al. (2002), the curve is first low-pass filtered
+    (zero-phase Butterworth) and the peaks are searched on the smoothed curve.
+
+    Parameters:
+    - sway_density: array-like
+        Sway density curve (from any of the sway density functions).
+    - fs: float
+        Sampling frequency in Hz.
+    - cop_x, cop_y: array-like, optional
+        CoP data; when given, the mean spatial distance between the CoP positions of
+        consecutive peaks is also computed.
+    - cutoff: float or None, default=2.5
+        Low-pass cutoff (Hz) applied to the curve before peak detection; None (or a
+        cutoff at or above the Nyquist frequency) uses the raw curve.
+    - order: int, default=4
+        Order of the Butterworth filter.
+    - min_distance: float, optional
+        Minimum time (s) between two peaks.
+    - prominence: float, optional
+        Minimum peak prominence, in the units of the curve.
+
+    Returns:
+    - descriptors: dict
+        Number_of_Peaks, Mean_Peak_Amplitude, Std_Peak_Amplitude,
+        Mean_Peak_Interval_s, Std_Peak_Interval_s and Mean_Peak_Distance_cm
+        (amplitudes taken from the smoothed curve).
+    """
+    sway_density = np.asarray(sway_density, dtype=float)
+    if cutoff and cutoff < fs / 2 and len(sway_density) > 3 * (2 * order + 1):
+        sway_density = sosfiltfilt(butter_design(order, cutoff, fs), sway_density)
+    distance = max(int(round(min_distance * fs)), 1) if min_distance else None
+    peaks, _ = find_peaks(sway_density, distance=distance, prominence=prominence)
+    amplitudes = sway_density[peaks]
+    intervals = np.diff(peaks) / fs
+
+    mean_distance = np.nan
+    if cop_x is not None and cop_y is not None and len(peaks) > 1:
+        peak_x = np.asarray(cop_x, dtype=float)[peaks]
+        peak_y = np.asarray(cop_y, dtype=float)[peaks]
+        mean_distance = np.mean(np.hypot(np.diff(peak_x), np.diff(peak_y)))
+
+    descriptors = {
+        "Number_of_Peaks": len(peaks),
+        "Mean_Peak_Amplitude": np.mean(amplitudes) if len(peaks) else np.nan,
+        "Std_Peak_Amplitude": np.std(amplitudes) if len(peaks) else np.nan,
+        "Mean_Peak_Interval_s": np.mean(intervals) if len(intervals) else np.nan,
+        "Std_Peak_Interval_s": np.std(intervals) if len(intervals) else np.nan,
+        "Mean_Peak_Distance_cm": mean_distance,
+    }
+    return descriptors
+
+
 def compute_total_path_length(cop_x, cop_y):
     """
     Calculates the total path length of the CoP trajectory.
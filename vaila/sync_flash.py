@@ -8,6 +8,11 @@ changes in brightness.
 
 Features:
 - Extracts the median R, G, and B values from a specified region of each frame in a video.
+  Frames are streamed into per-channel 256-bin histograms, so the exact median needs
+  constant memory whatever the length of the video.
+- Per-frame brightness time series of the region (`get_brightness_series`) with automatic
+  flash-onset detection (`detect_flash_onsets`, `detect_flash`), for synchronizing
+  full-length recordings.
 - The region for analysis can be customized by specifying coordinates and dimensions.
 - Can be used as a standalone tool or imported into another script for video synchronization.
 
@@ -17,7 +22,9 @@ Dependencies:
 
 Usage:
 - Import the `get_median_brightness` function into another script or use it directly 
-  in this script's `__main__` block for testing or standalone operation.
+  in this script's `__main__` block for testing or standalone operation:
+
+    python -m vaila.sync_flash path/to/video.mp4 [x y width height]
 
 Example:
 - To calculate the median brightness in a region (x=50, y=50, width=100, height=100) 
@@ -29,19 +36,62 @@ Example:
     print(median_brightness)
     ```
 
+- To find the frames where a flash starts in that region:
+
+    ```python
+    from sync_flash import detect_flash
+    brightness, onsets, fps = detect_flash("path/to/video.mp4", (50, 50, 100, 100))
+    ```
+
 Author: [Your Name]
 Date: [Current Date]
 
 """
 
+import sys
 import cv2
 import numpy as np
 
 
+def _histogram_median(hist):
+    """
+    Exact median of the samples summarized by a histogram of integer values
+    (same result as np.median on the samples: the two middle values are averaged).
+    """
+    cumulative = np.cumsum(hist)
+    n = cumulative[-1]
+    if n == 0:
+        return np.nan
+    lower = np.searchsorted(cumulative, (n - 1) // 2, side="right")
+    upper = np.searchsorted(cumulative, n // 2, side="right")
+    return (lower + upper) / 2
+
+
+def _frames(video_file, region=None):
+    """Yields the frames (or the region of the frames) of a video one at a time."""
+    cap = cv2.VideoCapture(video_file)
+    if not cap.isOpened():
+        raise Exception(f"Cannot open video file: {video_file}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if region:
+                x, y, w, h = region
+                frame = frame[y : y + h, x : x + w]
+            yield frame
+    finally:
+        cap.release()
+
+
 def get_median_brightness(video_file, region=None):
     """
     Extracts the median of the R, G, B values from a specified region of the video.
 
+    The frames are streamed into one 256-bin histogram per channel, so the memory used
+    does not depend on the length or resolution of the video.
+
     Parameters:
     - video_file: path to the video file.
     - region: a tuple (x, y, width, height) defining the rectangular region.
@@ -50,37 +100,103 @@ def get_median_brightness(video_file, region=None):
     Returns:
     - median_rgb: a tuple containing the median R, G, B values.
     """
-    cap = cv2.VideoCapture(video_file)
-    if not cap.isOpened():
-        raise Exception(f"Cannot open video file: {video_file}")
+    histograms = np.zeros((3, 256), dtype=np.int64)
+    for frame in _frames(video_file, region):
+        for channel in range(3):
+            histograms[channel] += cv2.calcHist(
+                [frame], [channel], None, [256], [0, 256]
+            ).ravel().astype(np.int64)
 
-    all_pixels = []
+    # OpenCV frames are BGR
+    return tuple(_histogram_median(histograms[channel]) for channel in (2, 1, 0))
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
 
-        if region:
-            x, y, w, h = region
-            frame = frame[y : y + h, x : x + w]
+def get_brightness_series(video_file, region=None, statistic="mean"):
+    """
+    Per-frame brightness (grayscale) of a region of the video, streamed frame by frame.
 
-        # Convert frame to RGB and reshape it to a 2D array of pixels
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pixels = frame_rgb.reshape(-1, 3)
-        all_pixels.append(pixels)
+    Parameters:
+    - video_file: path to the video file.
+    - region: a tuple (x, y, width, height) or None for the entire frame.
+    - statistic: "mean" or "median" of the region in each frame.
 
+    Returns:
+    - brightness: np.ndarray with one value per frame.
+    - fps: frame rate of the video.
+    """
+    if statistic not in ("mean", "median"):
+        raise ValueError("statistic must be 'mean' or 'median'.")
+
+    cap = cv2.VideoCapture(video_file)
+    fps = cap.get(cv2.CAP_PROP_FPS)
     cap.release()
 
-    # Stack all pixels and calculate the median
-    all_pixels = np.vstack(all_pixels)
-    median_rgb = np.median(all_pixels, axis=0)
+    brightness = []
+    for frame in _frames(video_file, region):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if statistic == "mean":
+            brightness.append(cv2.mean(gray)[0])
+        else:
+            hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+            brightness.append(_histogram_median(hist))
+    return np.asarray(brightness, dtype=float), fps
+
+
+def detect_flash_onsets(brightness, threshold=None, k=5.0, min_interval=1):
+    """
+    Frames where the brightness rises above a threshold (flash onsets).
+
+    Parameters:
+    - brightness: per-frame brightness (see get_brightness_series).
+    - threshold: absolute brightness threshold. If None, a robust threshold is used:
+                 median + k * MAD of the series (scaled to a standard deviation).
+    - k: number of robust standard deviations above the baseline.
+    - min_interval: minimum number of frames between two onsets.
 
-    return tuple(median_rgb)
+    Returns:
+    - onsets: np.ndarray of frame indices.
+    """
+    brightness = np.asarray(brightness, dtype=float)
+    if brightness.size == 0:
+        return np.array([], dtype=int)
+    if threshold is None:
+        baseline = np.median(brightness)
+        mad = 1.4826 * np.median(np.abs(brightness - baseline))
+        threshold = baseline + k * max(mad, 1.0)
+
+    above = brightness > threshold
+    onsets = np.flatnonzero(above & ~np.concatenate(([False], above[:-1])))
+
+    # Keep the first onset of each burst
+    kept = []
+    for onset in onsets:
+        if not kept or onset - kept[-1] >= min_interval:
+            kept.append(onset)
+    return np.asarray(kept, dtype=int)
+
+
+def detect_flash(video_file, region=None, threshold=None, k=5.0, min_interval=1):
+    """
+    Brightness time series of a video with automatic flash-onset detection.
+
+    Returns:
+    - brightness: np.ndarray with the mean brightness of each frame.
+    - onsets: np.ndarray of the frames where a flash starts.
+    - fps: frame rate of the video.
+    """
+    brightness, fps = get_brightness_series(video_file, region)
+    onsets = detect_flash_onsets(brightness, threshold, k, min_interval)
+    return brightness, onsets, fps
 
 
 if __name__ == "__main__":
-    video_path = "path/to/your/video.mp4"  # Replace with your video path
-    region = (50, 50, 100, 100)  # Example region (x, y, width, height)
+    if len(sys.argv) not in (2, 6):
+        print("Usage: python -m vaila.sync_flash video.mp4 [x y width height]")
+        sys.exit(1)
+    video_path = sys.argv[1]
+    region = tuple(int(v) for v in sys.argv[2:]) or None
     median_brightness = get_median_brightness(video_path, region)
     print(f"Median RGB values in the specified region: {median_brightness}")
+    brightness, onsets, fps = detect_flash(video_path, region)
+    print(f"Frames: {len(brightness)} at {fps} fps")
+    print(f"Flash onsets (frames): {onsets.tolist()}")
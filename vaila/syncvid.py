@@ -7,14 +7,21 @@ keyframes for multiple video files and select a main camera for synchronization.
 Features:
 - Manual synchronization: Allows the user to manually input keyframes for 
   synchronization.
-- Automatic synchronization (using flash): Automatically extracts the median of 
-  the R, G, and B values from a specific region of each video to automatically 
-  synchronize the videos based on a flash or brightness change.
+- Automatic synchronization: a cheap 1-D signal is extracted from every video in
+  parallel (the per-frame brightness of a region, streamed by `sync_flash`, or the
+  audio envelope decoded through ffmpeg) and the offset of each video relative to the
+  main camera is estimated by FFT cross-correlation. The keyframes found this way go
+  into the same sync file as the manual keyframes, ready for Cut Videos.
+  Headless use (e.g. many trials):
+
+      from vaila.syncvid import auto_sync_videos
+      auto_sync_videos("trial_dir", "trial_sync.txt", frame_initial=100, frame_final=1100)
 
 Dependencies:
 - tkinter: For the graphical user interface (GUI).
 - cv2 (OpenCV): For video processing, used in automatic synchronization.
-- numpy: For numerical array manipulation, used in automatic synchronization.
+- numpy, scipy: For the signals and the cross-correlation.
+- ffmpeg (command line): Only for the audio synchronization.
 
 Usage:
 - Run the script and follow the instructions in the GUI to select the videos 
@@ -27,12 +34,21 @@ Date: [Current Date]
 """
 
 import os
+import subprocess
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from scipy.signal import correlate, correlation_lags
 from vaila.sync_flash import (
-    get_median_brightness,
+    get_brightness_series,
+    detect_flash_onsets,
 )  # Imports the automatic synchronization feature
 
+AUDIO_SAMPLE_RATE = 8000  # Hz, decoding rate of the audio track
+AUDIO_ENVELOPE_RATE = 1000  # Hz, rate of the audio envelope used for the correlation
+
 
 def get_video_files(directory_path):
     return sorted(
@@ -50,6 +66,235 @@ def write_sync_file(sync_data, output_file):
             f.write(" ".join(map(str, data)) + "\n")
 
 
+def extract_audio_envelope(video_path, rate=AUDIO_ENVELOPE_RATE):
+    """
+    Decodes the audio track of a video with ffmpeg (mono, 16-bit) and returns its
+    amplitude envelope sampled at `rate` Hz.
+    """
+    command = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        video_path,
+        "-vn",  # no video
+        "-ac",
+        "1",  # mono
+        "-ar",
+        str(AUDIO_SAMPLE_RATE),
+        "-f",
+        "s16le",
+        "-",
+    ]
+    result = subprocess.run(command, capture_output=True, check=True)
+    audio = np.abs(np.frombuffer(result.stdout, dtype=np.int16).astype(float))
+    if audio.size == 0:
+        raise ValueError(f"No audio track in {video_path}")
+    block = AUDIO_SAMPLE_RATE // rate
+    n_blocks = audio.size // block
+    return audio[: n_blocks * block].reshape(n_blocks, block).mean(axis=1)
+
+
+def extract_sync_signal(video_path, method="flash", region=None):
+    """
+    Extracts the 1-D synchronization signal of one video.
+
+    Parameters:
+    - video_path: path to the video file.
+    - method: "flash" (per-frame brightness of `region`) or "audio" (audio envelope).
+    - region: (x, y, width, height) for the flash method, None for the whole frame.
+
+    Returns:
+    - signal: np.ndarray.
+    - rate: sampling rate of the signal (Hz).
+    - fps: frame rate of the video.
+    """
+    if method == "flash":
+        signal, fps = get_brightness_series(video_path, region)
+        return signal, fps, fps
+    if method == "audio":
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        return extract_audio_envelope(video_path), AUDIO_ENVELOPE_RATE, fps
+    raise ValueError("method must be 'flash' or 'audio'.")
+
+
+def _sync_signal_worker(args):
+    video_path = args[0]
+    try:
+        return extract_sync_signal(*args), None
+    except Exception as e:
+        return None, f"{os.path.basename(video_path)}: {e}"
+
+
+def estimate_offset(reference, signal, rate, max_lag=None):
+    """
+    Delay of `signal` relative to `reference` by FFT cross-correlation.
+
+    Both signals are standardized first, so cameras with different exposure or
+    microphones with different gain can be compared.
+
+    Parameters:
+    - reference, signal: 1-D signals with the same sampling rate.
+    - rate: sampling rate (Hz).
+    - max_lag: largest delay searched, in seconds (None: any).
+
+    Returns:
+    - lag: delay in seconds (an event at time t in `reference` is at t + lag in `signal`).
+    - peak: normalized correlation at that delay (close to 1 for a clear match).
+    """
+    reference = (reference - np.mean(reference)) / (np.std(reference) or 1)
+    signal = (signal - np.mean(signal)) / (np.std(signal) or 1)
+    xcorr = correlate(signal, reference, mode="full", method="fft")
+    lags = correlation_lags(len(signal), len(reference), mode="full")
+    if max_lag is not None:
+        keep = np.abs(lags) <= max_lag * rate
+        xcorr, lags = xcorr[keep], lags[keep]
+    best = np.argmax(xcorr)
+    return lags[best] / rate, xcorr[best] / min(len(signal), len(reference))
+
+
+def get_auto_sync_info(
+    video_directory,
+    video_files,
+    main_video,
+    method="flash",
+    region=None,
+    max_lag=None,
+    max_workers=None,
+):
+    """
+    Automatic keyframes for every video, relative to the main video.
+
+    The signals of all videos are extracted in parallel (one process per video). The
+    keyframe of the main video is its first flash onset (flash method) or 0 (audio
+    method); the keyframe of every other video is that instant shifted by its
+    cross-correlation delay, in frames of that video.
+
+    Returns:
+    - sync_data: [[video_file, keyframe], ...] as produced by get_sync_info.
+    """
+    tasks = [
+        (os.path.join(video_directory, video_file), method, region)
+        for video_file in video_files
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_sync_signal_worker, tasks))
+
+    errors = [error for _, error in results if error]
+    if errors:
+        raise RuntimeError("Signal extraction failed:\n" + "\n".join(errors))
+    signals = dict(zip(video_files, (result for result, _ in results)))
+
+    main_signal, main_rate, main_fps = signals[main_video]
+    main_keyframe = 0
+    if method == "flash":
+        onsets = detect_flash_onsets(main_signal)
+        if len(onsets):
+            main_keyframe = int(onsets[0])
+    main_time = main_keyframe / main_fps
+
+    sync_data = []
+    for video_file in video_files:
+        signal, rate, fps = signals[video_file]
+        if rate != main_rate:
+            # Different frame rates: resample onto the time base of the main video
+            time = np.arange(len(signal)) / rate
+            signal = np.interp(np.arange(0, time[-1], 1 / main_rate), time, signal)
+        lag, peak = estimate_offset(main_signal, signal, main_rate, max_lag)
+        keyframe = int(round((main_time + lag) * fps))
+        print(
+            f"{video_file}: offset {lag:+.3f} s, keyframe {keyframe} "
+            f"(correlation {peak:.2f})"
+        )
+        sync_data.append([video_file, keyframe])
+    return sync_data
+
+
+def build_sync_data(sync_data, main_video, frame_initial, frame_final):
+    """
+    Cut ranges of every video from its keyframe and the range of the main video.
+
+    Returns:
+    - [[video_file, new_name, initial_frame, final_frame], ...] for write_sync_file,
+      or None if the main video has no keyframe.
+    """
+    main_keyframe = None
+
+    for video_file, keyframe in sync_data:
+        if main_video in video_file:
+            main_keyframe = keyframe
+            break
+
+    if main_keyframe is None:
+        return None
+
+    adjusted_sync_data = []
+    for video_file, keyframe in sync_data:
+        if main_video in video_file:
+            adjusted_sync_data.append(
+                [
+                    video_file,
+                    f"{os.path.splitext(video_file)[0]}_{keyframe}_{frame_initial}_{frame_final}.mp4",
+                    frame_initial,
+                    frame_final,
+                ]
+            )
+            continue
+
+        initial_frame = frame_initial - (main_keyframe - keyframe)
+        final_frame = frame_final - (main_keyframe - keyframe)
+        new_name = f"{os.path.splitext(video_file)[0]}_{keyframe}_{initial_frame}_{final_frame}.mp4"
+        adjusted_sync_data.append([video_file, new_name, initial_frame, final_frame])
+    return adjusted_sync_data
+
+
+def auto_sync_videos(
+    video_directory,
+    output_file,
+    main_video=None,
+    frame_initial=0,
+    frame_final=None,
+    method="flash",
+    region=None,
+    max_lag=None,
+    max_workers=None,
+):
+    """
+    Headless automatic synchronization of the videos of a directory.
+
+    Parameters:
+    - video_directory: directory with the videos of one trial.
+    - output_file: sync file (appended, as in the GUI).
+    - main_video: reference video (default: the first video in sorted order).
+    - frame_initial, frame_final: range to keep in the main video (frame_final
+      defaults to the last frame of the main video).
+    - method, region, max_lag, max_workers: see get_auto_sync_info.
+
+    Returns:
+    - adjusted sync data written to the file.
+    """
+    video_files = get_video_files(video_directory)
+    if not video_files:
+        raise ValueError(f"No videos found in {video_directory}")
+    main_video = main_video or video_files[0]
+    if frame_final is None:
+        cap = cv2.VideoCapture(os.path.join(video_directory, main_video))
+        frame_final = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) - 1
+        cap.release()
+
+    sync_data = get_auto_sync_info(
+        video_directory, video_files, main_video, method, region, max_lag, max_workers
+    )
+    adjusted_sync_data = build_sync_data(
+        sync_data, main_video, frame_initial, frame_final
+    )
+    write_sync_file(adjusted_sync_data, output_file)
+    print(f"Sync file {output_file} updated with {len(adjusted_sync_data)} videos.")
+    return adjusted_sync_data
+
+
 def get_sync_info(video_files):
     sync_data = []
 
@@ -229,52 +474,56 @@ def sync_videos():
 
     video_files = get_video_files(video_directory)
 
-    # Ask the user if they want to use the flash for automatic synchronization
-    use_flash = messagebox.askyesno(
-        "Use Flash Synchronization",
-        "Do you want to use flash detection for automatic synchronization?",
+    # Ask the user if they want to synchronize automatically (flash or audio)
+    use_auto = messagebox.askyesno(
+        "Automatic Synchronization",
+        "Do you want to synchronize the videos automatically (flash or audio)?",
     )
 
-    if use_flash:
-        for video_file in video_files:
-            region = (50, 50, 100, 100)  # Example region, customize as needed
-            median_brightness = get_median_brightness(video_file, region)
-            print(f"Median brightness for {video_file}: {median_brightness}")
-
-    sync_data, main_video, frame_initial, frame_final = get_sync_info(video_files)
-    if not main_video:
-        messagebox.showerror("Error", "Main video was not selected.")
-        return
-
-    main_keyframe = None
-
-    for video_file, keyframe in sync_data:
-        if main_video in video_file:
-            main_keyframe = keyframe
-            break
-
-    if main_keyframe is None:
+    if use_auto:
+        use_audio = messagebox.askyesno(
+            "Synchronization Signal",
+            "Use the audio track? (No: brightness of a region, e.g. a flash)",
+        )
+        method = "audio" if use_audio else "flash"
+        region = None
+        if method == "flash":
+            region_text = simpledialog.askstring(
+                "Flash Region",
+                "Enter the flash region as x,y,width,height (empty: whole frame):",
+            )
+            if region_text:
+                region = tuple(int(v) for v in region_text.split(","))
+        main_video = simpledialog.askstring(
+            "Main Camera",
+            "Enter the main video for synchronization:",
+            initialvalue=video_files[0],
+        )
+        frame_initial = simpledialog.askinteger("Start Frame", "Start frame:")
+        frame_final = simpledialog.askinteger("End Frame", "End frame:")
+        if main_video not in video_files or frame_initial is None or not frame_final:
+            messagebox.showerror("Error", "Invalid main video or frame range.")
+            return
+        try:
+            sync_data = get_auto_sync_info(
+                video_directory, video_files, main_video, method, region
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Automatic synchronization failed: {e}")
+            return
+    else:
+        sync_data, main_video, frame_initial, frame_final = get_sync_info(video_files)
+        if not main_video:
+            messagebox.showerror("Error", "Main video was not selected.")
+            return
+
+    adjusted_sync_data = build_sync_data(
+        sync_data, main_video, frame_initial, frame_final
+    )
+    if adjusted_sync_data is None:
         messagebox.showerror("Error", "Main video keyframe is not set.")
         return
 
-    adjusted_sync_data = []
-    for video_file, keyframe in sync_data:
-        if main_video in video_file:
-            adjusted_sync_data.append(
-                [
-                    video_file,
-                    f"{os.path.splitext(video_file)[0]}_{keyframe}_{frame_initial}_{frame_final}.mp4",
-                    frame_initial,
-                    frame_final,
-                ]
-            )
-            continue
-
-        initial_frame = frame_initial - (main_keyframe - keyframe)
-        final_frame = frame_final - (main_keyframe - keyframe)
-        new_name = f"{os.path.splitext(video_file)[0]}_{keyframe}_{initial_frame}_{final_frame}.mp4"
-        adjusted_sync_data.append([video_file, new_name, initial_frame, final_frame])
-
     write_sync_file(adjusted_sync_data, output_file)
     print(
         "Sync file created successfully! Now use Cut Videos to synchronize the videos."
@@ -1,2 +1,272 @@
+"""
+Module: vector_coding.py
+Description: Batch vector coding (coupling angles) over a directory of C3D trials.
+
+             Each trial is loaded once (`maintools.get_kinematics_c3d`) and every joint pair x
+             axis combination is computed in one vectorized pass:
+             - all cycles of all markers are time-normalized at once with
+               `maintools.timenormalize_cycles` (cubic) and low-pass filtered (6 Hz Butterworth,
+               as in run_vector_coding.py);
+             - coupling angles and coordination patterns come from `maintools.coupling_angles`
+               and `maintools.phase_percentages` on (cycles, pairs, axes, samples) arrays;
+             - ensemble statistics over cycles: circular mean coupling angle and coupling angle
+               variability (CAV) at every normalized instant.
+
+             Trials are processed in parallel (one process per trial).
+
+             Cycles are read from an optional CSV with the columns file, start, end (frame
+             indices, both inclusive; file is the trial name without extension). Trials without
+             cycles are analysed as one cycle from the first to the last frame.
+
+Outputs (in <output_dir>/vector_coding_<timestamp>):
+    - vector_coding_cycles.csv: one row per trial, joint pair, axis and cycle with the circular
+      mean coupling angle and the percentage of each coordination pattern.
+    - vector_coding_ensemble.csv: one row per trial, joint pair, axis and normalized instant with
+      the circular mean coupling angle and the CAV across cycles.
+    - vector_coding_summary.csv: one row per trial, joint pair and axis with the mean CAV and the
+      coordination patterns of the ensemble mean coupling angle.
+    - log_errors.txt with the trials that failed.
+
+Usage:
+    batch_vector_coding("trials_dir", [("RHip", "RKnee"), ("RKnee", "RAnkle")], axes="xyz")
+
+Author: Prof. Dr. Paulo R. P. Santiago
+Version: 0.1
+Date: 2026-10-18
+"""
+
+import os
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from tkinter import filedialog, simpledialog, messagebox, Tk
+from vaila import maintools as tools
+
+PHASE_COLUMNS = ["anti_phase_pct", "in_phase_pct", "joint1_phase_pct", "joint2_phase_pct"]
+
+
+def load_cycles(cycles_file):
+    """Reads a file,start,end CSV into {trial name: [(start, end), ...]}."""
+    df = pd.read_csv(cycles_file)
+    cycles = {}
+    for row in df.itertuples(index=False):
+        name = os.path.splitext(os.path.basename(str(row.file)))[0]
+        cycles.setdefault(name, []).append((int(row.start), int(row.end)))
+    return cycles
+
+
+def vector_coding_trial(file, joint_pairs, axes="x", cycles=None, n_points=101, fc=6):
+    """
+    Coupling angles of every joint pair and axis of one C3D trial.
+
+    Parameters:
+    - file: str, C3D file.
+    - joint_pairs: list of (joint1, joint2) marker labels.
+    - axes: str or list, coordinates to analyse ('x', 'y', 'z').
+    - cycles: list of (start, end) frames (inclusive) or None for the whole trial.
+    - n_points: int, samples per normalized cycle.
+    - fc: float, low-pass cutoff (Hz) applied to the normalized series.
+
+    Returns:
+    - cycles_df, ensemble_df, summary_df: tidy DataFrames (see the module docstring).
+    """
+    kinematics = tools.get_kinematics_c3d(file)
+    if not kinematics:
+        raise ValueError(f"Could not read kinematics from {file}")
+
+    joints = sorted({joint for pair in joint_pairs for joint in pair})
+    missing = [joint for joint in joints if joint not in kinematics.label_index]
+    if missing:
+        raise KeyError(f"Joints not found: {', '.join(missing)}")
+    if cycles is None:
+        cycles = [(0, kinematics.n_frames - 1)]
+    cycles = np.asarray(cycles, dtype=int)
+    axes = list(axes)
+
+    points = kinematics.points[:, [kinematics.label_index[j] for j in joints]]
+    points = points[..., [tools.AXIS_INDEX[a.lower()] for a in axes]]
+    # (cycles, n_points, joints, axes) -> (cycles, joints, axes, n_points)
+    series = np.moveaxis(
+        tools.timenormalize_cycles(points, cycles, n_points, method="cubic"), 1, -1
+    )
+    series = tools.butter_lowpass(kinematics.freq, series, fc=fc)
+
+    j1 = [joints.index(pair[0]) for pair in joint_pairs]
+    j2 = [joints.index(pair[1]) for pair in joint_pairs]
+    coupangle = tools.coupling_angles(series[:, j1], series[:, j2], axis=-1)
+
+    cycle_mean, _ = tools.circular_mean(coupangle, axis=-1)  # (cycles, pairs, axes)
+    cycle_phases = tools.phase_percentages(coupangle)  # (cycles, pairs, axes, 4)
+    ensemble_mean, _ = tools.circular_mean(coupangle, axis=0)  # (pairs, axes, samples)
+    cav = tools.coupling_angle_variability(coupangle, axis=0)
+    ensemble_phases = tools.phase_percentages(ensemble_mean)  # (pairs, axes, 4)
+
+    trial = os.path.splitext(os.path.basename(file))[0]
+    percent = np.linspace(0, 100, n_points)[1:]
+    cycle_rows, ensemble_tables, summary_rows = [], [], []
+    for p, (joint1, joint2) in enumerate(joint_pairs):
+        for a, axis in enumerate(axes):
+            keys = {"file": trial, "joint1": joint1, "joint2": joint2, "axis": axis}
+            for c, (start, end) in enumerate(cycles):
+                cycle_rows.append(
+                    {
+                        **keys,
+                        "cycle": c + 1,
+                        "start": start,
+                        "end": end,
+                        "coupling_angle_mean": cycle_mean[c, p, a],
+                        **dict(zip(PHASE_COLUMNS, cycle_phases[c, p, a])),
+                    }
+                )
+            ensemble_tables.append(
+                pd.DataFrame(
+                    {
+                        **keys,
+                        "cycle_percent": percent,
+                        "coupling_angle_mean": ensemble_mean[p, a],
+                        "coupling_angle_variability": cav[p, a],
+                    }
+                )
+            )
+            summary_rows.append(
+                {
+                    **keys,
+                    "n_cycles": len(cycles),
+                    "cav_mean": np.nanmean(cav[p, a]),
+                    **dict(zip(PHASE_COLUMNS, ensemble_phases[p, a])),
+                }
+            )
+
+    return (
+        pd.DataFrame(cycle_rows),
+        pd.concat(ensemble_tables, ignore_index=True),
+        pd.DataFrame(summary_rows),
+    )
+
+
+def _vector_coding_worker(args):
+    file = args[0]
+    try:
+        return vector_coding_trial(*args), None
+    except Exception as e:
+        return None, f"{os.path.basename(file)}: {e}"
+
+
+def batch_vector_coding(
+    input_dir,
+    joint_pairs,
+    axes="x",
+    cycles_file=None,
+    output_dir=None,
+    max_workers=None,
+    n_points=101,
+    fc=6,
+):
+    """
+    Runs `vector_coding_trial` on every C3D file of `input_dir` using a process pool.
+
+    Returns:
+    - str, the output directory.
+    """
+    if output_dir is None:
+        output_dir = input_dir
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_dir = os.path.join(output_dir, f"vector_coding_{timestamp}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    all_cycles = load_cycles(cycles_file) if cycles_file else {}
+    files = sorted(
+        os.path.join(input_dir, f)
+        for f in os.listdir(input_dir)
+        if f.lower().endswith(".c3d")
+    )
+    tasks = [
+        (
+            f,
+            joint_pairs,
+            axes,
+            all_cycles.get(os.path.splitext(os.path.basename(f))[0]),
+            n_points,
+            fc,
+        )
+        for f in files
+    ]
+
+    tables = ([], [], [])
+    errors = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for i, (result, error) in enumerate(
+            executor.map(_vector_coding_worker, tasks), start=1
+        ):
+            if error:
+                errors.append(error)
+                print(f"[{i}/{len(tasks)}] Error: {error}")
+                continue
+            for table, df in zip(tables, result):
+                table.append(df)
+            print(
+                f"[{i}/{len(tasks)}] {os.path.basename(tasks[i - 1][0])}: "
+                f"{result[0]['cycle'].max()} cycles"
+            )
+
+    names = ("vector_coding_cycles", "vector_coding_ensemble", "vector_coding_summary")
+    for name, table in zip(names, tables):
+        if table:
+            pd.concat(table, ignore_index=True).to_csv(
+                os.path.join(output_dir, f"{name}.csv"), index=False
+            )
+    if errors:
+        with open(os.path.join(output_dir, "log_errors.txt"), "w") as f:
+            f.write("\n".join(errors) + "\n")
+    print(f"Vector coding results saved to {output_dir}")
+    return output_dir
+
+
 def vector_coding():
-    print("OK")
+    root = Tk()
+    root.withdraw()
+
+    input_dir = filedialog.askdirectory(title="Select Directory with C3D Files")
+    if not input_dir:
+        return
+
+    pairs_text = simpledialog.askstring(
+        "Joint Pairs",
+        "Enter the joint pairs as Joint1,Joint2 separated by ';'\n"
+        "(e.g. RHip,RKnee; RKnee,RAnkle):",
+    )
+    if not pairs_text:
+        return
+    joint_pairs = [
+        tuple(j.strip() for j in pair.split(","))
+        for pair in pairs_text.split(";")
+        if pair.strip()
+    ]
+    if any(len(pair) != 2 for pair in joint_pairs):
+        messagebox.showerror("Error", "Each joint pair must have two joints.")
+        return
+
+    axes = simpledialog.askstring(
+        "Axes", "Enter the axes to analyse (e.g. xyz):", initialvalue="x"
+    )
+    if not axes:
+        return
+
+    cycles_file = None
+    if messagebox.askyesno(
+        "Cycles", "Do you have a CSV with the cycles (file, start, end)?"
+    ):
+        cycles_file = filedialog.askopenfilename(
+            title="Select Cycles CSV", filetypes=[("CSV files", "*.csv")]
+        )
+
+    output_dir = batch_vector_coding(
+        input_dir, joint_pairs, axes.strip().lower(), cycles_file or None
+    )
+    messagebox.showinfo("Success", f"Vector coding results saved to {output_dir}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    vector_coding()